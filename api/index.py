@@ -1,24 +1,40 @@
 """
 Campus AI Chatbot - Advanced Serverless Version with Admin Panel
 """
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 import os
-import requests
+import sys
+import time
 import json
 from datetime import datetime
 import secrets
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.session_store import create_session_backend
+from src.conversation_summary import ConversationSummarizer
+from src.http_pool import get_session, TIMEOUT
+
 app = Flask(__name__, static_folder='../public')
 CORS(app)
 
+# Conversation history (SESSION_BACKEND=sqlite shares it across workers)
+sessions = create_session_backend()
+# Turns sent to the model verbatim (same window as the chatbot engine); older
+# ones are folded into a short per-session summary
+HISTORY_TURNS = 3
+summarizer = ConversationSummarizer(window=HISTORY_TURNS, max_tokens=int(os.getenv('SUMMARY_MAX_TOKENS', '150')))
+
 # Security
 ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', secrets.token_urlsafe(32))
 
 # Groq API configuration
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_BASE_URL = os.getenv('GROQ_BASE_URL', 'https://api.groq.com/openai/v1').rstrip('/')
+GROQ_API_URL = f"{GROQ_BASE_URL}/chat/completions"
 GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.1-8b-instant')
+# Keep-alive pool (the same one LLMProvider uses for Groq in this process)
+groq_http = get_session('groq')
 
 # In-memory database (for serverless, use external DB in production)
 students_db = {
@@ -241,12 +257,56 @@ def home():
 def health():
     return jsonify({'status': 'healthy', 'llm': 'groq-connected'})
 
+def build_messages(user_message, student_id, session, chat_history):
+    """System prompt with student context, recent history and the new message"""
+    # Build context with student data if available
+    context = SYSTEM_PROMPT
+    if student_id and student_id in students_db:
+        student = students_db[student_id]
+        context += f"\n\nCURRENT STUDENT CONTEXT:\n"
+        context += f"Name: {student['name']}\n"
+        context += f"ID: {student['id']}\n"
+        context += f"Department: {student['department']}\n"
+        context += f"Year: {student['year']} ({student['semester']})\n"
+        context += f"Fee Status: {student['fee_status']} - {student['fee_amount']}\n"
+        context += f"Due Date: {student['due_date']}\n"
+        context += f"Hostel: {student['hostel']}\n"
+        context += f"Library Books Issued: {student['library_books']}\n"
+        context += f"CGPA: {student['cgpa']}\n"
+        context += f"Attendance: {student['attendance']}\n"
+    
+    if session and session.summary:
+        context += f"\n\nEARLIER IN THIS CONVERSATION:\n{session.summary}\n"
+    
+    # Build messages for API
+    messages = [{'role': 'system', 'content': context}]
+    
+    # Add chat history (last 3 turns), from the client or the session store
+    history_messages = [
+        {'role': 'user' if msg['type'] == 'user' else 'assistant', 'content': msg['content']}
+        for msg in chat_history
+    ]
+    if not history_messages and session:
+        for turn in session.recent(HISTORY_TURNS):
+            history_messages.append({'role': 'user', 'content': turn.user})
+            history_messages.append({'role': 'assistant', 'content': turn.bot})
+    # Whole turns only: never open with an answer whose question was cut off
+    history_messages = history_messages[-2 * HISTORY_TURNS:]
+    if history_messages and history_messages[0]['role'] == 'assistant':
+        history_messages = history_messages[1:]
+    messages.extend(history_messages)
+    
+    # Add current message
+    messages.append({'role': 'user', 'content': user_message})
+    return messages
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     try:
         data = request.get_json()
         user_message = data.get('message', '').strip()
         student_id = data.get('studentId', '').strip()
+        session_id = data.get('session_id', '').strip()
         chat_history = data.get('history', [])
         
         if not user_message:
@@ -255,34 +315,8 @@ def chat():
         if not GROQ_API_KEY:
             return jsonify({'error': 'Groq API key not configured'}), 500
         
-        # Build context with student data if available
-        context = SYSTEM_PROMPT
-        if student_id and student_id in students_db:
-            student = students_db[student_id]
-            context += f"\n\nCURRENT STUDENT CONTEXT:\n"
-            context += f"Name: {student['name']}\n"
-            context += f"ID: {student['id']}\n"
-            context += f"Department: {student['department']}\n"
-            context += f"Year: {student['year']} ({student['semester']})\n"
-            context += f"Fee Status: {student['fee_status']} - {student['fee_amount']}\n"
-            context += f"Due Date: {student['due_date']}\n"
-            context += f"Hostel: {student['hostel']}\n"
-            context += f"Library Books Issued: {student['library_books']}\n"
-            context += f"CGPA: {student['cgpa']}\n"
-            context += f"Attendance: {student['attendance']}\n"
-        
-        # Build messages for API
-        messages = [{'role': 'system', 'content': context}]
-        
-        # Add chat history (last 5 messages)
-        for msg in chat_history[-5:]:
-            messages.append({
-                'role': 'user' if msg['type'] == 'user' else 'assistant',
-                'content': msg['content']
-            })
-        
-        # Add current message
-        messages.append({'role': 'user', 'content': user_message})
+        session = sessions.get(session_id) if session_id else None
+        messages = build_messages(user_message, student_id, session, chat_history)
         
         # Call Groq API
         headers = {
@@ -298,15 +332,18 @@ def chat():
             'top_p': 0.9
         }
         
-        response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=30)
+        response = groq_http.post(GROQ_API_URL, headers=headers, json=payload, timeout=TIMEOUT)
         
         if response.status_code == 200:
             result = response.json()
             bot_response = result['choices'][0]['message']['content']
+            if session:
+                summarizer.record_turn(sessions, session, user_message, bot_response, 'chat')
             return jsonify({
                 'response': bot_response,
                 'model': GROQ_MODEL,
                 'status': 'success',
+                'session_persisted': bool(session_id) and sessions.shared,
                 'timestamp': datetime.utcnow().isoformat()
             })
         else:
@@ -318,6 +355,76 @@ def chat():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Same as /api/chat, but tokens are sent as server-sent events as Groq produces them"""
+    data = request.get_json() or {}
+    user_message = data.get('message', '').strip()
+    student_id = data.get('studentId', '').strip()
+    session_id = data.get('session_id', '').strip()
+    
+    if not user_message:
+        return jsonify({'error': 'Message is required'}), 400
+    
+    if not GROQ_API_KEY:
+        return jsonify({'error': 'Groq API key not configured'}), 500
+    
+    session = sessions.get(session_id) if session_id else None
+    messages = build_messages(user_message, student_id, session, data.get('history', []))
+    
+    def generate():
+        started = time.perf_counter()
+        first_token_ms = None
+        parts = []
+        
+        yield sse_event('meta', {'model': GROQ_MODEL, 'session_persisted': bool(session_id) and sessions.shared})
+        
+        try:
+            with groq_http.post(
+                GROQ_API_URL,
+                headers={'Authorization': f'Bearer {GROQ_API_KEY}', 'Content-Type': 'application/json'},
+                json={'model': GROQ_MODEL, 'messages': messages, 'temperature': 0.7,
+                      'max_tokens': 800, 'top_p': 0.9, 'stream': True},
+                timeout=TIMEOUT,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    yield sse_event('error', {'error': 'Failed to get response from LLM', 'details': response.text})
+                    return
+                
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    chunk = line[5:].strip()
+                    if chunk == '[DONE]':
+                        break
+                    
+                    delta = json.loads(chunk)['choices'][0].get('delta', {}).get('content')
+                    if delta:
+                        if first_token_ms is None:
+                            first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                        parts.append(delta)
+                        yield sse_event('token', {'text': delta})
+        except Exception as e:
+            yield sse_event('error', {'error': str(e)})
+            return
+        
+        bot_response = ''.join(parts)
+        if session:
+            summarizer.record_turn(sessions, session, user_message, bot_response, 'chat')
+        
+        yield sse_event('done', {
+            'response': bot_response,
+            'ttft_ms': first_token_ms,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # Student lookup endpoint
 @app.route('/api/student/<student_id>', methods=['GET'])
 def get_student(student_id):
@@ -7,7 +7,7 @@ Serverless-ready Flask app for Vercel deployment
 import os
 import json
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
@@ -21,6 +21,9 @@ app = Flask(__name__,
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'campus-chatbot-secret-key-change-me')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# Most messages one /api/chat/batch call may carry
+BATCH_MAX_SIZE = int(os.getenv('CHAT_BATCH_MAX_SIZE', '200'))
+
 # Enable CORS
 CORS(app, resources={r"/*": {"origins": "*"}})
 
@@ -41,7 +44,7 @@ def init_app():
             
             config_manager = ConfigManager()
             chatbot = CampusChatbot(config_manager)
-            doc_processor = DocumentProcessor(config_manager)
+            doc_processor = DocumentProcessor(config_manager, knowledge_base=chatbot.knowledge_base)
             
             print("✅ Campus AI Chatbot initialized")
         except Exception as e:
@@ -92,7 +95,7 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'llm_provider': os.getenv('LLM_PROVIDER', 'ollama'),
+        'llm_provider': os.getenv('LLM_PROVIDER', 'groq'),
         'version': '1.0.0'
     })
 
@@ -119,6 +122,68 @@ def chat():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    """Answer a list of chat messages (bulk FAQ generation, regression runs)"""
+    try:
+        data = request.get_json(silent=True)
+        items = data.get('requests') if isinstance(data, dict) else None
+
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'No requests provided'}), 400
+
+        if len(items) > BATCH_MAX_SIZE:
+            return jsonify({'error': f'Too many requests (max {BATCH_MAX_SIZE} per batch)'}), 400
+
+        pairs = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                return jsonify({'error': f'Request {index} must be an object'}), 400
+            message = item.get('message')
+            session_id = item.get('session_id', 'default')
+            if not isinstance(message, str) or not 1 <= len(message.strip()) <= 500:
+                return jsonify({'error': f'Request {index}: message must be 1-500 characters'}), 400
+            if not isinstance(session_id, str):
+                return jsonify({'error': f'Request {index}: session_id must be a string'}), 400
+            pairs.append((message.strip(), session_id))
+
+        return jsonify({'results': chatbot.get_responses(pairs)})
+
+    except Exception as e:
+        print(f"Batch chat error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/chat/stream', methods=['GET', 'POST'])
+def chat_stream():
+    """Stream a chat response as server-sent events"""
+    data = request.get_json(silent=True) or request.values
+    user_message = data.get('message', '').strip()
+    session_id = data.get('session_id', 'default')
+    
+    if not user_message:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    if len(user_message) > 500:
+        return jsonify({'error': 'Message too long (max 500 characters)'}), 400
+    
+    def generate():
+        try:
+            for event, payload in chatbot.stream_response(user_message, session_id):
+                yield sse_event(event, payload)
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            yield sse_event('error', {'error': str(e)})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/api/config', methods=['GET'])
 def get_config():
     """Get public configuration"""
@@ -133,10 +198,7 @@ def update_config():
         success = config_manager.update_config(data)
         
         if success:
-            # Reload chatbot with new config
-            global chatbot
-            chatbot = CampusChatbot(config_manager)
-            
+            # The chatbot re-renders its prompt and templates on the next request
             return jsonify({
                 'status': 'success',
                 'message': 'Configuration updated successfully'
@@ -217,7 +279,8 @@ def upload_asset():
 def list_documents():
     """List all uploaded documents"""
     try:
-        documents = doc_processor.get_processed_documents()
+        category = request.args.get('category')
+        documents = doc_processor.get_processed_documents(category)
         return jsonify({'documents': documents})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -275,24 +338,13 @@ def get_stats():
         return jsonify({
             'chatbot': stats,
             'knowledge_base': kb_stats,
-            'documents': len(doc_processor.get_processed_documents())
+            'documents': doc_processor.count_documents(),
+            'documents_by_category': doc_processor.manifest.count_by_category()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-# ==================== HEALTH CHECK ====================
-
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health check endpoint for Vercel"""
-    return jsonify({
-        'status': 'healthy',
-        'llm_provider': os.getenv('LLM_PROVIDER', 'groq'),
-        'timestamp': datetime.now().isoformat()
-    })
-
-
 # ==================== ERROR HANDLERS ====================
 
 @app.errorhandler(404)
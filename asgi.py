@@ -0,0 +1,92 @@
+"""
+Campus AI Chatbot - ASGI Entry Point
+=====================================
+Async chat endpoint for high-concurrency deployments
+
+    uvicorn asgi:app --workers 2
+
+POST /api/chat is handled natively with CampusChatbot.aget_response, so
+a worker is not tied up while the LLM call is in flight. Every other
+route is served by the Flask app through asgiref's WSGI adapter.
+"""
+
+import json
+
+import app_backup
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+    flask_asgi = WsgiToAsgi(app_backup.app)
+except ImportError:
+    print("⚠️  asgiref not installed; only /api/chat is served. Install with: pip install asgiref")
+    flask_asgi = None
+
+
+async def read_body(receive) -> bytes:
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+async def send_json(send, payload: dict, status: int = 200):
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'access-control-allow-origin', b'*')
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def chat(receive, send):
+    """Async twin of the Flask /api/chat route"""
+    try:
+        data = json.loads(await read_body(receive) or b'{}')
+        user_message = data.get('message', '').strip()
+        session_id = data.get('session_id', 'default')
+
+        if not user_message:
+            return await send_json(send, {'error': 'No message provided'}, 400)
+
+        if len(user_message) > 500:
+            return await send_json(send, {'error': 'Message too long (max 500 characters)'}, 400)
+
+        response = await app_backup.chatbot.aget_response(user_message, session_id)
+        await send_json(send, response)
+
+    except Exception as e:
+        print(f"Chat error: {e}")
+        await send_json(send, {'error': str(e)}, 500)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if app_backup.chatbot is not None:
+                await app_backup.chatbot.llm.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    if scope['type'] == 'http' and scope['path'] == '/api/chat' and scope['method'] == 'POST':
+        return await chat(receive, send)
+
+    if flask_asgi is not None:
+        return await flask_asgi(scope, receive, send)
+
+    await send_json(send, {'error': 'Not found'}, 404)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""
+Bulk Document Ingest
+====================
+Seed the knowledge base from a directory of handbook PDFs.
+
+    python ingest_documents.py handbooks/ --workers 4
+
+PDFs inside a sub-folder named after a category (fees/, exams/, hostel/,
+library/) are filed under it; everything else is auto-categorized. A
+manifest records each file's hash and result, so re-running skips files
+that are already ingested (or whose content was already uploaded), and a
+changed file replaces its previous document and chunks. Exits non-zero
+if any file fails, for CI.
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from src.config_manager import ConfigManager
+from src.knowledge_base import KnowledgeBase
+from src.document_processor import DocumentProcessor
+
+CATEGORIES = ['fees', 'exams', 'hostel', 'library', 'general']
+
+# Per-process extraction worker (set up by _init_worker)
+_worker: Optional[DocumentProcessor] = None
+
+
+def _init_worker(config_path: str, documents_dir: str):
+    global _worker
+    _worker = DocumentProcessor(ConfigManager(config_path), documents_dir=documents_dir)
+
+
+def _extract(path: str, category: str, content_hash: str) -> Dict[str, Any]:
+    """Extract and chunk one PDF inside a worker process"""
+    start = time.perf_counter()
+    try:
+        extracted = _worker.extract_chunks(path, category, content_hash)
+        if extracted is None:
+            return {'status': 'error', 'error': 'Could not extract meaningful text from PDF',
+                    'seconds': time.perf_counter() - start}
+        extracted['status'] = 'success'
+    except Exception as e:
+        return {'status': 'error', 'error': str(e), 'seconds': time.perf_counter() - start}
+
+    extracted['seconds'] = time.perf_counter() - start
+    return extracted
+
+
+def find_pdfs(root: str) -> List[str]:
+    """All PDFs under root, in a stable order"""
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith('.pdf'):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+def category_for(path: str, root: str, default: str) -> str:
+    """Use the first folder under root if it names a category"""
+    relative = os.path.relpath(path, root)
+    folder = relative.split(os.sep)[0] if os.sep in relative else ''
+    return folder if folder in CATEGORIES else default
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Manifest unreadable, starting fresh: {e}")
+    return {'files': {}}
+
+
+def save_manifest(manifest: Dict[str, Any], path: str):
+    """Write atomically so an interrupted run leaves a usable manifest"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def ingest(args) -> Dict[str, Any]:
+    manifest = load_manifest(args.manifest)
+    knowledge_base = KnowledgeBase(args.kb_dir)
+    processor = DocumentProcessor(ConfigManager(args.config), knowledge_base=knowledge_base,
+                                  documents_dir=args.documents_dir)
+
+    # Work out what still needs ingesting
+    pending = {}
+    queued: Dict[str, str] = {}
+    skipped = 0
+    for path in find_pdfs(args.source):
+        key = os.path.relpath(path, args.source)
+        sha = DocumentProcessor.file_sha256(path)
+        entry = manifest['files'].get(key)
+
+        if entry and entry.get('sha256') == sha and entry.get('status') == 'success' and not args.force:
+            skipped += 1
+            continue
+
+        # Same content already stored (another path, or uploaded through the app)
+        existing = processor.manifest.find_by_hash(sha)
+        duplicate = existing['filename'] if existing and not args.force else queued.get(sha)
+        if duplicate:
+            skipped += 1
+            print(f"   ⏭️  {key}: same content as {duplicate}")
+            continue
+        queued[sha] = key
+
+        # Documents this file replaces once it re-ingests cleanly
+        replaces = {e['filename'] for e in (entry, existing) if e and e.get('filename')}
+        pending[key] = {'path': path, 'sha256': sha, 'replaces': sorted(replaces),
+                        'category': category_for(path, args.source, args.category)}
+
+    print(f"\n📚 {len(pending)} PDF(s) to ingest, {skipped} already ingested")
+
+    totals = {'files': 0, 'failed': 0, 'pages': 0, 'chunks': 0}
+    wall_start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.config, args.documents_dir)) as pool:
+        futures = {pool.submit(_extract, item['path'], item['category'], item['sha256']): key
+                   for key, item in pending.items()}
+
+        # Knowledge base writes stay in this process, one batch per file
+        for future in as_completed(futures):
+            key = futures[future]
+            item = pending[key]
+            result = future.result()
+            entry = {
+                'sha256': item['sha256'],
+                'size': os.path.getsize(item['path']),
+                'status': result['status'],
+                'seconds': round(result['seconds'], 3),
+                'ingested_at': datetime.now().isoformat()
+            }
+
+            if result['status'] == 'success':
+                filename = processor.build_filename(os.path.basename(item['path']), item['category'])
+                shutil.copyfile(item['path'], os.path.join(args.documents_dir, filename))
+
+                # The app's workers may be changing the store too
+                with processor.manifest.locked():
+                    # Drop the previous version's file and chunks before storing the new ones
+                    for old_filename in item['replaces']:
+                        processor.delete_document(old_filename)
+                    doc_ids = processor.store_chunks(filename, result['category'], result['chunks'])
+                    processor.register_document(filename, result['category'], doc_ids, item['sha256'])
+
+                pages = result['extraction']['pages']
+                entry.update({'filename': filename, 'category': result['category'],
+                              'pages': pages, 'chunks': len(doc_ids)})
+                totals['files'] += 1
+                totals['pages'] += pages
+                totals['chunks'] += len(doc_ids)
+                print(f"   ✅ {key}: {pages} pages, {len(doc_ids)} chunks, "
+                      f"{result['seconds']:.2f}s → {result['category']}")
+            else:
+                # The previous version stays stored; remember it so a later run still replaces it
+                previous = manifest['files'].get(key, {}).get('filename')
+                if previous:
+                    entry['filename'] = previous
+                entry['error'] = result['error']
+                totals['failed'] += 1
+                print(f"   ❌ {key}: {result['error']}")
+
+            manifest['files'][key] = entry
+            save_manifest(manifest, args.manifest)
+
+    elapsed = time.perf_counter() - wall_start
+    report = dict(totals, skipped=skipped, seconds=round(elapsed, 3),
+                  pages_per_sec=round(totals['pages'] / elapsed, 2) if elapsed else 0.0,
+                  chunks_per_sec=round(totals['chunks'] / elapsed, 2) if elapsed else 0.0)
+
+    print(f"\n📊 Ingested {totals['files']} file(s), {totals['failed']} failed, in {elapsed:.2f}s")
+    print(f"   {report['pages_per_sec']} pages/sec, {report['chunks_per_sec']} chunks/sec")
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Bulk-ingest handbook PDFs into the knowledge base')
+    parser.add_argument('source', help='Directory to scan for PDFs')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                        help='Parallel extraction processes')
+    parser.add_argument('--category', default='general', choices=CATEGORIES,
+                        help='Category for files outside a category folder (general = auto-detect)')
+    parser.add_argument('--manifest', default='data/ingest_manifest.json',
+                        help='Resumable manifest of ingested files')
+    parser.add_argument('--config', default='config/campus_config.json')
+    parser.add_argument('--documents-dir', default='documents')
+    parser.add_argument('--kb-dir', default='data/knowledge_base')
+    parser.add_argument('--force', action='store_true', help='Re-ingest files already in the manifest')
+    parser.add_argument('--report', help='Write the throughput report as JSON to this path')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.source):
+        print(f"❌ Not a directory: {args.source}")
+        return 2
+
+    report = ingest(args)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
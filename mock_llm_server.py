@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+Mock LLM Server
+===============
+Local OpenAI-compatible stand-in for Groq/Together, for tests and load runs.
+
+    python mock_llm_server.py --port 8090 --ttft-ms 300 --token-ms 20
+
+    GROQ_BASE_URL=http://localhost:8090/v1 GROQ_API_KEY=test python app_backup.py
+
+Serves GET /v1/models and POST /v1/chat/completions (plain JSON, or
+server-sent events with "stream": true). Replies are canned text built
+from the prompt, delayed by --ttft-ms before the first token and
+--token-ms between tokens, so latency and streaming behave like a real
+provider without a key or network. Uses only the standard library.
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = ("Thanks for your question. Based on the campus information available, "
+         "here is what I found about {topic}. Please contact the relevant office "
+         "if you need further details.")
+
+
+def reply_for(messages, max_tokens: int) -> list:
+    """Canned reply as a list of word tokens (at most max_tokens)"""
+    question = messages[-1].get('content', '') if messages else ''
+    topic = ' '.join(question.split()[-6:]).strip(' ?.') or 'your question'
+    words = REPLY.format(topic=topic).split(' ')
+    return [word + ' ' for word in words[:max(1, max_tokens)]]
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    model = 'mock-llm'
+    ttft = 0.3
+    token_delay = 0.02
+    fail_rate = 0.0
+
+    def _send_json(self, status: int, data: dict):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': self.model, 'object': 'model'}]})
+        else:
+            self._send_json(404, {'error': {'message': 'Not found'}})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON'}})
+            return
+
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found'}})
+            return
+
+        if random.random() < self.fail_rate:
+            self._send_json(503, {'error': {'message': 'Simulated overload'}})
+            return
+
+        tokens = reply_for(payload.get('messages', []), int(payload.get('max_tokens') or 300))
+        model = payload.get('model', self.model)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        time.sleep(self.ttft)
+
+        if payload.get('stream'):
+            self._stream(completion_id, model, tokens)
+            return
+
+        time.sleep(self.token_delay * (len(tokens) - 1))
+        self._send_json(200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': ''.join(tokens).strip()}}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': len(tokens), 'total_tokens': len(tokens)}
+        })
+
+    def _stream(self, completion_id: str, model: str, tokens: list):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+
+        def event(delta: dict, finish_reason=None):
+            chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                     'model': model, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        event({'role': 'assistant'})
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(self.token_delay)
+            event({'content': token})
+        event({}, finish_reason='stop')
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Run a local OpenAI-compatible mock LLM server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--model', default='llama-3.1-8b-instant',
+                        help='Model id listed by /v1/models (match GROQ_MODEL)')
+    parser.add_argument('--ttft-ms', type=float, default=300, help='Delay before the first token')
+    parser.add_argument('--token-ms', type=float, default=20, help='Delay between tokens')
+    parser.add_argument('--fail-rate', type=float, default=0.0,
+                        help='Fraction of completions answered with 503 (0-1)')
+    parser.add_argument('--quiet', action='store_true', help='Do not log each request')
+    args = parser.parse_args()
+
+    MockLLMHandler.model = args.model
+    MockLLMHandler.ttft = args.ttft_ms / 1000
+    MockLLMHandler.token_delay = args.token_ms / 1000
+    MockLLMHandler.fail_rate = args.fail_rate
+
+    server = ThreadingHTTPServer((args.host, args.port), MockLLMHandler)
+    server.daemon_threads = True
+    server.quiet = args.quiet
+    print(f"🧪 Mock LLM server on http://{args.host}:{args.port}/v1 (model: {args.model})")
+    print(f"   GROQ_BASE_URL=http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Mock LLM server stopped")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
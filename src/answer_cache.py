@@ -0,0 +1,167 @@
+"""
+Answer Cache - Skip the LLM for Repeated Questions
+===================================================
+Cache of generated answers keyed by question, intent and retrieved context
+"""
+
+import re
+import math
+import time
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+
+# Ignored when comparing queries for similarity
+STOPWORDS = frozenset('a an the is are was were do does did what when where which who how '
+                      'i me my we our you your can could please tell about of for to in on at '
+                      'and or with there any'.split())
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of LLM answers.
+
+    Entries are keyed by (normalized query, intent, context fingerprint),
+    so an answer is only reused when the same documents were retrieved.
+    With similarity_threshold > 0, a query that misses exactly is matched
+    against other queries that retrieved the same context by cosine
+    similarity of their word counts. The cache empties itself whenever
+    the knowledge base version changes.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 3600,
+                 similarity_threshold: float = 0.9):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: 'OrderedDict[Tuple[str, str, str], Dict[str, Any]]' = OrderedDict()
+        # (intent, fingerprint) -> normalized queries cached for that context
+        self._buckets: Dict[Tuple[str, str], Dict[str, Counter]] = {}
+        self._kb_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.latency_saved = 0.0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercase, drop punctuation, collapse whitespace"""
+        return ' '.join(re.sub(r'[^\w\s]', ' ', query.lower()).split())
+
+    @staticmethod
+    def fingerprint(context: Union[str, List[str]]) -> str:
+        """Hash of the retrieved context (text, or list of source texts)"""
+        if not isinstance(context, str):
+            context = '\x1e'.join(context)
+        return hashlib.sha1(context.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _vector(norm: str) -> Counter:
+        return Counter(word for word in norm.split() if word not in STOPWORDS)
+
+    @staticmethod
+    def _cosine(a: Counter, b: Counter) -> float:
+        dot = sum(count * b.get(word, 0) for word, count in a.items())
+        if not dot or not a or not b:
+            return 0.0
+        norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+        return dot / norm
+
+    def _check_version(self, kb_version: int):
+        if kb_version != self._kb_version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._buckets.clear()
+            self._kb_version = kb_version
+
+    def _drop(self, key: Tuple[str, str, str]):
+        self._entries.pop(key, None)
+        bucket = self._buckets.get(key[1:])
+        if bucket is not None:
+            bucket.pop(key[0], None)
+            if not bucket:
+                del self._buckets[key[1:]]
+
+    def _lookup(self, key: Tuple[str, str, str], now: float) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry['stored_at'] > self.ttl_seconds:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, query: str, intent: str, context: Union[str, List[str]], kb_version: int) -> Optional[str]:
+        """Cached answer for this question and context, if any"""
+        norm = self.normalize(query)
+        fingerprint = self.fingerprint(context)
+        now = time.time()
+
+        with self._lock:
+            self._check_version(kb_version)
+
+            entry = self._lookup((norm, intent, fingerprint), now)
+            if entry is not None:
+                self.hits += 1
+            elif self.similarity_threshold > 0:
+                vector = self._vector(norm)
+                best, best_score = None, self.similarity_threshold
+                for other, other_vector in self._buckets.get((intent, fingerprint), {}).items():
+                    score = self._cosine(vector, other_vector)
+                    if score >= best_score:
+                        best, best_score = other, score
+
+                if best is not None:
+                    entry = self._lookup((best, intent, fingerprint), now)
+                    if entry is not None:
+                        self.similar_hits += 1
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.latency_saved += entry['latency']
+            return entry['response']
+
+    def put(self, query: str, intent: str, context: Union[str, List[str]], kb_version: int,
+            response: str, latency: float):
+        """Store an answer with the time it took to generate"""
+        norm = self.normalize(query)
+        fingerprint = self.fingerprint(context)
+        key = (norm, intent, fingerprint)
+
+        with self._lock:
+            self._check_version(kb_version)
+
+            self._drop(key)
+            self._entries[key] = {'response': response, 'latency': latency, 'stored_at': time.time()}
+            self._buckets.setdefault((intent, fingerprint), {})[norm] = self._vector(norm)
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.invalidations += 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'similar_hits': self.similar_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.similar_hits) / lookups, 3) if lookups else 0.0,
+            'latency_saved_seconds': round(self.latency_saved, 3),
+            'invalidations': self.invalidations
+        }
@@ -5,14 +5,30 @@ Intelligent campus assistant with FREE LLM support
 """
 
 import os
+import time
 import uuid
-import json
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Iterator
 
 from src.config_manager import ConfigManager
 from src.knowledge_base import KnowledgeBase
-from src.llm_provider import LLMProvider
+from src.llm_provider import FALLBACK_RESPONSE, LLMProviderError
+from src.llm_router import create_llm
+from src.rate_limiter import LLMRateLimited, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from src.keyword_matcher import KeywordMatcher
+from src.session_store import create_session_backend, Session
+from src.answer_cache import AnswerCache
+from src.prompt_builder import PromptBuilder, format_sources
+from src.response_tables import ResponseTables
+from src.fast_path import FastPathAnswerer
+from src.single_flight import SingleFlight
+from src.metrics import Metrics
+from src.conversation_summary import ConversationSummarizer
+from src.feedback_writer import FeedbackWriter
+from src.stats_counters import StatsCounters
 
 
 class CampusChatbot:
@@ -21,10 +37,41 @@ class CampusChatbot:
     def __init__(self, config_manager: ConfigManager):
         self.config = config_manager
         self.knowledge_base = KnowledgeBase()
-        self.llm = LLMProvider()
+        self.llm = create_llm()
         
-        self.sessions: Dict[str, Dict] = {}
-        self.feedback_log: List[Dict] = []
+        timeout_minutes = self.config.get_value('chatbot_settings', 'session_timeout_minutes', default=30)
+        self.sessions = create_session_backend(ttl_seconds=float(timeout_minutes) * 60)
+        self.feedback = FeedbackWriter(
+            path='data/feedback.jsonl',
+            max_queue=int(os.getenv('FEEDBACK_QUEUE_SIZE', '10000')),
+            fsync=os.getenv('FEEDBACK_FSYNC', 'interval').lower(),
+            fsync_interval=float(os.getenv('FEEDBACK_FSYNC_INTERVAL', '5'))
+        )
+        
+        # Retrieval for the async path runs here, off the event loop
+        self._retrieval_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv('RETRIEVAL_THREADS', '4')),
+            thread_name_prefix='retrieval'
+        )
+        
+        self.stream_stats = {'streams': 0, 'ttft_total': 0.0, 'ttft_max': 0.0,
+                             'llm_rates': 0, 'tokens_per_second_total': 0.0}
+        self.metrics = Metrics()
+        # Persistent totals (messages, sessions, intents, feedback) for O(1) stats
+        self.counters = StatsCounters(os.getenv('STATS_PATH', 'data/stats.db'))
+        self.sessions.on_created = lambda count: self.counters.incr('sessions_started', count)
+        
+        self.answer_cache = AnswerCache(
+            max_entries=int(os.getenv('ANSWER_CACHE_SIZE', '1000')),
+            ttl_seconds=float(os.getenv('ANSWER_CACHE_TTL_SECONDS', '3600')),
+            similarity_threshold=float(os.getenv('ANSWER_CACHE_SIMILARITY', '0.9'))
+        )
+        
+        # Concurrent identical questions share one LLM call
+        self.single_flight = SingleFlight(
+            timeout=float(os.getenv('COALESCE_TIMEOUT_SECONDS', '30')),
+            enabled=os.getenv('COALESCE_REQUESTS', 'true').lower() == 'true'
+        )
         
         # Intent classification keywords
         self.intent_keywords = {
@@ -34,151 +81,231 @@ class CampusChatbot:
             'library': ['library', 'book', 'journal', 'borrow', 'return', 'fine', 'reading', 'catalogue', 'e-resource'],
             'general': ['contact', 'office', 'timing', 'holiday', 'calendar', 'event', 'admission', 'course']
         }
+        self.intent_matcher = KeywordMatcher(self.intent_keywords)
         
-        self.system_prompt = self._create_system_prompt()
+        self.prompt_builder = PromptBuilder(config_manager)
+        # Turns leaving the prompt's history window are folded into a rolling summary
+        self.summarizer = ConversationSummarizer(
+            window=self.prompt_builder.history_turns,
+            max_tokens=int(os.getenv('SUMMARY_MAX_TOKENS', '150')),
+            mode=os.getenv('SUMMARY_MODE', 'extractive').lower(),
+            llm=self.llm
+        )
+        # Answers straight from a confident retrieval, without the LLM
+        self.fast_path = FastPathAnswerer(
+            min_score=float(os.getenv('FAST_PATH_MIN_SCORE', '0.8')),
+            min_margin=float(os.getenv('FAST_PATH_MIN_MARGIN', '0.25')),
+            min_matches=int(os.getenv('FAST_PATH_MIN_MATCHES', '2')),
+            enabled=os.getenv('FAST_PATH_ENABLED', 'true').lower() == 'true'
+        )
+        # Templates, actions and department info, re-rendered when the config changes
+        self.tables = ResponseTables(config_manager)
         
         print(f"🤖 Chatbot '{self.config.get_value('chatbot_settings', 'bot_name')}' ready!")
     
-    def _create_system_prompt(self) -> str:
-        """Create system prompt for LLM"""
-        campus_name = self.config.get_value('campus_info', 'name', default='University')
-        bot_name = self.config.get_value('chatbot_settings', 'bot_name', default='CampusBot')
-        
-        return f"""You are {bot_name}, an AI assistant for {campus_name}.
-
-Your role: Help students, faculty, and visitors with campus queries.
-
-You can help with:
-- Fee structure and payment details
-- Exam schedules and academic calendar
-- Hostel rules and accommodation
-- Library services and timings
-- General campus information
-
-Guidelines:
-1. Be friendly, professional, and helpful
-2. Provide accurate information based on university documents
-3. If unsure, suggest contacting the relevant department
-4. Keep responses concise (2-4 sentences)
-5. Format responses clearly with bullet points when needed
-6. Always provide contact info when relevant
-
-When you lack specific information, clearly state that and suggest alternatives."""
+    def _get_session(self, session_id: str) -> Session:
+        """Get or create session (the store counts sessions_started as it creates them)"""
+        return self.sessions.get(session_id)
     
-    def _get_session(self, session_id: str) -> Dict:
-        """Get or create session"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                'id': session_id,
-                'created_at': datetime.now().isoformat(),
-                'history': [],
-                'context': {}
-            }
-        return self.sessions[session_id]
+    def _record_turn(self, session: Session, message: str, response_text: str, intent: str, source: str):
+        """Store the turn in the session (updating its summary) and bump the running totals"""
+        self.summarizer.record_turn(self.sessions, session, message, response_text, intent)
+        self.counters.incr('messages')
+        self.counters.incr_group('intents', intent)
+        self.counters.incr_group('sources', source)
     
     def _classify_intent(self, message: str) -> str:
         """Classify user intent"""
-        message_lower = message.lower()
+        with self.metrics.time('classify'):
+            return self.intent_matcher.classify(message)
+    
+    def _classify_intents(self, messages: List[str]) -> List[str]:
+        """Classify a batch of messages in one pass"""
+        with self.metrics.time('classify_batch'):
+            return self.intent_matcher.classify_batch(messages)
+    
+    def _get_context_from_kb(self, query: str, intent: str) -> Tuple[List[str], List[float]]:
+        """Retrieve relevant sources (best first) and their scores from knowledge base"""
+        with self.metrics.time('retrieval'):
+            results = self.knowledge_base.search(query, category=intent, top_k=3)
+        return [result['content'] for result in results], [result['score'] for result in results]
+    
+    def _build_prompt(self, query: str, context: List[str], session: Session) -> Tuple[str, int]:
+        """Assemble the LLM prompt within the token budget; returns (prompt, tokens)"""
+        with self.metrics.time('prompt'):
+            return self.prompt_builder.build(query, context, session.recent(self.prompt_builder.history_turns),
+                                             session.summary)
+    
+    def _fast_answer(self, query: str, context: List[str], scores: Optional[List[float]],
+                     intent: str) -> Optional[str]:
+        """Answer from the top source when retrieval is confident enough"""
+        if not scores:
+            return None
         
-        scores = {}
-        for intent, keywords in self.intent_keywords.items():
-            score = sum(1 for kw in keywords if kw in message_lower)
-            scores[intent] = score
+        with self.metrics.time('fast_path'):
+            excerpt = self.fast_path.answer(query, context, scores)
+        if excerpt is None:
+            return None
         
-        if scores:
-            best_intent = max(scores, key=scores.get)
-            if scores[best_intent] > 0:
-                return best_intent
+        self.metrics.incr('fast_path')
+        if self.llm.is_available():
+            self.fast_path.record_saving(self.metrics.average('llm'))
         
-        return 'general'
+        footer = self.tables.footer(intent)
+        return f"Based on our university documents:\n\n{excerpt}" + (f"\n\n{footer}" if footer else '')
     
-    def _get_context_from_kb(self, query: str, intent: str) -> str:
-        """Retrieve relevant context from knowledge base"""
-        results = self.knowledge_base.search(query, category=intent, top_k=3)
-        
-        if results:
-            context_parts = []
-            for i, result in enumerate(results, 1):
-                context_parts.append(f"[Source {i}]:\n{result['content'][:500]}")
-            
-            return "\n\n".join(context_parts)
+    def _cached_answer(self, query: str, context: List[str], intent: str) -> Optional[str]:
+        """Answer cache lookup (only worth it when the LLM would otherwise run)"""
+        if not self.llm.is_available():
+            return None
+        cached = self.answer_cache.get(query, intent, context, self.knowledge_base.version)
+        if cached is not None:
+            self.metrics.incr('cache_hits')
+        return cached
+    
+    def _accept_llm_response(self, query: str, context: List[str], intent: str, kb_version: int,
+                             response: Optional[str], latency: float) -> Optional[str]:
+        """Keep a usable LLM answer (and cache it); None means fall back to templates"""
+        self.metrics.observe('llm', latency)
+        self.metrics.incr('llm_calls')
+        if response and len(response.strip()) > 20 and response.strip() != FALLBACK_RESPONSE:
+            response = response.strip()
+            self.answer_cache.put(query, intent, context, kb_version, response, latency)
+            return response
+        self.metrics.incr('llm_rejected')
+        return None
+    
+    def _flight_key(self, query: str, context: List[str], intent: str) -> Tuple[str, str, str]:
+        """Requests with the same key can share one LLM answer (same rule as the answer cache)"""
+        return AnswerCache.normalize(query), intent, AnswerCache.fingerprint(context)
+    
+    def _llm_answer(self, query: str, context: List[str], session: Session, intent: str,
+                    priority: int = PRIORITY_INTERACTIVE) -> Tuple[Optional[str], int]:
+        """One LLM call; returns (accepted answer or None, prompt tokens)"""
+        prompt_tokens = 0
+        try:
+            prompt, prompt_tokens = self._build_prompt(query, context, session)
+            kb_version = self.knowledge_base.version
+            start = time.perf_counter()
+            response = self.llm.generate(prompt, max_tokens=300, priority=priority, strict=True)
+            return self._accept_llm_response(query, context, intent, kb_version,
+                                             response, time.perf_counter() - start), prompt_tokens
+        except LLMRateLimited as e:
+            self._note_shed(e)
+            return None, prompt_tokens
+        except Exception as e:
+            self.metrics.incr('llm_errors')
+            print(f"LLM generation error: {e}")
+            return None, prompt_tokens
+    
+    async def _allm_answer(self, query: str, context: List[str], session: Session,
+                           intent: str) -> Tuple[Optional[str], int]:
+        """Async _llm_answer"""
+        prompt_tokens = 0
+        try:
+            prompt, prompt_tokens = self._build_prompt(query, context, session)
+            kb_version = self.knowledge_base.version
+            start = time.perf_counter()
+            response = await self.llm.agenerate(prompt, max_tokens=300, strict=True)
+            return self._accept_llm_response(query, context, intent, kb_version,
+                                             response, time.perf_counter() - start), prompt_tokens
+        except LLMRateLimited as e:
+            self._note_shed(e)
+            return None, prompt_tokens
+        except Exception as e:
+            self.metrics.incr('llm_errors')
+            print(f"LLM generation error: {e}")
+            return None, prompt_tokens
+    
+    def _note_shed(self, error: LLMRateLimited):
+        """The rate limiter turned the call away; the caller answers from templates"""
+        self.metrics.incr('llm_shed')
+        print(f"⏳ {error}; answering from templates")
+    
+    def _shared_answer(self, outcome: Optional[Tuple[Optional[str], int]],
+                       shared: bool) -> Tuple[Optional[str], str, int]:
+        """(answer, source, prompt tokens) from a single-flight outcome"""
+        if not shared:
+            response, prompt_tokens = outcome
+            return response, 'llm', prompt_tokens
         
-        return ""
+        # Followers got the leader's answer (or None on failure/timeout) without a call
+        response = outcome[0] if outcome else None
+        if response:
+            self.metrics.incr('coalesced')
+        return response, 'coalesced', 0
     
-    def _generate_response(self, query: str, context: str, session: Dict, intent: str) -> str:
-        """Generate response using LLM or fallback"""
+    def _generate_response(self, query: str, context: List[str], session: Session, intent: str,
+                           scores: Optional[List[float]] = None,
+                           priority: int = PRIORITY_INTERACTIVE) -> Tuple[str, str, int]:
+        """Generate response using fast path, cache, LLM or fallback; returns (text, source, prompt tokens)"""
+        fast = self._fast_answer(query, context, scores, intent)
+        if fast is not None:
+            return fast, 'fast_path', 0
         
-        # Build conversation history
-        history_text = ""
-        for msg in session['history'][-3:]:  # Last 3 exchanges
-            history_text += f"User: {msg['user']}\nAssistant: {msg['bot']}\n\n"
+        cached = self._cached_answer(query, context, intent)
+        if cached is not None:
+            return cached, 'cache', 0
         
-        # Create prompt
-        if context:
-            prompt = f"""{self.system_prompt}
-
-Relevant Information from University Documents:
-{context}
-
-Recent Conversation:
-{history_text}
-
-User Question: {query}
-
-Assistant Response (be helpful and concise):"""
-        else:
-            prompt = f"""{self.system_prompt}
-
-Recent Conversation:
-{history_text}
-
-User Question: {query}
-
-Assistant Response:"""
+        prompt_tokens = 0
         
-        # Try LLM generation
+        # Try LLM generation (one call per identical question in flight)
         if self.llm.is_available():
-            try:
-                response = self.llm.generate(prompt, max_tokens=300)
-                if response and len(response.strip()) > 20:
-                    return response.strip()
-            except Exception as e:
-                print(f"LLM generation error: {e}")
+            outcome, shared = self.single_flight.do(
+                self._flight_key(query, context, intent),
+                lambda: self._llm_answer(query, context, session, intent, priority)
+            )
+            response, source, prompt_tokens = self._shared_answer(outcome, shared)
+            if response:
+                return response, source, prompt_tokens
         
         # Fallback to template responses
-        return self._template_response(query, context, intent)
+        return self._fallback_response(query, context, intent), 'template', prompt_tokens
     
-    def _template_response(self, query: str, context: str, intent: str) -> str:
-        """Template-based fallback response"""
-        department = self.config.get_department_info(intent)
+    async def _agenerate_response(self, query: str, context: List[str], session: Session, intent: str,
+                                  scores: Optional[List[float]] = None) -> Tuple[str, str, int]:
+        """Async _generate_response: the LLM call is awaited instead of blocking a thread"""
+        fast = self._fast_answer(query, context, scores, intent)
+        if fast is not None:
+            return fast, 'fast_path', 0
         
+        cached = self._cached_answer(query, context, intent)
+        if cached is not None:
+            return cached, 'cache', 0
+        
+        prompt_tokens = 0
+        
+        if self.llm.is_available():
+            outcome, shared = await self.single_flight.ado(
+                self._flight_key(query, context, intent),
+                lambda: self._allm_answer(query, context, session, intent)
+            )
+            response, source, prompt_tokens = self._shared_answer(outcome, shared)
+            if response:
+                return response, source, prompt_tokens
+        
+        return self._fallback_response(query, context, intent), 'template', prompt_tokens
+    
+    def _fallback_response(self, query: str, context: List[str], intent: str) -> str:
+        """Template answer, counted and timed as a fallback"""
+        self.metrics.incr('fallbacks')
+        with self.metrics.time('template'):
+            return self._template_response(query, context, intent)
+    
+    def _template_response(self, query: str, context: List[str], intent: str) -> str:
+        """Template-based fallback response"""
         if context:
             # Extract key information from context
+            context = format_sources(context)
             context_preview = context[:400] + "..." if len(context) > 400 else context
-            response = f"Based on our university documents:\n\n{context_preview}\n\n"
-            
-            if department:
-                response += f"For more details, contact:\n📧 {department.get('contact')}\n📞 {department.get('phone')}"
-            
-            return response
+            return f"Based on our university documents:\n\n{context_preview}\n\n" + self.tables.footer(intent)
         
         # No context - provide department info
-        templates = {
-            'fees': f"💰 **Fee Information**\n\nFor detailed fee structure and payment information:\n\n📧 Email: {department.get('contact') if department else 'fees@university.edu'}\n📞 Phone: {department.get('phone') if department else 'See admin office'}\n📍 Location: {department.get('location') if department else 'Admin Block'}\n\n💡 Tip: Upload fee structure PDFs in the admin panel for detailed answers!",
-            
-            'exams': f"📝 **Examination Information**\n\nFor exam schedules and related queries:\n\n📧 Email: {department.get('contact') if department else 'exams@university.edu'}\n📞 Phone: {department.get('phone') if department else 'See exam cell'}\n📍 Location: {department.get('location') if department else 'Academic Block'}\n\n💡 Tip: Upload exam schedule PDFs in the admin panel!",
-            
-            'hostel': f"🏠 **Hostel Information**\n\nFor hostel rules and accommodation:\n\n📧 Email: {department.get('contact') if department else 'hostel@university.edu'}\n📞 Phone: {department.get('phone') if department else 'See hostel office'}\n📍 Location: {department.get('location') if department else 'Hostel Office'}\n\n💡 Tip: Upload hostel handbook PDFs for detailed information!",
-            
-            'library': f"📚 **Library Information**\n\nFor library services and timings:\n\n📧 Email: {department.get('contact') if department else 'library@university.edu'}\n📞 Phone: {department.get('phone') if department else 'See library desk'}\n📍 Location: {department.get('location') if department else 'Central Library'}\n⏰ Hours: {department.get('hours') if department else 'Mon-Sat: 8 AM - 10 PM'}\n\n💡 Tip: Upload library handbook PDFs for complete details!",
-            
-            'general': f"I'd be happy to help! I can assist with:\n\n💰 Fee Structure\n📝 Exam Schedules\n🏠 Hostel Information\n📚 Library Services\n\nPlease ask a specific question, or contact the administration office:\n📧 {self.config.get_value('campus_info', 'contact_email')}\n📞 {self.config.get_value('campus_info', 'contact_phone')}"
-        }
-        
-        return templates.get(intent, templates['general'])
+        return self.tables.template(intent)
     
     def get_response(self, message: str, session_id: str = 'default') -> Dict[str, Any]:
         """Main method to get chatbot response"""
+        start = time.perf_counter()
         session = self._get_session(session_id)
         message_id = str(uuid.uuid4())
         
@@ -186,66 +313,242 @@ Assistant Response:"""
         intent = self._classify_intent(message)
         
         # Get context from knowledge base
-        context = self._get_context_from_kb(message, intent)
+        context, scores = self._get_context_from_kb(message, intent)
         
         # Generate response
-        response_text = self._generate_response(message, context, session, intent)
+        response_text, source, prompt_tokens = self._generate_response(message, context, session, intent, scores)
+        
+        response = self._finish_response(message_id, message, session, intent, context,
+                                         response_text, source, prompt_tokens)
+        self.metrics.observe('total', time.perf_counter() - start)
+        return response
+    
+    async def aget_response(self, message: str, session_id: str = 'default') -> Dict[str, Any]:
+        """Async get_response for ASGI servers
+        
+        Session lookup and retrieval run in the retrieval thread pool; the
+        LLM call is awaited, so one process can hold many calls in flight.
+        """
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        message_id = str(uuid.uuid4())
+        intent = self._classify_intent(message)
+        
+        session, (context, scores) = await loop.run_in_executor(
+            self._retrieval_pool, self._load_session_and_context, session_id, message, intent)
+        
+        response_text, source, prompt_tokens = await self._agenerate_response(
+            message, context, session, intent, scores)
         
+        response = self._finish_response(message_id, message, session, intent, context,
+                                         response_text, source, prompt_tokens)
+        self.metrics.observe('total', time.perf_counter() - start)
+        return response
+    
+    def get_responses(self, requests: List[Tuple[str, str]],
+                      max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Answer many (message, session_id) pairs; results come back in input order
+        
+        Intents are classified in one pass and identical retrievals run
+        once. Sessions are answered concurrently (up to the provider's
+        max_concurrency); LLM calls queue at batch priority in the rate
+        limiter, behind interactive chat. Turns within one session stay
+        sequential so each sees the history before it.
+        Each result carries a 'timings' dict, or an 'error' if it failed.
+        """
+        messages = [message for message, _ in requests]
+        intents = self._classify_intents(messages)
+        workers = max(1, max_concurrency or self.llm.max_concurrency)
+        
+        # One retrieval per distinct (message, intent)
+        retrievals: Dict[Tuple[str, str], Tuple[Tuple[List[str], List[float]], float]] = {}
+        
+        def retrieve(key: Tuple[str, str]) -> Tuple[Tuple[List[str], List[float]], float]:
+            start = time.perf_counter()
+            return self._get_context_from_kb(*key), time.perf_counter() - start
+        
+        by_session: 'OrderedDict[str, List[int]]' = OrderedDict()
+        for index, (_, session_id) in enumerate(requests):
+            by_session.setdefault(session_id, []).append(index)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        retrieved_by: Dict[Tuple[str, str], int] = {}
+        
+        def answer_session(indices: List[int]):
+            for index in indices:
+                message, session_id = requests[index]
+                key = (message, intents[index])
+                start = time.perf_counter()
+                try:
+                    (context, scores), retrieval_time = retrievals[key]
+                    session = self._get_session(session_id)
+                    
+                    generation_start = time.perf_counter()
+                    response_text, source, prompt_tokens = self._generate_response(
+                        message, context, session, intents[index], scores, priority=PRIORITY_BATCH)
+                    generation_time = time.perf_counter() - generation_start
+                    
+                    result = self._finish_response(str(uuid.uuid4()), message, session, intents[index],
+                                                   context, response_text, source, prompt_tokens)
+                    self.metrics.observe('total', time.perf_counter() - start + retrieval_time)
+                    result['timings'] = {
+                        'retrieval_ms': round(retrieval_time * 1000, 2),
+                        'retrieval_shared': retrieved_by[key] != index,
+                        'generation_ms': round(generation_time * 1000, 2),
+                        'total_ms': round((time.perf_counter() - start) * 1000, 2)
+                    }
+                except Exception as e:
+                    print(f"Batch item {index} error: {e}")
+                    result = {'error': str(e), 'intent': intents[index],
+                              'timings': {'total_ms': round((time.perf_counter() - start) * 1000, 2)}}
+                results[index] = result
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as pool:
+            for index, message in enumerate(messages):
+                retrieved_by.setdefault((message, intents[index]), index)
+            for key, value in zip(retrieved_by, pool.map(retrieve, list(retrieved_by))):
+                retrievals[key] = value
+            
+            for future in [pool.submit(answer_session, indices) for indices in by_session.values()]:
+                future.result()
+        
+        return results
+    
+    def _load_session_and_context(self, session_id: str, message: str,
+                                  intent: str) -> Tuple[Session, Tuple[List[str], List[float]]]:
+        return self._get_session(session_id), self._get_context_from_kb(message, intent)
+    
+    def _finish_response(self, message_id: str, message: str, session: Session, intent: str,
+                         context: List[str], response_text: str, source: str,
+                         prompt_tokens: int = 0) -> Dict[str, Any]:
+        """Record the turn and build the response payload"""
         # Get related actions
-        related_actions = self._get_related_actions(intent)
+        related_actions = self.tables.actions(intent)
         
         # Get department info
-        department_info = self.config.get_department_info(intent)
+        department_info = self.tables.department(intent)
         
         # Update session
-        session['history'].append({
-            'user': message,
-            'bot': response_text,
-            'timestamp': datetime.now().isoformat(),
-            'intent': intent
-        })
+        self._record_turn(session, message, response_text, intent, source)
         
         return {
             'message_id': message_id,
             'response': response_text,
             'intent': intent,
             'has_context': bool(context),
+            'source': source,
+            'prompt_tokens': prompt_tokens,
             'related_actions': related_actions,
             'department_info': department_info,
             'timestamp': datetime.now().isoformat()
         }
     
-    def _get_related_actions(self, intent: str) -> List[Dict[str, str]]:
-        """Get suggested follow-up actions"""
-        actions = {
-            'fees': [
-                {"label": "💳 Payment Methods", "query": "What payment methods are available?"},
-                {"label": "🎓 Scholarships", "query": "Tell me about scholarships"},
-                {"label": "📋 Fee Breakdown", "query": "Show detailed fee breakdown"}
-            ],
-            'exams': [
-                {"label": "📅 Full Schedule", "query": "Show complete exam schedule"},
-                {"label": "📊 Results", "query": "How to check results?"},
-                {"label": "📝 Revaluation", "query": "Revaluation process"}
-            ],
-            'hostel': [
-                {"label": "🍽️ Mess Info", "query": "Tell me about mess facilities"},
-                {"label": "🚪 Room Allocation", "query": "How is room allocation done?"},
-                {"label": "📋 Rules", "query": "What are the hostel rules?"}
-            ],
-            'library': [
-                {"label": "⏰ Timings", "query": "Library timings?"},
-                {"label": "📖 Borrowing", "query": "How to borrow books?"},
-                {"label": "💻 E-Resources", "query": "Available e-resources?"}
-            ],
-            'general': [
-                {"label": "📞 Contacts", "query": "How to contact departments?"},
-                {"label": "📅 Calendar", "query": "Academic calendar"},
-                {"label": "🗺️ Campus Info", "query": "Tell me about the campus"}
-            ]
+    def stream_response(self, message: str, session_id: str = 'default') -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Streaming variant of get_response, yielding (event, data) pairs
+        
+        Events: 'meta' (intent, actions, department) first, then 'token'
+        chunks as the LLM produces them, then 'done' with the full text.
+        If the LLM stream breaks off, 'reset' tells the client to drop the
+        partial text before the template answer is sent in its place.
+        """
+        start = time.perf_counter()
+        session = self._get_session(session_id)
+        message_id = str(uuid.uuid4())
+        
+        intent = self._classify_intent(message)
+        context, scores = self._get_context_from_kb(message, intent)
+        
+        yield 'meta', {
+            'message_id': message_id,
+            'intent': intent,
+            'has_context': bool(context),
+            'related_actions': self.tables.actions(intent),
+            'department_info': self.tables.department(intent)
         }
         
-        return actions.get(intent, actions['general'])
+        response_text, source = '', 'template'
+        prompt_tokens = 0
+        first_token_at = None
+        llm_stream = None
+        
+        fast = self._fast_answer(message, context, scores, intent)
+        if fast is not None:
+            response_text, source = fast, 'fast_path'
+            first_token_at = time.perf_counter()
+            yield 'token', {'text': fast}
+        elif self.llm.is_available():
+            cached = self._cached_answer(message, context, intent)
+            if cached is not None:
+                response_text, source = cached, 'cache'
+                first_token_at = time.perf_counter()
+                yield 'token', {'text': cached}
+            else:
+                prompt, prompt_tokens = self._build_prompt(message, context, session)
+                kb_version = self.knowledge_base.version
+                llm_start = time.perf_counter()
+                parts = []
+                try:
+                    stream = self.llm.generate_stream(prompt, max_tokens=300)
+                except LLMRateLimited as e:
+                    stream = None
+                    self._note_shed(e)
+                except LLMProviderError as e:
+                    stream = None
+                    self.metrics.incr('llm_errors')
+                    print(f"LLM streaming error: {e}")
+                
+                if stream is not None:
+                    failed = False
+                    try:
+                        for chunk in stream:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                            parts.append(chunk)
+                            yield 'token', {'text': chunk}
+                    except Exception as e:
+                        failed = True
+                        self.metrics.incr('llm_errors')
+                        print(f"LLM streaming error: {e}")
+                    
+                    llm_stream = dict(stream.stats(), failed=failed)
+                    response_text = ''.join(parts).strip()
+                    # A stream that broke off is never accepted or cached; the template follows it
+                    if not failed:
+                        if stream.ttft is not None:
+                            self.metrics.observe('llm_ttft', stream.ttft)
+                        if llm_stream['tokens_per_second']:
+                            self.stream_stats['llm_rates'] += 1
+                            self.stream_stats['tokens_per_second_total'] += llm_stream['tokens_per_second']
+                        if self._accept_llm_response(message, context, intent, kb_version,
+                                                     response_text, time.perf_counter() - llm_start):
+                            source = 'llm'
+        
+        if source == 'template':
+            # Nothing usable streamed; the template answer replaces any partial text
+            if response_text:
+                yield 'reset', {}
+            response_text = self._fallback_response(message, context, intent)
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            yield 'token', {'text': response_text}
+        
+        ttft = first_token_at - start
+        self.metrics.observe('stream_ttft', ttft)
+        self.stream_stats['streams'] += 1
+        self.stream_stats['ttft_total'] += ttft
+        self.stream_stats['ttft_max'] = max(self.stream_stats['ttft_max'], ttft)
+        
+        self._record_turn(session, message, response_text, intent, source)
+        
+        yield 'done', {
+            'message_id': message_id,
+            'response': response_text,
+            'source': source,
+            'prompt_tokens': prompt_tokens,
+            'ttft_ms': round(ttft * 1000, 1),
+            'llm_stream': llm_stream,
+            'timestamp': datetime.now().isoformat()
+        }
     
     def record_feedback(self, message_id: str, rating: int, comment: str = ""):
         """Record user feedback"""
@@ -256,24 +559,38 @@ Assistant Response:"""
             'timestamp': datetime.now().isoformat()
         }
         
-        self.feedback_log.append(feedback)
-        
-        # Save to file
-        try:
-            os.makedirs('data', exist_ok=True)
-            with open('data/feedback.jsonl', 'a', encoding='utf-8') as f:
-                f.write(json.dumps(feedback) + '\n')
-        except Exception as e:
-            print(f"Feedback save error: {e}")
+        # Written to data/feedback.jsonl by the background writer
+        self.feedback.submit(feedback)
+        self.counters.incr('feedback')
+        self.counters.incr_group('ratings', str(rating))
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get chatbot statistics"""
-        total_messages = sum(len(s['history']) for s in self.sessions.values())
+        streams = self.stream_stats['streams']
+        rates = self.stream_stats['llm_rates']
         
         return {
-            'total_sessions': len(self.sessions),
-            'total_messages': total_messages,
-            'total_feedback': len(self.feedback_log),
+            'total_sessions': self.counters.get('sessions_started'),
+            'active_sessions': len(self.sessions),
+            'total_messages': self.counters.get('messages'),
+            'sessions': self.sessions.get_statistics(),
+            'total_feedback': self.counters.get('feedback'),
+            'counters': self.counters.get_statistics(),
+            'feedback': self.feedback.get_statistics(),
+            'answer_cache': self.answer_cache.get_statistics(),
+            'prompts': self.prompt_builder.get_statistics(),
+            'summaries': self.summarizer.get_statistics(),
+            'fast_path': self.fast_path.get_statistics(),
+            'coalescing': self.single_flight.get_statistics(),
+            'latency': self.metrics.get_statistics(),
+            'streaming': {
+                'streams': streams,
+                'avg_ttft_ms': round(self.stream_stats['ttft_total'] / streams * 1000, 1) if streams else 0.0,
+                'max_ttft_ms': round(self.stream_stats['ttft_max'] * 1000, 1),
+                'avg_tokens_per_second': (round(self.stream_stats['tokens_per_second_total'] / rates, 1)
+                                          if rates else 0.0)
+            },
             'llm_provider': self.llm.provider,
+            'llm': self.llm.get_statistics(),
             'llm_available': self.llm.is_available()
         }
@@ -15,6 +15,8 @@ class ConfigManager:
     def __init__(self, config_path: str = 'config/campus_config.json'):
         self.config_path = config_path
         self.config = self._load_config()
+        # Bumped on every change so dependents can rebuild cached output
+        self.version = 0
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from JSON file"""
@@ -76,6 +78,7 @@ class ConfigManager:
                     base[key] = value
         
         deep_update(self.config, updates)
+        self.version += 1
         return self._save_config(self.config)
     
     def get_value(self, *keys: str, default: Any = None) -> Any:
@@ -105,6 +108,7 @@ class ConfigManager:
                     target[key] = {}
                 target = target[key]
             target[keys[-1]] = path
+            self.version += 1
             return self._save_config(self.config)
         return False
     
@@ -0,0 +1,140 @@
+"""
+Conversation Summary - Rolling Memory for Long Sessions
+========================================================
+Folds turns that leave the prompt's history window into a short summary
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from src.llm_provider import FALLBACK_RESPONSE
+from src.rate_limiter import PRIORITY_BACKGROUND
+from src.prompt_builder import estimate_tokens, truncate_to_tokens
+from src.session_store import Session, SessionBackend, Turn
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+
+class ConversationSummarizer:
+    """
+    Keeps prompt size flat however long a conversation runs.
+
+    Prompts carry the last `window` turns verbatim. When a turn is
+    recorded, the turn it pushes out of that window is folded into the
+    session's summary (a session storing fewer turns than `window` folds
+    each turn as storage drops it): by default extractively (the question plus the
+    first sentence of the answer, oldest lines dropped past max_tokens).
+    With mode='llm' an LLM then rewrites the summary on a background
+    thread; the extractive version is used until that finishes, so the
+    request never waits on it.
+    """
+
+    def __init__(self, window: int = 3, max_tokens: int = 150, mode: str = 'extractive',
+                 llm: Optional[Any] = None, max_pending: int = 16):
+        self.window = window
+        self.max_tokens = max_tokens
+        self.mode = mode if mode == 'llm' and llm is not None else 'extractive'
+        self.llm = llm
+        self.max_pending = max_pending
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.stats = {'folds': 0, 'llm_rewrites': 0, 'llm_failed': 0, 'llm_skipped': 0}
+
+    @staticmethod
+    def _first_sentence(text: str, max_chars: int) -> str:
+        text = ' '.join(text.split())
+        sentence = SENTENCE_END.split(text, 1)[0]
+        if len(sentence) > max_chars:
+            sentence = sentence[:max_chars - 3].rstrip() + '...'
+        return sentence
+
+    def fold(self, summary: str, turn: Turn) -> str:
+        """Summary with one more turn folded in (extractive)"""
+        line = (f"- User asked: {self._first_sentence(turn.user, 100)} "
+                f"→ {self._first_sentence(turn.bot, 140)}")
+        lines = summary.splitlines() if summary else []
+        lines.append(line)
+
+        # Drop the oldest lines until the summary fits
+        while len(lines) > 1 and estimate_tokens('\n'.join(lines)) > self.max_tokens:
+            lines.pop(0)
+
+        self.stats['folds'] += 1
+        return truncate_to_tokens('\n'.join(lines), self.max_tokens)
+
+    def record_turn(self, sessions: SessionBackend, session: Session,
+                    user: str, bot: str, intent: str) -> Turn:
+        """Append a turn and fold the one leaving the history window
+
+        session is the snapshot fetched for this request, before the turn.
+        """
+        # The store keeps only history.maxlen turns; past that, turns leave on append
+        window = min(self.window, session.history.maxlen or self.window)
+        leaving = None
+        if window and len(session.history) >= window:
+            leaving = session.history[-window]
+
+        turn = sessions.append_turn(session.id, user, bot, intent)
+
+        if leaving is not None:
+            summary = self.fold(session.summary, leaving)
+            sessions.set_summary(session.id, summary)
+            if self.mode == 'llm':
+                self._rewrite_later(sessions, session.id, session.summary, leaving, summary)
+            session.summary = summary
+
+        return turn
+
+    def _rewrite_later(self, sessions: SessionBackend, session_id: str,
+                       previous: str, turn: Turn, extractive: str):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats['llm_skipped'] += 1
+                return
+            self._pending += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='summarizer')
+
+        self._pool.submit(self._rewrite, sessions, session_id, previous, turn, extractive)
+
+    def _rewrite(self, sessions: SessionBackend, session_id: str,
+                 previous: str, turn: Turn, extractive: str):
+        try:
+            words = self.max_tokens * 3 // 4
+            prompt = f"""Summarize this campus helpdesk conversation in at most {words} words.
+Keep names, dates, amounts and what the student still needs. Reply with the summary only.
+
+Summary so far:
+{previous or '(none)'}
+
+Next exchange:
+User: {turn.user}
+Assistant: {turn.bot}
+
+Updated summary:"""
+            # Background priority: shed first when chat traffic needs the budget
+            rewritten = (self.llm.generate(prompt, max_tokens=self.max_tokens,
+                                           priority=PRIORITY_BACKGROUND) or '').strip()
+            if not rewritten or rewritten == FALLBACK_RESPONSE:
+                self.stats['llm_failed'] += 1
+                return
+
+            # Only replace the summary if no newer turn was folded meanwhile (or the
+            # session expired); peeking leaves its idle time and LRU position alone
+            if sessions.peek_summary(session_id) == extractive:
+                sessions.set_summary(session_id, truncate_to_tokens(rewritten, self.max_tokens))
+                self.stats['llm_rewrites'] += 1
+        except Exception as e:
+            self.stats['llm_failed'] += 1
+            print(f"Summary rewrite error: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return dict(self.stats, mode=self.mode, window=self.window,
+                    max_tokens=self.max_tokens, pending=self._pending)
@@ -0,0 +1,186 @@
+"""
+Document Manifest - Indexed Record of Processed PDFs
+=====================================================
+Persistent index so listing and counting documents never walks the disk
+"""
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within one process
+    fcntl = None
+
+
+class DocumentManifest:
+    """
+    JSON-backed index of processed documents.
+
+    Entries are kept in upload order with secondary indexes by category
+    and content hash, so counts are O(1) and category / duplicate lookups
+    are dict hits. The file is rewritten atomically on every change.
+    Every read first stats the file and reloads it if another worker
+    process has replaced it, so all workers see uploads and deletes
+    without a restart. Changes hold an exclusive flock on a sidecar
+    .lock file from reload to save, so workers never overwrite each
+    other's entries; locked() extends that to a whole upload or delete.
+    Each save bumps `version`, which the knowledge base watches to
+    reload chunks stored by other workers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._by_category: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_hash: Dict[str, str] = {}
+        # Identity of the file version last read or written (inode, mtime, size)
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        # Saves so far, across all workers
+        self.version = 0
+        # Nesting depth of locked() in this process; the flock is taken once
+        self._held = 0
+        self.loaded = self._load()
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        # os.replace() gives every save a new inode, so same-tick rewrites still differ
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self) -> bool:
+        """Load the manifest file; False if there was none to load"""
+        self._entries, self._by_category, self._by_hash = {}, {}, {}
+        self.version = 0
+        self._stamp = self._stat()
+        if self._stamp is None:
+            return False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Document manifest load error: {e}")
+            return False
+
+        self.version = data.get('version', 0)
+        for entry in data.get('documents', []):
+            self._index(entry)
+        return True
+
+    def _refresh(self):
+        """Reload if another process rewrote the file since this one last read or wrote it (hold the lock)"""
+        if self._stat() != self._stamp:
+            self._load()
+
+    @contextmanager
+    def locked(self) -> Iterator['DocumentManifest']:
+        """Hold the manifest exclusively (across worker processes) with the latest entries loaded"""
+        with self._lock:
+            lock_file = None
+            if self._held == 0 and fcntl is not None:
+                lock_file = open(f"{self.path}.lock", 'a')
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._held += 1
+            try:
+                self._refresh()
+                yield self
+            finally:
+                self._held -= 1
+                if lock_file is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+
+    def current_version(self) -> int:
+        """Version of the manifest on disk (reloading if another worker saved)"""
+        with self._lock:
+            self._refresh()
+            return self.version
+
+    def _save(self):
+        # Per-process temp file: workers saving at once must not share one
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self.version += 1
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'documents': list(self._entries.values())}, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._stamp = self._stat()
+        except Exception as e:
+            self.version -= 1
+            print(f"Manifest save error: {e}")
+
+    def _index(self, entry: Dict[str, Any]):
+        filename = entry['filename']
+        self._entries[filename] = entry
+        self._by_category.setdefault(entry.get('category', 'general'), {})[filename] = entry
+        if entry.get('sha256'):
+            self._by_hash[entry['sha256']] = filename
+
+    def _unindex(self, filename: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.pop(filename, None)
+        if entry is None:
+            return None
+
+        self._by_category.get(entry.get('category', 'general'), {}).pop(filename, None)
+        if self._by_hash.get(entry.get('sha256')) == filename:
+            del self._by_hash[entry['sha256']]
+        return entry
+
+    def add(self, entry: Dict[str, Any], save: bool = True):
+        """Record (or replace) a document entry"""
+        with self.locked():
+            self._unindex(entry['filename'])
+            self._index(entry)
+            if save:
+                self._save()
+
+    def save(self):
+        """Persist the manifest (after a run of add(..., save=False) inside locked())"""
+        with self._lock:
+            self._save()
+
+    def remove(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Drop a document entry, returning it if it existed"""
+        with self.locked():
+            entry = self._unindex(filename)
+            if entry is not None:
+                self._save()
+            return entry
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self._entries.get(filename)
+
+    def find_by_hash(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Entry with identical content, if any"""
+        with self._lock:
+            self._refresh()
+            filename = self._by_hash.get(sha256)
+            return self._entries.get(filename) if filename else None
+
+    def list(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entries newest first, optionally for one category"""
+        with self._lock:
+            self._refresh()
+            source = self._entries if category is None else self._by_category.get(category, {})
+            return list(reversed(list(source.values())))
+
+    def count(self, category: Optional[str] = None) -> int:
+        with self._lock:
+            self._refresh()
+            if category is None:
+                return len(self._entries)
+            return len(self._by_category.get(category, {}))
+
+    def count_by_category(self) -> Dict[str, int]:
+        with self._lock:
+            self._refresh()
+            return {cat: len(entries) for cat, entries in self._by_category.items() if entries}
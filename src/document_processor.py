@@ -6,7 +6,12 @@ Process university handbook PDFs and extract knowledge
 
 import os
 import re
-from typing import Dict, Any, List
+import json
+import time
+import hashlib
+import threading
+import uuid
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 try:
@@ -23,20 +28,77 @@ except ImportError:
 
 from src.config_manager import ConfigManager
 from src.knowledge_base import KnowledgeBase
+from src.keyword_matcher import KeywordMatcher
+from src.document_manifest import DocumentManifest
+
+# Page objects in an uncompressed PDF; "/Type /Pages" (the page tree) is excluded
+PAGE_MARKER = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+
+
+class UploadRejected(ValueError):
+    """Upload refused while streaming (bad type, too large, duplicate)"""
+    
+    def __init__(self, message: str, existing: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.existing = existing
 
 
 class DocumentProcessor:
     """Process PDF handbooks and extract structured information"""
     
-    def __init__(self, config_manager: ConfigManager):
+    category_keywords = {
+        'fees': ['fee', 'tuition', 'payment', 'scholarship', 'charges', 'dues'],
+        'exams': ['exam', 'examination', 'test', 'schedule', 'timetable', 'assessment'],
+        'hostel': ['hostel', 'accommodation', 'dormitory', 'mess', 'warden', 'residential'],
+        'library': ['library', 'book', 'journal', 'borrow', 'circulation', 'catalogue']
+    }
+    category_matcher = KeywordMatcher(category_keywords)
+    
+    def __init__(self, config_manager: ConfigManager,
+                 knowledge_base: Optional[KnowledgeBase] = None,
+                 documents_dir: str = 'documents'):
         self.config = config_manager
-        self.knowledge_base = KnowledgeBase()
-        self.documents_dir = 'documents'
+        self._knowledge_base = knowledge_base
+        self.documents_dir = documents_dir
         os.makedirs(self.documents_dir, exist_ok=True)
         
+        # Table extraction tuning: pages need ruling lines to hold a table, a
+        # page whose text alone used its time budget falls back to plain text,
+        # and once one file's tables have used the file budget the rest does too
+        self.min_table_edges = int(os.getenv('TABLE_MIN_RULING_EDGES', '2'))
+        self.table_page_budget = float(os.getenv('TABLE_PAGE_BUDGET_SECONDS', '2.0'))
+        self.table_file_budget = float(os.getenv('TABLE_FILE_BUDGET_SECONDS', '30'))
+        self.extraction_stats = self._new_extraction_stats()
+        self._stats_lock = threading.Lock()
+        
+        # Upload limits, enforced while the upload streams to disk
+        self.max_upload_bytes = int(float(os.getenv('MAX_UPLOAD_MB', '16')) * 1024 * 1024)
+        self.max_pages = int(os.getenv('MAX_PDF_PAGES', '500'))
+        self.upload_chunk_size = 64 * 1024
+        
+        # Extracted text keyed by content hash, so re-uploads skip parsing
+        self.extraction_cache_dir = os.getenv('EXTRACTION_CACHE_DIR', 'data/extraction_cache')
+        
+        self.manifest = DocumentManifest(os.path.join(self.documents_dir, 'manifest.json'))
+        if not self.manifest.loaded:
+            with self.manifest.locked():
+                # Another worker may have built it while this one waited
+                if self.manifest.version == 0:
+                    self._rebuild_manifest()
+        if knowledge_base is not None:
+            knowledge_base.follow(self.manifest)
+        
         print(f"📄 Document Processor initialized")
         print(f"   PDF Support: {'✅ pdfplumber' if PDF_AVAILABLE else '✅ PyPDF2' if PYPDF_AVAILABLE else '❌ No PDF library'}")
     
+    @property
+    def knowledge_base(self) -> KnowledgeBase:
+        """Knowledge base, loaded on first use (extraction-only workers never need it)"""
+        if self._knowledge_base is None:
+            self._knowledge_base = KnowledgeBase()
+            self._knowledge_base.follow(self.manifest)
+        return self._knowledge_base
+    
     def process_document(self, file, category: str = 'general') -> Dict[str, Any]:
         """Process uploaded PDF document"""
         
@@ -47,44 +109,36 @@ class DocumentProcessor:
             }
         
         try:
-            # Save file
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            safe_filename = re.sub(r'[^a-zA-Z0-9._-]', '_', file.filename)
-            filename = f"{category}_{timestamp}_{safe_filename}"
+            # Stream to disk, hashing and checking limits on the way
+            filename = self.build_filename(file.filename, category)
             filepath = os.path.join(self.documents_dir, filename)
             
-            file.save(filepath)
-            
-            # Extract text
-            text = self._extract_text(filepath)
+            try:
+                content_hash = self._stream_upload(file, filepath)
+            except UploadRejected as e:
+                result = {'status': 'error', 'message': str(e)}
+                if e.existing:
+                    result.update({'status': 'duplicate', 'filename': e.existing['filename'],
+                                   'category': e.existing['category']})
+                return result
             
-            if not text or len(text.strip()) < 50:
+            # Extract text and split into chunks
+            extracted = self.extract_chunks(filepath, category, content_hash)
+            if extracted is None or extracted['extraction']['pages'] > self.max_pages:
+                os.remove(filepath)
                 return {
                     'status': 'error',
-                    'message': 'Could not extract meaningful text from PDF'
+                    'message': 'Could not extract meaningful text from PDF' if extracted is None
+                               else f'PDF has too many pages (max {self.max_pages})'
                 }
             
-            # Auto-detect category
-            if category == 'general':
-                category = self._detect_category(text)
-            
-            # Split into chunks
-            chunks = self._create_chunks(text)
+            category = extracted['category']
+            chunks = extracted['chunks']
             
-            # Add to knowledge base
-            doc_ids = []
-            for i, chunk in enumerate(chunks):
-                doc_id = self.knowledge_base.add_document(
-                    content=chunk,
-                    category=category,
-                    metadata={
-                        'source': filename,
-                        'chunk': i + 1,
-                        'total_chunks': len(chunks),
-                        'processed_at': datetime.now().isoformat()
-                    }
-                )
-                doc_ids.append(doc_id)
+            # Add to knowledge base; chunks and manifest change together across workers
+            with self.manifest.locked():
+                doc_ids = self.store_chunks(filename, category, chunks)
+                self.register_document(filename, category, doc_ids, content_hash)
             
             return {
                 'status': 'success',
@@ -92,7 +146,8 @@ class DocumentProcessor:
                 'filename': filename,
                 'category': category,
                 'chunks': len(chunks),
-                'document_ids': doc_ids[:5]  # Return first 5 IDs
+                'document_ids': doc_ids[:5],  # Return first 5 IDs
+                'extraction': extracted['extraction']
             }
             
         except Exception as e:
@@ -101,25 +156,240 @@ class DocumentProcessor:
                 'message': f'Processing error: {str(e)}'
             }
     
-    def _extract_text(self, filepath: str) -> str:
+    def _stream_upload(self, file, filepath: str) -> str:
+        """Copy an upload to disk in chunks; return its SHA-256 or raise UploadRejected"""
+        declared = getattr(file, 'content_length', 0) or 0
+        if declared > self.max_upload_bytes:
+            raise UploadRejected(f'File too large (max {self.max_upload_bytes // (1024 * 1024)}MB)')
+        
+        partial_path = filepath + '.part'
+        digest = hashlib.sha256()
+        size = 0
+        pages = 0
+        tail = b''
+        
+        try:
+            with open(partial_path, 'wb') as out:
+                while True:
+                    block = file.stream.read(self.upload_chunk_size)
+                    if not block:
+                        break
+                    
+                    if size == 0 and not block.startswith(b'%PDF-'):
+                        raise UploadRejected('File is not a valid PDF')
+                    
+                    size += len(block)
+                    if size > self.max_upload_bytes:
+                        raise UploadRejected(f'File too large (max {self.max_upload_bytes // (1024 * 1024)}MB)')
+                    
+                    # Page markers can straddle blocks, so rescan a short tail
+                    window = tail + block
+                    pages += len(PAGE_MARKER.findall(window)) - len(PAGE_MARKER.findall(tail))
+                    if pages > self.max_pages:
+                        raise UploadRejected(f'PDF has too many pages (max {self.max_pages})')
+                    tail = window[-32:]
+                    
+                    digest.update(block)
+                    out.write(block)
+            
+            if size == 0:
+                raise UploadRejected('Uploaded file is empty')
+            
+            content_hash = digest.hexdigest()
+            existing = self.manifest.find_by_hash(content_hash)
+            if existing:
+                raise UploadRejected('This document has already been uploaded', existing)
+            
+            os.replace(partial_path, filepath)
+            return content_hash
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+    
+    def build_filename(self, original_name: str, category: str) -> str:
+        """Storage filename: category prefix, timestamp, unique suffix, sanitized original name
+        
+        The random suffix keeps same-named files stored in the same second
+        (two uploads, or a/handbook.pdf and b/handbook.pdf in one ingest)
+        from overwriting each other.
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        safe_filename = re.sub(r'[^a-zA-Z0-9._-]', '_', original_name)
+        return f"{category}_{timestamp}_{uuid.uuid4().hex[:8]}_{safe_filename}"
+    
+    @staticmethod
+    def file_sha256(filepath: str) -> str:
+        """Hash a file in 1MB blocks"""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def register_document(self, filename: str, category: str, doc_ids: List[str],
+                          sha256: Optional[str] = None, save: bool = True):
+        """Record a stored document and its chunks in the manifest"""
+        filepath = os.path.join(self.documents_dir, filename)
+        now = datetime.now().isoformat()
+        
+        self.manifest.add({
+            'filename': filename,
+            'category': category,
+            'sha256': sha256 or self.file_sha256(filepath),
+            'size_bytes': os.path.getsize(filepath),
+            'chunk_count': len(doc_ids),
+            'chunk_ids': doc_ids,
+            'uploaded_at': now,
+            'processed_at': now
+        }, save=save)
+    
+    def extract_chunks(self, filepath: str, category: str = 'general',
+                       content_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Extract, categorize and chunk a PDF without touching the knowledge base"""
+        extraction = self._new_extraction_stats()
+        text = self._load_cached_text(content_hash, extraction) if content_hash else None
+        
+        if text is None:
+            text = self._extract_text(filepath, extraction)
+            if content_hash and text:
+                self._save_cached_text(content_hash, text, extraction['pages'])
+        
+        if not text or len(text.strip()) < 50:
+            return None
+        
+        # Auto-detect category
+        if category == 'general':
+            category = self._detect_category(text)
+        
+        return {
+            'category': category,
+            'chunks': self._create_chunks(text),
+            'extraction': extraction
+        }
+    
+    def store_chunks(self, filename: str, category: str, chunks: List[str]) -> List[str]:
+        """Add a document's chunks to the knowledge base in one write"""
+        processed_at = datetime.now().isoformat()
+        
+        return self.knowledge_base.add_documents([
+            {
+                'content': chunk,
+                'category': category,
+                'metadata': {
+                    'source': filename,
+                    'chunk': i + 1,
+                    'total_chunks': len(chunks),
+                    'processed_at': processed_at
+                }
+            }
+            for i, chunk in enumerate(chunks)
+        ])
+    
+    @staticmethod
+    def _new_extraction_stats() -> Dict[str, Any]:
+        """Empty counters for the table extraction paths"""
+        return {
+            'pages': 0,
+            'pages_table_extracted': 0,
+            'pages_skipped_precheck': 0,
+            'pages_over_budget': 0,
+            'table_seconds': 0.0,
+            'estimated_seconds_saved': 0.0,
+            'cache_hits': 0
+        }
+    
+    def _merge_extraction_stats(self, stats: Dict[str, Any]):
+        """Fold one document's extraction stats into the running totals"""
+        with self._stats_lock:
+            for key, value in stats.items():
+                self.extraction_stats[key] += value
+    
+    def _page_may_have_tables(self, page) -> bool:
+        """Cheap pre-check: the default table finder needs ruling lines both ways"""
+        horizontal = 0
+        vertical = 0
+        
+        for edge in page.edges:
+            if edge.get('orientation') == 'h':
+                horizontal += 1
+            else:
+                vertical += 1
+            
+            if horizontal >= self.min_table_edges and vertical >= self.min_table_edges:
+                return True
+        
+        return False
+    
+    def _cache_path(self, content_hash: str) -> str:
+        return os.path.join(self.extraction_cache_dir, f"{content_hash}.json")
+    
+    def _load_cached_text(self, content_hash: str, stats: Dict[str, Any]) -> Optional[str]:
+        """Previously extracted text for this content, if cached"""
+        try:
+            with open(self._cache_path(content_hash), 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        stats['pages'] = cached.get('pages', 0)
+        stats['cache_hits'] = 1
+        self._merge_extraction_stats(stats)
+        return cached.get('text')
+    
+    def _save_cached_text(self, content_hash: str, text: str, pages: int):
+        try:
+            os.makedirs(self.extraction_cache_dir, exist_ok=True)
+            with open(self._cache_path(content_hash), 'w', encoding='utf-8') as f:
+                json.dump({'pages': pages, 'text': text}, f)
+        except Exception as e:
+            print(f"Extraction cache error: {e}")
+    
+    def _extract_text(self, filepath: str, stats: Optional[Dict[str, Any]] = None) -> str:
         """Extract text from PDF"""
         text = ""
+        if stats is None:
+            stats = self._new_extraction_stats()
         
         # Try pdfplumber first (better for tables)
         if PDF_AVAILABLE:
             try:
+                file_table_seconds = 0.0
+                
                 with pdfplumber.open(filepath) as pdf:
                     for page in pdf.pages:
+                        page_start = time.perf_counter()
+                        stats['pages'] += 1
+                        
                         page_text = page.extract_text()
                         if page_text:
                             text += page_text + "\n\n"
                         
+                        if not self._page_may_have_tables(page):
+                            stats['pages_skipped_precheck'] += 1
+                            continue
+                        
+                        # extract_tables can't be interrupted, so the page budget is checked
+                        # before it and the file budget caps the total across pages
+                        over_page = time.perf_counter() - page_start > self.table_page_budget
+                        over_file = 0 < self.table_file_budget <= file_table_seconds
+                        if over_page or over_file:
+                            stats['pages_over_budget'] += 1
+                            continue
+                        
                         # Extract tables
+                        table_start = time.perf_counter()
                         tables = page.extract_tables()
+                        table_seconds = time.perf_counter() - table_start
+                        stats['table_seconds'] += table_seconds
+                        stats['pages_table_extracted'] += 1
+                        file_table_seconds += table_seconds
+                        
                         for table in tables:
                             text += self._format_table(table) + "\n\n"
                 
                 if text.strip():
+                    self._estimate_time_saved(stats)
+                    self._merge_extraction_stats(stats)
                     return text
             except Exception as e:
                 print(f"pdfplumber error: {e}")
@@ -128,6 +398,7 @@ class DocumentProcessor:
         if PYPDF_AVAILABLE:
             try:
                 reader = PdfReader(filepath)
+                stats['pages'] = max(stats['pages'], len(reader.pages))
                 for page in reader.pages:
                     page_text = page.extract_text()
                     if page_text:
@@ -137,6 +408,28 @@ class DocumentProcessor:
         
         return text
     
+    def _estimate_time_saved(self, stats: Dict[str, Any]):
+        """Estimate table time the pre-check avoided from the average cost of pages that ran it
+        
+        Over-budget pages are left out: they gave up tables they may have
+        had, which is a fallback rather than a saving.
+        """
+        with self._stats_lock:
+            table_pages = self.extraction_stats['pages_table_extracted'] + stats['pages_table_extracted']
+            table_seconds = self.extraction_stats['table_seconds'] + stats['table_seconds']
+        
+        if table_pages:
+            stats['estimated_seconds_saved'] = stats['pages_skipped_precheck'] * table_seconds / table_pages
+    
+    def get_extraction_stats(self) -> Dict[str, Any]:
+        """Get cumulative table extraction stats"""
+        with self._stats_lock:
+            stats = dict(self.extraction_stats)
+        
+        stats['table_seconds'] = round(stats['table_seconds'], 3)
+        stats['estimated_seconds_saved'] = round(stats['estimated_seconds_saved'], 3)
+        return stats
+    
     def _format_table(self, table: List[List]) -> str:
         """Format table as text"""
         if not table:
@@ -152,26 +445,7 @@ class DocumentProcessor:
     
     def _detect_category(self, text: str) -> str:
         """Auto-detect document category"""
-        text_lower = text.lower()
-        
-        category_keywords = {
-            'fees': ['fee', 'tuition', 'payment', 'scholarship', 'charges', 'dues'],
-            'exams': ['exam', 'examination', 'test', 'schedule', 'timetable', 'assessment'],
-            'hostel': ['hostel', 'accommodation', 'dormitory', 'mess', 'warden', 'residential'],
-            'library': ['library', 'book', 'journal', 'borrow', 'circulation', 'catalogue']
-        }
-        
-        scores = {}
-        for category, keywords in category_keywords.items():
-            score = sum(text_lower.count(kw) for kw in keywords)
-            scores[category] = score
-        
-        if scores:
-            best_category = max(scores, key=scores.get)
-            if scores[best_category] >= 5:
-                return best_category
-        
-        return 'general'
+        return self.category_matcher.classify(text, min_score=5)
     
     def _create_chunks(self, text: str, chunk_size: int = 800, overlap: int = 150) -> List[str]:
         """Split text into overlapping chunks"""
@@ -204,38 +478,83 @@ class DocumentProcessor:
         
         return chunks
     
-    def get_processed_documents(self) -> List[Dict[str, Any]]:
-        """List all processed documents"""
-        documents = []
-        
+    def _rebuild_manifest(self):
+        """One-off migration: index documents saved before the manifest existed"""
         try:
-            for filename in os.listdir(self.documents_dir):
-                if filename.endswith('.pdf'):
-                    filepath = os.path.join(self.documents_dir, filename)
-                    stat = os.stat(filepath)
-                    
-                    # Parse category from filename
-                    parts = filename.split('_')
-                    category = parts[0] if parts else 'general'
-                    
-                    documents.append({
-                        'filename': filename,
-                        'category': category,
-                        'size_kb': round(stat.st_size / 1024, 2),
-                        'uploaded_at': datetime.fromtimestamp(stat.st_mtime).isoformat()
-                    })
+            filenames = [f for f in os.listdir(self.documents_dir) if f.endswith('.pdf')]
         except Exception as e:
             print(f"List documents error: {e}")
+            return
+        
+        if not filenames:
+            self.manifest.save()
+            return
+        
+        # Recover chunk IDs from the chunk metadata
+        chunk_ids: Dict[str, List[str]] = {}
+        for docs in self.knowledge_base.simple_store.values():
+            for doc in docs:
+                source = doc.get('metadata', {}).get('source')
+                if source:
+                    chunk_ids.setdefault(source, []).append(doc['id'])
         
-        return sorted(documents, key=lambda x: x['uploaded_at'], reverse=True)
+        entries = []
+        for filename in filenames:
+            filepath = os.path.join(self.documents_dir, filename)
+            stat = os.stat(filepath)
+            ids = chunk_ids.get(filename, [])
+            
+            # Prefer the category the chunks were stored under over the filename prefix
+            category = ids[0].split('_')[0] if ids else filename.split('_')[0]
+            entries.append({
+                'filename': filename,
+                'category': category,
+                'sha256': self.file_sha256(filepath),
+                'size_bytes': stat.st_size,
+                'chunk_count': len(ids),
+                'chunk_ids': ids,
+                'uploaded_at': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                'processed_at': None
+            })
+        
+        for entry in sorted(entries, key=lambda x: x['uploaded_at']):
+            self.manifest.add(entry, save=False)
+        self.manifest.save()
+        print(f"   Indexed {len(entries)} existing document(s) into the manifest")
+    
+    def get_processed_documents(self, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List processed documents, newest first"""
+        return [
+            {
+                'filename': entry['filename'],
+                'category': entry['category'],
+                'size_kb': round(entry['size_bytes'] / 1024, 2),
+                'chunks': entry['chunk_count'],
+                'uploaded_at': entry['uploaded_at']
+            }
+            for entry in self.manifest.list(category)
+        ]
+    
+    def count_documents(self, category: Optional[str] = None) -> int:
+        """Number of processed documents (no filesystem access)"""
+        return self.manifest.count(category)
     
     def delete_document(self, filename: str) -> bool:
-        """Delete a processed document"""
+        """Delete a processed document and its knowledge base chunks"""
         filepath = os.path.join(self.documents_dir, filename)
         
         try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            with self.manifest.locked():
+                entry = self.manifest.get(filename)
+                if entry is None and not os.path.exists(filepath):
+                    return False
+                
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                
+                if entry is not None:
+                    self.knowledge_base.delete_documents(entry.get('chunk_ids', []))
+                    self.manifest.remove(filename)
                 return True
         except Exception as e:
             print(f"Delete error: {e}")
@@ -0,0 +1,134 @@
+"""
+Fast Path - Answer Straight from a Confident Retrieval
+=======================================================
+Skips the LLM when one retrieved chunk clearly answers the question
+"""
+
+import re
+import threading
+from typing import Dict, Any, List, Optional
+
+from src.answer_cache import STOPWORDS
+
+WORD = re.compile(r'\w+')
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+class FastPathAnswerer:
+    """
+    Confidence gate over keyword-search results.
+
+    A question is answered directly when the retriever's top hit scores
+    at least min_score and leads the runner-up by at least min_margin,
+    and the same holds for content terms (query words minus stopwords,
+    lightly normalized): the top chunk contains at least min_matches of
+    them, covers min_score of them and leads every other retrieved chunk
+    by min_margin. Overlap on "what is the ..." alone never qualifies.
+    The answer is the best-matching table row (with its header row) if
+    the chunk holds a table extracted as "a | b | c" lines, otherwise the
+    one or two sentences of the chunk that each share at least
+    min_matches content terms with the query.
+    """
+
+    def __init__(self, min_score: float = 0.8, min_margin: float = 0.25,
+                 min_query_terms: int = 2, min_matches: int = 2, enabled: bool = True):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.min_query_terms = min_query_terms
+        self.min_matches = min_matches
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self.answers = 0
+        self.declined = 0
+        self.latency_saved = 0.0
+
+    @staticmethod
+    def _terms(text: str) -> set:
+        """Content terms: lowercase words minus stopwords, plural 's' dropped (fees -> fee)"""
+        terms = set()
+        for word in WORD.findall(text.lower()):
+            if word in STOPWORDS:
+                continue
+            if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+                word = word[:-1]
+            terms.add(word)
+        return terms
+
+    def is_confident(self, scores: List[float]) -> bool:
+        if not self.enabled or not scores or scores[0] < self.min_score:
+            return False
+        runner_up = scores[1] if len(scores) > 1 else 0.0
+        return scores[0] - runner_up >= self.min_margin
+
+    def covers(self, terms: set, sources: List[str]) -> bool:
+        """Does the top source clearly hold the query's content terms?"""
+        matches = [len(terms & self._terms(source)) for source in sources]
+        if not matches or matches[0] < self.min_matches:
+            return False
+        return self.is_confident([count / len(terms) for count in matches])
+
+    def _best_row(self, chunk: str, terms: set) -> Optional[str]:
+        """Header plus best-matching row of a table in the chunk, if any"""
+        best, best_overlap, header = None, self.min_matches - 1, None
+        previous_was_row = False
+
+        for line in chunk.splitlines():
+            if ' | ' not in line:
+                previous_was_row = False
+                continue
+            if not previous_was_row:
+                # First row of a table block is its header
+                header = line
+                previous_was_row = True
+                continue
+
+            overlap = len(terms & self._terms(line))
+            if overlap > best_overlap:
+                best, best_overlap = (header, line), overlap
+
+        if best is None:
+            return None
+        return '\n'.join(best)
+
+    def _best_sentences(self, chunk: str, terms: set, limit: int = 2) -> Optional[str]:
+        sentences = [s.strip() for s in SENTENCE_END.split(' '.join(chunk.split())) if s.strip()]
+        ranked = sorted(range(len(sentences)),
+                        key=lambda i: len(terms & self._terms(sentences[i])), reverse=True)
+        chosen = [i for i in ranked[:limit] if len(terms & self._terms(sentences[i])) >= self.min_matches]
+        if not chosen:
+            return None
+        return ' '.join(sentences[i] for i in sorted(chosen))
+
+    def answer(self, query: str, sources: List[str], scores: List[float]) -> Optional[str]:
+        """Excerpt answering the query from the top source, or None to use the LLM"""
+        terms = self._terms(query)
+        excerpt = None
+
+        if (len(terms) >= self.min_query_terms and self.is_confident(scores)
+                and self.covers(terms, sources)):
+            excerpt = self._best_row(sources[0], terms) or self._best_sentences(sources[0], terms)
+
+        with self._lock:
+            if excerpt is None:
+                self.declined += 1
+            else:
+                self.answers += 1
+        return excerpt
+
+    def record_saving(self, seconds: float):
+        """Add the LLM time this fast answer avoided"""
+        with self._lock:
+            self.latency_saved += seconds
+
+    def get_statistics(self) -> Dict[str, Any]:
+        checked = self.answers + self.declined
+        return {
+            'enabled': self.enabled,
+            'answers': self.answers,
+            'fire_rate': round(self.answers / checked, 3) if checked else 0.0,
+            'latency_saved_seconds': round(self.latency_saved, 3),
+            'min_score': self.min_score,
+            'min_margin': self.min_margin,
+            'min_matches': self.min_matches
+        }
@@ -0,0 +1,182 @@
+"""
+Feedback Writer - Buffered Background Feedback Log
+===================================================
+Appends feedback records to a JSONL file off the request path
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from collections import deque
+from typing import Dict, Any, List
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+class FeedbackWriter:
+    """
+    Bounded queue of feedback records drained by a background thread.
+
+    The writer appends records in batches (every flush_interval seconds,
+    or sooner once batch_size are queued) through one open file handle.
+    fsync policy: 'always' syncs after every batch, 'interval' at most
+    every fsync_interval seconds, 'never' leaves it to the OS. When the
+    queue is full, new records are dropped and counted, never blocking
+    the request. In memory only rolling aggregates are kept.
+    """
+
+    def __init__(self, path: str = 'data/feedback.jsonl', max_queue: int = 10000,
+                 batch_size: int = 100, flush_interval: float = 1.0,
+                 fsync: str = 'interval', fsync_interval: float = 5.0, window: int = 100):
+        if fsync not in FSYNC_POLICIES:
+            print(f"⚠️  Unknown feedback fsync policy: {fsync}, using 'interval'")
+            fsync = 'interval'
+
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._queue: 'queue.Queue[Dict[str, Any]]' = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._write_lock = threading.Lock()
+        self._last_fsync = 0.0
+        self._closed = False
+
+        # Rolling aggregates
+        self._stats_lock = threading.Lock()
+        self.total = 0
+        self.rating_sum = 0
+        self.rating_counts: Dict[int, int] = {}
+        self.with_comment = 0
+        self._recent = deque(maxlen=window)
+
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.write_errors = 0
+
+        self._writer = threading.Thread(target=self._writer_loop, name='feedback-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue a record for writing; False if it was dropped"""
+        rating = record.get('rating')
+        with self._stats_lock:
+            self.total += 1
+            if isinstance(rating, int):
+                self.rating_sum += rating
+                self.rating_counts[rating] = self.rating_counts.get(rating, 0) + 1
+                self._recent.append(rating)
+            if record.get('comment'):
+                self.with_comment += 1
+
+        if self._closed:
+            self._write_batch([record])
+            return True
+
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+
+    def _writer_loop(self):
+        while not self._closed:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write_batch(batch)
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        records = []
+        while True:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                return records
+
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        with self._write_lock:
+            self._append(records)
+
+    def _append(self, records: List[Dict[str, Any]]):
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+
+            self._file.write(''.join(json.dumps(record) + '\n' for record in records))
+            self._file.flush()
+
+            now = time.monotonic()
+            if self.fsync == 'always' or (self.fsync == 'interval' and now - self._last_fsync >= self.fsync_interval):
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+
+            self.written += len(records)
+            self.flushes += 1
+        except Exception as e:
+            self.write_errors += 1
+            print(f"Feedback save error: {e}")
+
+    def flush(self):
+        """Write everything queued so far and sync it to disk"""
+        with self._write_lock:
+            records = self._drain()
+            if records:
+                self._append(records)
+            if self._file is not None:
+                try:
+                    os.fsync(self._file.fileno())
+                except Exception as e:
+                    print(f"Feedback fsync error: {e}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._writer.join(timeout=2.0)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            rated = sum(self.rating_counts.values())
+            return {
+                'total': self.total,
+                'average_rating': round(self.rating_sum / rated, 2) if rated else 0.0,
+                'recent_average_rating': round(sum(self._recent) / len(self._recent), 2) if self._recent else 0.0,
+                'rating_counts': dict(sorted(self.rating_counts.items())),
+                'with_comment': self.with_comment,
+                'pending': self._queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'write_errors': self.write_errors,
+                'fsync': self.fsync
+            }
@@ -0,0 +1,73 @@
+"""
+HTTP Pool - Shared Keep-Alive Sessions for LLM APIs
+====================================================
+One pooled requests.Session per provider, reused by every call
+"""
+
+import os
+import threading
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds: fail fast on an unreachable host, wait for slow generations
+CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', '3.05'))
+READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', '30'))
+TIMEOUT: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+POOL_SIZE = int(os.getenv('LLM_POOL_SIZE', '20'))
+RETRIES = int(os.getenv('LLM_HTTP_RETRIES', '2'))
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def create_session(pool_size: int = POOL_SIZE, retries: int = RETRIES,
+                   backoff: float = 0.5) -> requests.Session:
+    """
+    Session with a keep-alive connection pool and retry/backoff.
+
+    Connection failures (the request was never sent) are retried with
+    exponential backoff (0.5s, 1s, ...), and so are 500/502/503/504 on
+    GETs. A POST that reached the server is never resent: the provider
+    may already have run (and billed) the generation. Read timeouts and
+    429s are not retried either: repeating a slow generation doubles
+    latency, and a rate-limited request would only spend more quota.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(name: str) -> requests.Session:
+    """Process-wide session for a provider (created on first use)"""
+    session = _sessions.get(name)
+    if session is None:
+        with _lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _sessions[name] = create_session()
+    return session
+
+
+def close_sessions():
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
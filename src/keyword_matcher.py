@@ -0,0 +1,95 @@
+"""
+Keyword Matcher - Single-pass Category Scoring
+===============================================
+Compiled word-boundary matcher shared by intent and category detection
+"""
+
+import re
+from bisect import bisect_right
+from typing import Dict, List, Iterable
+
+
+class KeywordMatcher:
+    """
+    Score text against a table of category keywords in one pass.
+
+    All keywords are folded into a single compiled regex with word
+    boundaries, so "fine" no longer matches inside "define" and each
+    text is scanned once regardless of how many keywords there are.
+    Simple plurals ("fees", "books", "rooms") still count as a hit.
+    """
+
+    # Joins batch messages; contains no word characters so no match can span it
+    SEPARATOR = '\n\x00\n'
+
+    def __init__(self, keyword_table: Dict[str, List[str]]):
+        self.categories = list(keyword_table.keys())
+        self._owners: Dict[str, List[str]] = {}
+
+        for category, keywords in keyword_table.items():
+            for kw in keywords:
+                owners = self._owners.setdefault(kw.lower(), [])
+                if category not in owners:
+                    owners.append(category)
+
+        # Longest first so "examination" wins over "exam" at the same position
+        alternatives = sorted(self._owners, key=len, reverse=True)
+        pattern = r'\b(' + '|'.join(re.escape(kw) for kw in alternatives) + r')(?:s|es)?\b'
+        self._pattern = re.compile(pattern, re.IGNORECASE)
+
+    def _empty_scores(self) -> Dict[str, int]:
+        return {category: 0 for category in self.categories}
+
+    def score(self, text: str) -> Dict[str, int]:
+        """Count keyword hits per category in a single scan"""
+        scores = self._empty_scores()
+        owners = self._owners
+
+        for match in self._pattern.finditer(text):
+            for category in owners[match.group(1).lower()]:
+                scores[category] += 1
+
+        return scores
+
+    def score_batch(self, texts: Iterable[str]) -> List[Dict[str, int]]:
+        """Score many texts with one scan over their concatenation"""
+        texts = list(texts)
+        scores = [self._empty_scores() for _ in texts]
+        if not texts:
+            return scores
+
+        # Start offset of each text inside the joined string
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(self.SEPARATOR)
+
+        owners = self._owners
+        joined = self.SEPARATOR.join(texts)
+
+        for match in self._pattern.finditer(joined):
+            index = bisect_right(starts, match.start()) - 1
+            for category in owners[match.group(1).lower()]:
+                scores[index][category] += 1
+
+        return scores
+
+    @staticmethod
+    def best(scores: Dict[str, int], min_score: int = 1, default: str = 'general') -> str:
+        """Pick the highest-scoring category, or default below min_score"""
+        if scores:
+            best_category = max(scores, key=scores.get)
+            if scores[best_category] >= min_score:
+                return best_category
+
+        return default
+
+    def classify(self, text: str, min_score: int = 1, default: str = 'general') -> str:
+        """Score text and return the best category"""
+        return self.best(self.score(text), min_score, default)
+
+    def classify_batch(self, texts: Iterable[str], min_score: int = 1,
+                       default: str = 'general') -> List[str]:
+        """Classify many texts in one pass"""
+        return [self.best(s, min_score, default) for s in self.score_batch(texts)]
@@ -20,6 +20,18 @@ class KnowledgeBase:
         
         self.categories = ['fees', 'exams', 'hostel', 'library', 'general']
         self.simple_store: Dict[str, List[Dict]] = {}
+        # Chunks per category, kept in step with every add/delete
+        self.category_counts: Dict[str, int] = {}
+        # Bumped on every change so caches built on search results can invalidate
+        self.version = 0
+        # Document manifest whose version says when other workers changed the store
+        self._manifest = None
+        self._manifest_version = 0
+        
+        # Vector search is disabled in the Vercel build
+        self.client = None
+        self.embedding_model = None
+        self.collections: Dict[str, Any] = {}
         
         # Load existing data
         self._load_simple_store()
@@ -65,26 +77,52 @@ class KnowledgeBase:
             try:
                 with open(store_path, 'r', encoding='utf-8') as f:
                     self.simple_store = json.load(f)
-                    return
+                self.category_counts = {cat: len(docs) for cat, docs in self.simple_store.items()}
+                return
             except:
                 pass
         
         self.simple_store = {cat: [] for cat in self.categories}
+        self.category_counts = {cat: 0 for cat in self.categories}
     
     def _save_simple_store(self):
-        """Save simple backup storage"""
+        """Save simple backup storage (atomically, other workers may be reloading it)"""
         store_path = os.path.join(self.persist_directory, 'simple_store.json')
+        tmp_path = f"{store_path}.{os.getpid()}.tmp"
         try:
-            with open(store_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(self.simple_store, f, indent=2)
+            os.replace(tmp_path, store_path)
         except Exception as e:
             print(f"Save error: {e}")
     
+    def follow(self, manifest):
+        """Reload the store whenever the document manifest changes
+        
+        Uploads and deletes save chunks here and then bump the manifest
+        version, so a version this process has not seen means another
+        worker changed the store.
+        """
+        self._manifest = manifest
+        self._manifest_version = manifest.current_version()
+    
+    def sync(self):
+        """Pick up chunks other workers stored or deleted since the last check"""
+        if self._manifest is None:
+            return
+        
+        manifest_version = self._manifest.current_version()
+        if manifest_version != self._manifest_version:
+            self._load_simple_store()
+            self._manifest_version = manifest_version
+            self.version += 1
+    
     def add_document(self, content: str, category: str, metadata: Optional[Dict] = None) -> str:
         """Add document to knowledge base"""
         if category not in self.categories:
             category = 'general'
         
+        self.sync()
         doc_id = f"{category}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
         
         # Add to vector store if available
@@ -108,12 +146,68 @@ class KnowledgeBase:
             'metadata': metadata or {},
             'added_at': datetime.now().isoformat()
         })
+        self.category_counts[category] = self.category_counts.get(category, 0) + 1
+        self.version += 1
         self._save_simple_store()
         
         return doc_id
     
+    def add_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """Add many documents with a single save of the store"""
+        self.sync()
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        added_at = datetime.now().isoformat()
+        doc_ids = []
+        
+        for i, doc in enumerate(documents):
+            category = doc.get('category', 'general')
+            if category not in self.categories:
+                category = 'general'
+            
+            doc_id = f"{category}_{stamp}_{i}"
+            self.simple_store.setdefault(category, []).append({
+                'id': doc_id,
+                'content': doc['content'],
+                'category': category,
+                'metadata': doc.get('metadata') or {},
+                'added_at': added_at
+            })
+            self.category_counts[category] = self.category_counts.get(category, 0) + 1
+            doc_ids.append(doc_id)
+        
+        if doc_ids:
+            self.version += 1
+            self._save_simple_store()
+        
+        return doc_ids
+    
+    def delete_documents(self, doc_ids: List[str]) -> int:
+        """Remove chunks by ID, returning how many were removed"""
+        wanted = set(doc_ids)
+        if not wanted:
+            return 0
+        
+        self.sync()
+        removed = 0
+        for cat in {doc_id.split('_')[0] for doc_id in wanted}:
+            docs = self.simple_store.get(cat)
+            if not docs:
+                continue
+            
+            kept = [doc for doc in docs if doc['id'] not in wanted]
+            removed += len(docs) - len(kept)
+            self.simple_store[cat] = kept
+            self.category_counts[cat] = len(kept)
+        
+        if removed:
+            self.version += 1
+            self._save_simple_store()
+        
+        return removed
+    
     def search(self, query: str, category: Optional[str] = None, top_k: int = 3) -> List[Dict[str, Any]]:
         """Search knowledge base"""
+        self.sync()
         
         # Try vector search first
         if self.client and self.embedding_model:
@@ -180,16 +274,12 @@ class KnowledgeBase:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get knowledge base stats"""
-        stats = {
-            'total_documents': 0,
-            'by_category': {},
+        self.sync()
+        by_category = {cat: self.category_counts.get(cat, 0) for cat in self.categories}
+        
+        return {
+            'total_documents': sum(by_category.values()),
+            'by_category': by_category,
             'vector_enabled': bool(self.client),
             'embeddings_enabled': bool(self.embedding_model)
         }
-        
-        for cat in self.categories:
-            count = len(self.simple_store.get(cat, []))
-            stats['by_category'][cat] = count
-            stats['total_documents'] += count
-        
-        return stats
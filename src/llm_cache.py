@@ -0,0 +1,141 @@
+"""
+LLM Cache - Persistent Response Cache for LLM Calls
+===================================================
+Generated text keyed by provider, model, prompt and sampling params
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+
+# Expired and over-budget rows are swept once every this many writes
+EVICT_EVERY = 50
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM responses in a SQLite file.
+
+    The key is a hash of (provider, model, temperature, max_tokens,
+    prompt), so any change to the prompt, retrieved context or sampling
+    parameters is a miss. Every worker on the host opens the same file
+    (WAL mode), so an answer generated by one worker is reused by the
+    others and survives restarts. Entries expire after ttl_seconds; when
+    stored text exceeds max_bytes the least recently used rows go first.
+
+    At temperature 0 a cached response is what the provider would return
+    anyway; at higher temperatures it replays one sample for the TTL.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = 86400, max_bytes: int = 50 * 1024 * 1024):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._local = threading.local()
+
+        self._conn().execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            last_used REAL NOT NULL)""")
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        """One autocommit connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(provider: str, model: str, prompt: str, temperature: float, max_tokens: int) -> str:
+        material = json.dumps([provider, model, round(temperature, 4), max_tokens, prompt])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute('SELECT response, created FROM responses WHERE key = ?', (key,)).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        conn.execute('UPDATE responses SET last_used = ? WHERE key = ?', (now, key))
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, provider: str, model: str, response: str):
+        now = time.time()
+        self._conn().execute(
+            'INSERT OR REPLACE INTO responses (key, provider, model, response, size, created, last_used) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (key, provider, model, response, len(response.encode('utf-8')), now, now))
+        self.writes += 1
+        if self.writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired rows, then least recently used ones beyond max_bytes"""
+        conn = self._conn()
+        removed = conn.execute('DELETE FROM responses WHERE created < ?',
+                               (time.time() - self.ttl_seconds,)).rowcount
+        removed += conn.execute("""DELETE FROM responses WHERE key IN (
+            SELECT key FROM (
+                SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS running
+                FROM responses)
+            WHERE running > ?)""", (self.max_bytes,)).rowcount
+        self.evicted += removed
+        return removed
+
+    def get_statistics(self) -> Dict[str, Any]:
+        entries, size = self._conn().execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'path': self.db_path,
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'writes': self.writes,
+            'evicted': self.evicted
+        }
+
+
+_cache: Optional[LLMResponseCache] = None
+_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache when LLM_CACHE (or LLM_DETERMINISTIC) is on, else None"""
+    global _cache
+    enabled = (os.getenv('LLM_CACHE', 'false').lower() == 'true'
+               or os.getenv('LLM_DETERMINISTIC', 'false').lower() == 'true')
+    if not enabled:
+        return None
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = LLMResponseCache(
+                    os.getenv('LLM_CACHE_PATH', './data/llm_cache.db'),
+                    ttl_seconds=float(os.getenv('LLM_CACHE_TTL', '86400')),
+                    max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', '50')) * 1024 * 1024)
+                )
+    return _cache
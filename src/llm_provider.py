@@ -5,13 +5,94 @@ Supports FREE cloud-based LLM providers that work on serverless platforms
 """
 
 import os
-import requests
+import re
+import time
+import asyncio
 import json
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Callable, Dict, Any, Iterator
 from dotenv import load_dotenv
 
+from src.llm_cache import get_response_cache
+from src.http_pool import get_session, TIMEOUT, CONNECT_TIMEOUT, READ_TIMEOUT, POOL_SIZE, RETRIES
+from src.provider_health import ProviderHealth
+from src.prompt_builder import estimate_tokens
+from src.rate_limiter import RateLimiter, PRIORITY_INTERACTIVE
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 load_dotenv()
 
+# Splits a complete response into word-sized chunks for providers that cannot stream
+WORD_CHUNK = re.compile(r'\S+\s*|\s+')
+
+class LLMProviderError(Exception):
+    """A strict generate() call failed (provider error, timeout or no provider)"""
+
+
+# What generate() returns when the provider fails or none is configured
+FALLBACK_RESPONSE = ("I can provide information about the campus. Please upload university handbook "
+                     "PDFs in the admin panel for detailed responses.")
+
+
+class TokenStream:
+    """
+    Iterator over generated text chunks that times itself.
+
+        stream = llm.generate_stream(prompt)
+        for chunk in stream:
+            ...
+        stream.stats()  # ttft_ms, tokens, tokens_per_second, ...
+
+    Timing starts when iteration starts. Tokens are estimated from the
+    text (same rule as prompt budgeting), so the rate is comparable across
+    providers whatever their chunk sizes.
+    """
+
+    def __init__(self, chunks: Iterator[str], provider: str, native: bool):
+        self._chunks = chunks
+        self.provider = provider
+        self.native = native
+        self.text_parts = []
+        self.started: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def __iter__(self) -> Iterator[str]:
+        self.started = time.perf_counter()
+        for chunk in self._chunks:
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            self.text_parts.append(chunk)
+            yield chunk
+        self.finished_at = time.perf_counter()
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds from the request to the first chunk"""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    def stats(self) -> Dict[str, Any]:
+        tokens = estimate_tokens(''.join(self.text_parts)) if self.text_parts else 0
+        end = self.finished_at or time.perf_counter()
+        generating = end - self.first_token_at if self.first_token_at is not None else 0.0
+        return {
+            'provider': self.provider,
+            'native': self.native,
+            'ttft_ms': round(self.ttft * 1000, 1) if self.ttft is not None else None,
+            'duration_ms': round((end - self.started) * 1000, 1) if self.started is not None else 0.0,
+            'chunks': len(self.text_parts),
+            'tokens': tokens,
+            # Decode rate after the first token; a single-chunk reply has none
+            'tokens_per_second': round(tokens / generating, 1) if generating > 0 else None
+        }
+
 
 class LLMProvider:
     """
@@ -26,10 +107,58 @@ class LLMProvider:
     - Ollama: FREE but doesn't work on Vercel
     """
     
-    def __init__(self):
-        self.provider = os.getenv('LLM_PROVIDER', 'groq').lower()
+    # Published free-tier limits; 0 means no known limit
+    DEFAULT_REQUESTS_PER_MINUTE = {'groq': 30, 'huggingface_api': 60}
+    DEFAULT_TOKENS_PER_MINUTE = {'groq': 6000}
+    
+    def __init__(self, provider: Optional[str] = None):
+        self.provider = (provider or os.getenv('LLM_PROVIDER', 'groq')).lower()
         self.model = None
+        self._async_client = None
+        # Keep-alive pool shared by every LLMProvider using this provider
+        self.http = get_session(self.provider)
+        # Set by _init_* for providers that can be checked without a completion call
+        self._probe = None
+        self._pipeline_lock = threading.Lock()
+        # LLM_DETERMINISTIC=true decodes greedily, so the same prompt always gets the same answer
+        self.deterministic = os.getenv('LLM_DETERMINISTIC', 'false').lower() == 'true'
+        self.temperature = 0.0 if self.deterministic else float(os.getenv('LLM_TEMPERATURE', '0.7'))
         self._initialize_provider()
+        self.model_name = self.model.get('model', '') if isinstance(self.model, dict) else ''
+        
+        # Responses kept on disk across restarts and workers (LLM_CACHE); None when off
+        self.cache = get_response_cache()
+        
+        # Availability is probed in the background; is_available() never blocks
+        self.health = ProviderHealth(
+            self.provider, self._probe,
+            interval=float(os.getenv('LLM_HEALTH_INTERVAL', '60')),
+            failure_threshold=int(os.getenv('LLM_HEALTH_FAILURES', '3'))
+        )
+        
+        # Per-provider settings (GROQ_REQUESTS_PER_MINUTE) override the LLM_ ones
+        self.requests_per_minute = int(self._setting(
+            'REQUESTS_PER_MINUTE', self.DEFAULT_REQUESTS_PER_MINUTE.get(self.provider, 0)))
+        self.tokens_per_minute = int(self._setting(
+            'TOKENS_PER_MINUTE', self.DEFAULT_TOKENS_PER_MINUTE.get(self.provider, 0)))
+        self.max_concurrency = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+        
+        # Every call waits here for budget instead of running into the provider's 429s;
+        # shared buckets get one file per provider (rate_limit.groq.db)
+        db_path = os.getenv('LLM_RATE_LIMIT_DB')
+        if db_path:
+            root, ext = os.path.splitext(db_path)
+            db_path = f"{root}.{self.provider}{ext}"
+        self.limiter = RateLimiter(
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            max_queue=int(os.getenv('LLM_QUEUE_SIZE', '100')),
+            max_wait={PRIORITY_INTERACTIVE: float(os.getenv('LLM_QUEUE_TIMEOUT', '10'))},
+            db_path=db_path or None
+        )
+    
+    def _setting(self, name: str, default: Any) -> str:
+        return os.getenv(f'{self.provider.upper()}_{name}', os.getenv(f'LLM_{name}', str(default)))
     
     def _initialize_provider(self):
         """Initialize the configured LLM provider"""
@@ -61,36 +190,16 @@ class LLMProvider:
             self.provider = 'fallback'
             return
         
-        try:
-            self.model = {
-                'api_key': api_key,
-                'base_url': 'https://api.groq.com/openai/v1',
-                'model': os.getenv('GROQ_MODEL', 'llama-3.1-8b-instant')
-            }
-            
-            # Test connection
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-            response = requests.post(
-                f"{self.model['base_url']}/chat/completions",
-                headers=headers,
-                json={
-                    "model": self.model['model'],
-                    "messages": [{"role": "user", "content": "Hi"}],
-                    "max_tokens": 10
-                },
-                timeout=10
-            )
-            if response.status_code == 200:
-                print(f"✅ Groq initialized with model: {self.model['model']}")
-                print("   🌐 Works perfectly on Vercel!")
-            else:
-                raise Exception(f"API test failed: {response.status_code}")
-        except Exception as e:
-            print(f"⚠️  Groq initialization error: {e}")
-            self.provider = 'fallback'
+        self.model = {
+            'api_key': api_key,
+            # Point GROQ_BASE_URL at mock_llm_server.py to test without a key or network
+            'base_url': os.getenv('GROQ_BASE_URL', 'https://api.groq.com/openai/v1').rstrip('/'),
+            'model': os.getenv('GROQ_MODEL', 'llama-3.1-8b-instant')
+        }
+        # Key and model are checked against GET /models, which costs no completion
+        self._probe = self._probe_models_endpoint
+        print(f"✅ Groq configured with model: {self.model['model']}")
+        print("   🌐 Works perfectly on Vercel!")
     
     def _init_huggingface_api(self):
         """Initialize Hugging Face Inference API (FREE with rate limits, works on Vercel)"""
@@ -105,6 +214,7 @@ class LLMProvider:
                 'api_key': api_key,
                 'model': os.getenv('HUGGINGFACE_MODEL', 'mistralai/Mistral-7B-Instruct-v0.2')
             }
+            self._probe = self._probe_huggingface_api
             print(f"✅ Hugging Face Inference API initialized")
             print(f"   Model: {self.model['model']}")
             print("   🌐 Works on Vercel!")
@@ -123,9 +233,10 @@ class LLMProvider:
         try:
             self.model = {
                 'api_key': api_key,
-                'base_url': 'https://api.together.xyz/v1',
+                'base_url': os.getenv('TOGETHER_BASE_URL', 'https://api.together.xyz/v1').rstrip('/'),
                 'model': os.getenv('TOGETHER_MODEL', 'mistralai/Mistral-7B-Instruct-v0.2')
             }
+            self._probe = self._probe_models_endpoint
             print(f"✅ Together AI initialized with model: {self.model['model']}")
             print("   🌐 Works on Vercel!")
         except Exception as e:
@@ -140,50 +251,81 @@ class LLMProvider:
         try:
             import ollama
             
-            base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
             model_name = os.getenv('OLLAMA_MODEL', 'llama2')
-            
-            # Test connection
-            try:
-                response = ollama.chat(
-                    model=model_name,
-                    messages=[{'role': 'user', 'content': 'Hi'}],
-                    options={'num_predict': 10}
-                )
-                self.model = {'client': ollama, 'model': model_name}
-                print(f"✅ Ollama initialized with model: {model_name} (LOCAL ONLY)")
-            except Exception as e:
-                print(f"⚠️  Ollama not running. Start it with: ollama serve")
-                print(f"   Then pull a model: ollama pull llama2")
-                print(f"   Error: {e}")
-                self.provider = 'fallback'
-                
+            self.model = {'client': ollama, 'model': model_name}
+            # Listing local models checks the server is up without running one
+            self._probe = self._probe_ollama
+            print(f"✅ Ollama configured with model: {model_name} (LOCAL ONLY)")
+            print("   Start it with: ollama serve, then: ollama pull llama2")
         except ImportError:
             print("⚠️  Ollama not installed. Install with: pip install ollama")
             self.provider = 'fallback'
     
     def _init_huggingface(self):
-        """Initialize Hugging Face (FREE with rate limits)"""
-        try:
-            from transformers import pipeline
-            
-            model_name = os.getenv('HUGGINGFACE_MODEL', 'HuggingFaceH4/zephyr-7b-beta')
-            
-            print(f"⏳ Loading Hugging Face model: {model_name}")
-            print("   (First time may take a few minutes to download)")
-            
-            self.model = pipeline(
-                "text-generation",
-                model=model_name,
-                max_new_tokens=256,
-                do_sample=True,
-                temperature=0.7
-            )
-            print(f"✅ Hugging Face model loaded")
-            
-        except Exception as e:
-            print(f"⚠️  Hugging Face error: {e}")
+        """Initialize Hugging Face (FREE with rate limits); the model loads on first use"""
+        import importlib.util
+        if importlib.util.find_spec('transformers') is None:
+            print("⚠️  Hugging Face error: transformers is not installed")
             self.provider = 'fallback'
+            return
+        
+        self.model = {
+            'model': os.getenv('HUGGINGFACE_MODEL', 'HuggingFaceH4/zephyr-7b-beta'),
+            'pipeline': None
+        }
+        print(f"✅ Hugging Face model {self.model['model']} will load on first request")
+    
+    def _get_pipeline(self):
+        """Local transformers pipeline, loaded once on first use"""
+        if self.model['pipeline'] is None:
+            with self._pipeline_lock:
+                if self.model['pipeline'] is None:
+                    from transformers import pipeline
+                    
+                    print(f"⏳ Loading Hugging Face model: {self.model['model']}")
+                    print("   (First time may take a few minutes to download)")
+                    self.model['pipeline'] = pipeline(
+                        "text-generation",
+                        model=self.model['model'],
+                        max_new_tokens=256,
+                        **({'do_sample': True, 'temperature': self.temperature}
+                           if self.temperature > 0 else {'do_sample': False})
+                    )
+                    print(f"✅ Hugging Face model loaded")
+        return self.model['pipeline']
+    
+    def _probe_models_endpoint(self) -> Optional[bool]:
+        """GET /models on an OpenAI-compatible API: checks the key and that the model exists"""
+        response = self.http.get(
+            f"{self.model['base_url']}/models",
+            headers={"Authorization": f"Bearer {self.model['api_key']}"},
+            timeout=(CONNECT_TIMEOUT, 10)
+        )
+        if response.status_code in (401, 403):
+            return False
+        if response.status_code == 429:
+            return None
+        response.raise_for_status()
+        models = {entry.get('id') for entry in response.json().get('data', [])}
+        return not models or self.model['model'] in models
+    
+    def _probe_huggingface_api(self) -> Optional[bool]:
+        """Token check against the Hugging Face whoami endpoint"""
+        response = self.http.get(
+            "https://huggingface.co/api/whoami-v2",
+            headers={"Authorization": f"Bearer {self.model['api_key']}"},
+            timeout=(CONNECT_TIMEOUT, 10)
+        )
+        if response.status_code in (401, 403):
+            return False
+        if response.status_code == 429:
+            return None
+        response.raise_for_status()
+        return True
+    
+    def _probe_ollama(self) -> bool:
+        self.model['client'].list()
+        return True
     
     def _init_ibm_granite(self):
         """Initialize IBM Granite (PAID)"""
@@ -202,7 +344,7 @@ class LLMProvider:
             parameters = {
                 GenParams.DECODING_METHOD: "greedy",
                 GenParams.MAX_NEW_TOKENS: 500,
-                GenParams.TEMPERATURE: 0.7,
+                GenParams.TEMPERATURE: self.temperature,
             }
             
             self.model = Model(
@@ -236,9 +378,81 @@ class LLMProvider:
             print(f"⚠️  OpenAI error: {e}")
             self.provider = 'fallback'
     
-    def generate(self, prompt: str, max_tokens: int = 300) -> str:
-        """Generate response from LLM"""
+    def _acquire(self, prompt: str, max_tokens: int, priority: int) -> int:
+        """Wait for rate-limit budget; returns the tokens charged (raises LLMRateLimited)"""
+        charged = estimate_tokens(prompt) + max_tokens
+        self.limiter.acquire(charged, priority)
+        return charged
+    
+    def _settle(self, charged: int, prompt: str, response: str):
+        self.limiter.settle(charged, estimate_tokens(prompt) + estimate_tokens(response or ''))
+    
+    def _note_rate_limit(self, response):
+        """On a 429, pause every call for the provider's Retry-After"""
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get('retry-after', 2))
+            except ValueError:
+                retry_after = 2.0
+            self.limiter.penalize(retry_after)
+    
+    def generate(self, prompt: str, max_tokens: int = 300, priority: int = PRIORITY_INTERACTIVE,
+                 strict: bool = False, admitted: Optional[Callable[[], None]] = None) -> str:
+        """Generate response from LLM
+        
+        Raises LLMRateLimited when the rate limiter sheds the call, so the
+        caller can answer another way instead of waiting. A failed call
+        returns the generic fallback text, or raises LLMProviderError when
+        strict (for callers that can try something else). admitted, if
+        given, is called once the rate limiter lets the request go out.
+        """
+        key = self._cache_key(prompt, max_tokens)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return cached
         
+        charged = self._acquire(prompt, max_tokens, priority)
+        if admitted is not None:
+            admitted()
+        response = ''
+        try:
+            response = self._dispatch(prompt, max_tokens)
+        except Exception as e:
+            response = self._failed(prompt, e, strict)
+        else:
+            self._cache_put(key, response)
+        finally:
+            # Refund unused budget even when a strict call raises
+            self._settle(charged, prompt, response)
+        return response
+    
+    def _cache_key(self, prompt: str, max_tokens: int) -> Optional[str]:
+        """Response cache key, or None when caching is off"""
+        if self.cache is None or self.provider == 'fallback':
+            return None
+        return self.cache.key(self.provider, self.model_name, prompt, self.temperature, max_tokens)
+    
+    def _cache_put(self, key: Optional[str], response: str):
+        """Cache a successful response (failures are never cached)"""
+        if key and response:
+            self.cache.put(key, self.provider, self.model_name, response)
+    
+    def _hf_parameters(self, max_tokens: int) -> Dict[str, Any]:
+        """Inference API parameters; temperature 0 turns sampling off (greedy decoding)"""
+        parameters = {"max_new_tokens": max_tokens, "return_full_text": False}
+        if self.temperature > 0:
+            parameters["temperature"] = self.temperature
+        else:
+            parameters["do_sample"] = False
+        return parameters
+    
+    def _failed(self, prompt: str, error: Exception, strict: bool) -> str:
+        print(f"{self.provider} generation error: {error}")
+        if strict:
+            raise LLMProviderError(f"{self.provider}: {error}") from error
+        return self._generate_fallback(prompt)
+    
+    def _dispatch(self, prompt: str, max_tokens: int) -> str:
         if self.provider == 'groq':
             return self._generate_groq(prompt, max_tokens)
         elif self.provider == 'huggingface_api':
@@ -253,144 +467,316 @@ class LLMProvider:
             return self._generate_ibm(prompt)
         elif self.provider == 'openai':
             return self._generate_openai(prompt, max_tokens)
-        else:
-            return self._generate_fallback(prompt)
+        raise LLMProviderError('no LLM provider configured')
     
-    def _generate_groq(self, prompt: str, max_tokens: int) -> str:
-        """Generate with Groq API"""
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.model['api_key']}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": self.model['model'],
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_tokens,
-                "temperature": 0.7
-            }
+    async def agenerate(self, prompt: str, max_tokens: int = 300, priority: int = PRIORITY_INTERACTIVE,
+                        strict: bool = False, admitted: Optional[Callable[[], None]] = None) -> str:
+        """Async generate: native async HTTP for cloud APIs, a worker thread otherwise"""
+        
+        if HTTPX_AVAILABLE and self.provider in ('groq', 'together', 'huggingface_api'):
+            key = self._cache_key(prompt, max_tokens)
+            cached = self.cache.get(key) if key else None
+            if cached is not None:
+                return cached
             
-            response = requests.post(
-                f"{self.model['base_url']}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
+            # Waiting for rate-limit budget happens off the event loop
+            charged = (await asyncio.to_thread(self._acquire, prompt, max_tokens, priority)
+                       if self.limiter.enabled else 0)
+            if admitted is not None:
+                admitted()
+            response = ''
+            try:
+                response = await self._agenerate_http(prompt, max_tokens)
+            except Exception as e:
+                response = self._failed(prompt, e, strict)
+            else:
+                self._cache_put(key, response)
+            finally:
+                self._settle(charged, prompt, response)
+            return response
+        return await asyncio.to_thread(self.generate, prompt, max_tokens, priority, strict, admitted)
+    
+    def _get_async_client(self) -> 'httpx.AsyncClient':
+        """Shared async client (one per event loop process), created on first use"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=max(POOL_SIZE, 50)),
+                # Retries failed connects only
+                transport=httpx.AsyncHTTPTransport(retries=RETRIES)
             )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"].strip()
-        except Exception as e:
-            print(f"Groq generation error: {e}")
-            return self._generate_fallback(prompt)
+        return self._async_client
     
-    def _generate_huggingface_api(self, prompt: str, max_tokens: int) -> str:
-        """Generate with Hugging Face Inference API"""
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.model['api_key']}",
-                "Content-Type": "application/json"
-            }
-            
+    async def _agenerate_http(self, prompt: str, max_tokens: int) -> str:
+        """Async request to Groq, Together or the Hugging Face Inference API"""
+        headers = {
+            "Authorization": f"Bearer {self.model['api_key']}",
+            "Content-Type": "application/json"
+        }
+        
+        if self.provider == 'huggingface_api':
+            url = f"https://api-inference.huggingface.co/models/{self.model['model']}"
             payload = {
                 "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": max_tokens,
-                    "temperature": 0.7,
-                    "return_full_text": False
-                }
+                "parameters": self._hf_parameters(max_tokens)
             }
-            
-            response = requests.post(
-                f"https://api-inference.huggingface.co/models/{self.model['model']}",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
-            
+        else:
+            url = f"{self.model['base_url']}/chat/completions"
+            payload = {
+                "model": self.model['model'],
+                "messages": [{"role": "user", "content": prompt}],
+                "max_tokens": max_tokens,
+                "temperature": self.temperature
+            }
+        
+        response = await self._get_async_client().post(url, headers=headers, json=payload)
+        self._note_rate_limit(response)
+        response.raise_for_status()
+        result = response.json()
+        
+        if self.provider == 'huggingface_api':
             if isinstance(result, list) and len(result) > 0:
                 return result[0].get("generated_text", "").strip()
             return str(result).strip()
+        return result["choices"][0]["message"]["content"].strip()
+    
+    async def aclose(self):
+        """Close the async HTTP client"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+    
+    # Providers whose APIs stream tokens natively
+    NATIVE_STREAMING = ('groq', 'together', 'ollama', 'huggingface_api')
+    
+    def generate_stream(self, prompt: str, max_tokens: int = 300,
+                        priority: int = PRIORITY_INTERACTIVE) -> TokenStream:
+        """Response text as it is generated (iterate it; stats() once done)
+        
+        Rate-limit budget is taken before returning, so LLMRateLimited is
+        raised here rather than mid-stream. A provider error, before or
+        during the stream, is raised from iteration as LLMProviderError.
+        A cached response is replayed word by word.
+        """
+        key = self._cache_key(prompt, max_tokens)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            return TokenStream(iter(WORD_CHUNK.findall(cached)), self.provider, False)
+        
+        charged = self._acquire(prompt, max_tokens, priority)
+        return TokenStream(self._settled(self._stream_chunks(prompt, max_tokens), charged, prompt, key),
+                           self.provider, self.provider in self.NATIVE_STREAMING)
+    
+    def _settled(self, chunks: Iterator[str], charged: int, prompt: str,
+                 key: Optional[str]) -> Iterator[str]:
+        """Pass chunks through, then refund unused rate-limit tokens and cache a complete response
+        
+        A failed stream raises LLMProviderError and is never cached.
+        """
+        parts = []
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                yield chunk
+            self._cache_put(key, ''.join(parts))
         except Exception as e:
-            print(f"Hugging Face API generation error: {e}")
-            return self._generate_fallback(prompt)
+            raise LLMProviderError(f"{self.provider} stream: {e}") from e
+        finally:
+            self._settle(charged, prompt, ''.join(parts))
+    
+    def _stream_chunks(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        if self.provider in ('groq', 'together'):
+            return self._stream_openai_compatible(prompt, max_tokens)
+        elif self.provider == 'ollama':
+            return self._stream_ollama(prompt, max_tokens)
+        elif self.provider == 'huggingface_api':
+            return self._stream_huggingface_api(prompt, max_tokens)
+        # No native streaming
+        return self._stream_chunked(prompt, max_tokens)
+    
+    def _stream_chunked(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """No native streaming: generate the full response, then yield it word by word"""
+        for match in WORD_CHUNK.finditer(self._dispatch(prompt, max_tokens)):
+            yield match.group(0)
+    
+    def _iter_sse(self, url: str, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """POST a streaming request and yield each server-sent 'data:' payload"""
+        headers = {
+            "Authorization": f"Bearer {self.model['api_key']}",
+            "Content-Type": "application/json"
+        }
+        
+        with self.http.post(url, headers=headers, json=payload, timeout=TIMEOUT, stream=True) as response:
+            self._note_rate_limit(response)
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                yield json.loads(data)
+    
+    def _stream_openai_compatible(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Stream from an OpenAI-compatible chat completions endpoint (Groq, Together)"""
+        payload = {
+            "model": self.model['model'],
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": self.temperature,
+            "stream": True
+        }
+        
+        for event in self._iter_sse(f"{self.model['base_url']}/chat/completions", payload):
+            choices = event.get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+    
+    def _stream_huggingface_api(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Stream from the Hugging Face Inference API (text-generation-inference events)"""
+        payload = {
+            "inputs": prompt,
+            "parameters": self._hf_parameters(max_tokens),
+            "stream": True
+        }
+        
+        url = f"https://api-inference.huggingface.co/models/{self.model['model']}"
+        for event in self._iter_sse(url, payload):
+            token = event.get("token") or {}
+            if token.get("text") and not token.get("special"):
+                yield token["text"]
+    
+    def _stream_ollama(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        """Stream from a local Ollama server"""
+        for part in self.model['client'].chat(
+            model=self.model['model'],
+            messages=[{'role': 'user', 'content': prompt}],
+            options={'num_predict': max_tokens, 'temperature': self.temperature},
+            stream=True
+        ):
+            content = part['message']['content']
+            if content:
+                yield content
+    
+    def _generate_groq(self, prompt: str, max_tokens: int) -> str:
+        """Generate with Groq API"""
+        headers = {
+            "Authorization": f"Bearer {self.model['api_key']}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": self.model['model'],
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": self.temperature
+        }
+        
+        response = self.http.post(
+            f"{self.model['base_url']}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=TIMEOUT
+        )
+        self._note_rate_limit(response)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+    
+    def _generate_huggingface_api(self, prompt: str, max_tokens: int) -> str:
+        """Generate with Hugging Face Inference API"""
+        headers = {
+            "Authorization": f"Bearer {self.model['api_key']}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "inputs": prompt,
+            "parameters": self._hf_parameters(max_tokens)
+        }
+        
+        response = self.http.post(
+            f"https://api-inference.huggingface.co/models/{self.model['model']}",
+            headers=headers,
+            json=payload,
+            timeout=TIMEOUT
+        )
+        self._note_rate_limit(response)
+        response.raise_for_status()
+        result = response.json()
+        
+        if isinstance(result, list) and len(result) > 0:
+            return result[0].get("generated_text", "").strip()
+        return str(result).strip()
     
     def _generate_together(self, prompt: str, max_tokens: int) -> str:
         """Generate with Together AI"""
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.model['api_key']}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": self.model['model'],
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": max_tokens,
-                "temperature": 0.7
-            }
-            
-            response = requests.post(
-                f"{self.model['base_url']}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"].strip()
-        except Exception as e:
-            print(f"Together AI generation error: {e}")
-            return self._generate_fallback(prompt)
+        headers = {
+            "Authorization": f"Bearer {self.model['api_key']}",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model": self.model['model'],
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": self.temperature
+        }
+        
+        response = self.http.post(
+            f"{self.model['base_url']}/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=TIMEOUT
+        )
+        self._note_rate_limit(response)
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
     
     def _generate_ollama(self, prompt: str, max_tokens: int) -> str:
         """Generate with Ollama"""
-        try:
-            response = self.model['client'].chat(
-                model=self.model['model'],
-                messages=[{'role': 'user', 'content': prompt}],
-                options={'num_predict': max_tokens}
-            )
-            return response['message']['content']
-        except Exception as e:
-            print(f"Ollama generation error: {e}")
-            return self._generate_fallback(prompt)
+        response = self.model['client'].chat(
+            model=self.model['model'],
+            messages=[{'role': 'user', 'content': prompt}],
+            options={'num_predict': max_tokens, 'temperature': self.temperature}
+        )
+        return response['message']['content']
     
     def _generate_huggingface(self, prompt: str, max_tokens: int) -> str:
         """Generate with Hugging Face"""
-        try:
-            result = self.model(prompt, max_length=max_tokens)[0]
-            return result['generated_text'].replace(prompt, '').strip()
-        except Exception as e:
-            print(f"Hugging Face generation error: {e}")
-            return self._generate_fallback(prompt)
+        result = self._get_pipeline()(prompt, max_length=max_tokens)[0]
+        return result['generated_text'].replace(prompt, '').strip()
     
     def _generate_ibm(self, prompt: str) -> str:
         """Generate with IBM Granite"""
-        try:
-            response = self.model.generate_text(prompt=prompt)
-            return response.strip()
-        except Exception as e:
-            print(f"IBM Granite generation error: {e}")
-            return self._generate_fallback(prompt)
+        response = self.model.generate_text(prompt=prompt)
+        return response.strip()
     
     def _generate_openai(self, prompt: str, max_tokens: int) -> str:
         """Generate with OpenAI"""
-        try:
-            response = self.model.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"OpenAI generation error: {e}")
-            return self._generate_fallback(prompt)
+        response = self.model.ChatCompletion.create(
+            model="gpt-3.5-turbo",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            temperature=self.temperature
+        )
+        return response.choices[0].message.content
     
     def _generate_fallback(self, prompt: str) -> str:
         """Rule-based fallback when no LLM is available"""
-        return "I can provide information about the campus. Please upload university handbook PDFs in the admin panel for detailed responses."
+        return FALLBACK_RESPONSE
     
     def is_available(self) -> bool:
-        """Check if LLM is available"""
-        return self.provider != 'fallback'
+        """Check if LLM is available (last background probe; never blocks)"""
+        return self.provider != 'fallback' and self.health.healthy
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'provider': self.provider,
+            'available': self.is_available(),
+            'temperature': self.temperature,
+            'deterministic': self.deterministic,
+            'health': self.health.get_statistics(),
+            'rate_limiter': self.limiter.get_statistics(),
+            'response_cache': self.cache.get_statistics() if self.cache is not None else None
+        }
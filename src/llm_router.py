@@ -0,0 +1,458 @@
+"""
+LLM Router - Provider Failover, Circuit Breakers and Hedging
+============================================================
+Serves generate() from an ordered chain of providers
+"""
+
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, Union
+
+from src.llm_provider import LLMProvider, LLMProviderError, TokenStream, FALLBACK_RESPONSE
+from src.metrics import Histogram
+from src.rate_limiter import LLMRateLimited, PRIORITY_INTERACTIVE
+
+# p95 is only trusted for hedging after this many successful calls
+MIN_HEDGE_SAMPLES = 20
+
+
+class CircuitBreaker:
+    """
+    Stops sending calls to a failing provider.
+
+    Opens after failure_threshold consecutive failures; after
+    reset_timeout seconds one trial call is let through (half-open), and
+    its outcome closes the breaker or opens it for another period. Only
+    allow() takes the trial slot, so call it when a call really starts,
+    and end every allowed call with record_success, record_failure or
+    release.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def _ready(self) -> bool:
+        if self.state == 'closed':
+            return True
+        if self.state == 'open':
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+        return not self._trial
+
+    def ready(self) -> bool:
+        """Would allow() let a call through (without changing state)"""
+        with self._lock:
+            return self._ready()
+
+    def allow(self) -> bool:
+        """Start a call if the breaker lets it through"""
+        with self._lock:
+            if not self._ready():
+                return False
+            if self.state != 'closed':
+                self.state = 'half_open'
+                self._trial = True
+            return True
+
+    def release(self):
+        """An allowed call ended without saying anything about the provider"""
+        with self._lock:
+            self._trial = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._trial = False
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.trips += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+
+class RoutedProvider:
+    """One provider in the chain with its breaker and latency record"""
+
+    def __init__(self, llm: LLMProvider, breaker: CircuitBreaker):
+        self.llm = llm
+        self.name = llm.provider
+        self.breaker = breaker
+        self.latency = Histogram()
+        self.ewma: Optional[float] = None
+        self.calls = 0
+        self.failures = 0
+        self.wins = 0
+
+    def record(self, seconds: float):
+        self.latency.observe(seconds * 1000)
+        self.ewma = seconds if self.ewma is None else 0.8 * self.ewma + 0.2 * seconds
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging: this provider's p95 once it is known"""
+        if self.latency.count < MIN_HEDGE_SAMPLES:
+            return None
+        return self.latency.percentile(0.95) / 1000
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'breaker': self.breaker.state,
+            'breaker_trips': self.breaker.trips,
+            'calls': self.calls,
+            'failures': self.failures,
+            'wins': self.wins,
+            'ewma_ms': round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            'latency': self.latency.to_dict(),
+            'llm': self.llm.get_statistics()
+        }
+
+
+class ProviderChain:
+    """
+    Ordered LLM providers behind the LLMProvider interface.
+
+    Each call goes to the first provider whose circuit breaker is closed
+    and that is healthy, and fails over down the chain on errors, rate-limit
+    shedding or timeouts. Configured order is kept unless a provider's
+    recent latency (EWMA) is more than slow_factor times the fastest
+    measured one, in which case it is tried after the faster ones.
+    With hedging on, if the first provider has not answered by its own
+    p95 latency the next one is started too and the first answer wins.
+    No call runs past `timeout` seconds in total, counted from when the
+    rate limiter first lets a request out: waiting for our own budget is
+    bounded by the limiter and never counts against a provider's breaker.
+    """
+
+    def __init__(self, providers: List[str], timeout: float = 12.0, hedge: bool = True,
+                 slow_factor: float = 2.0, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.timeout = timeout
+        self.hedge = hedge
+        self.slow_factor = slow_factor
+
+        self.providers: List[RoutedProvider] = []
+        for name in providers:
+            llm = LLMProvider(name)
+            if llm.provider == 'fallback':
+                print(f"⚠️  Skipping {name}: not configured")
+                continue
+            self.providers.append(RoutedProvider(llm, CircuitBreaker(failure_threshold, reset_timeout)))
+
+        self.provider = ','.join(p.name for p in self.providers) or 'fallback'
+        self.max_concurrency = int(os.getenv('LLM_MAX_CONCURRENCY', '4'))
+        self.requests_per_minute = sum(p.llm.requests_per_minute for p in self.providers)
+        # Sync calls (and hedges) run here so an abandoned slow call never blocks the caller;
+        # agenerate() uses asyncio tasks instead, so routing never waits on this pool
+        self._pool = ThreadPoolExecutor(max_workers=max(4, self.max_concurrency * 2 * len(self.providers)),
+                                        thread_name_prefix='llm-route')
+        self.stats = {'calls': 0, 'streams': 0, 'failovers': 0, 'hedges': 0, 'hedge_wins': 0,
+                      'timeouts': 0, 'exhausted': 0}
+
+    def _ordered(self) -> List[RoutedProvider]:
+        """Providers to try, best first (does not take breaker trial slots)"""
+        usable = [p for p in self.providers if p.llm.is_available() and p.breaker.ready()]
+        measured = [p.ewma for p in usable if p.ewma is not None]
+        if not measured:
+            return usable
+        fastest = min(measured)
+        return sorted(usable, key=lambda p: p.ewma is not None and p.ewma > self.slow_factor * fastest)
+
+    def _next(self, candidates: List[RoutedProvider]) -> Optional[RoutedProvider]:
+        """Pop the first candidate whose breaker lets a call start now"""
+        while candidates:
+            routed = candidates.pop(0)
+            if routed.breaker.allow():
+                routed.calls += 1
+                return routed
+        return None
+
+    def _succeeded(self, routed: RoutedProvider, seconds: float):
+        routed.record(seconds)
+        routed.breaker.record_success()
+
+    def _errored(self, routed: RoutedProvider, error: Exception):
+        if isinstance(error, LLMRateLimited):
+            # Our own budget, not the provider's health
+            routed.breaker.release()
+        else:
+            routed.failures += 1
+            routed.breaker.record_failure()
+
+    def _admitted(self, call: Dict[str, Any]) -> Callable[[], None]:
+        """Callback for when the limiter lets a call out; starts the chain's deadline"""
+        def admitted():
+            call['admitted'] = True
+            if call['timing']['deadline'] is None:
+                call['timing']['deadline'] = time.monotonic() + self.timeout
+        return admitted
+
+    def _timed_out(self, routed: RoutedProvider, call: Dict[str, Any]):
+        """Charge a call cut off by the deadline to its provider, unless it never got past our limiter"""
+        if call['admitted']:
+            routed.failures += 1
+            routed.breaker.record_failure()
+        else:
+            routed.breaker.release()
+
+    def _call(self, routed: RoutedProvider, prompt: str, max_tokens: int, priority: int,
+              call: Dict[str, Any]) -> str:
+        start = time.perf_counter()
+        try:
+            response = routed.llm.generate(prompt, max_tokens, priority=priority, strict=True,
+                                           admitted=self._admitted(call))
+        except Exception as e:
+            if not call['abandoned']:
+                self._errored(routed, e)
+            raise
+        if not call['abandoned']:
+            self._succeeded(routed, time.perf_counter() - start)
+        return response
+
+    async def _acall(self, routed: RoutedProvider, prompt: str, max_tokens: int, priority: int,
+                     call: Dict[str, Any]) -> str:
+        start = time.perf_counter()
+        try:
+            response = await routed.llm.agenerate(prompt, max_tokens, priority=priority, strict=True,
+                                                  admitted=self._admitted(call))
+        except Exception as e:
+            self._errored(routed, e)
+            raise
+        self._succeeded(routed, time.perf_counter() - start)
+        return response
+
+    def _hedge_after(self, running: Dict[Any, RoutedProvider], candidates: List[RoutedProvider]) -> Optional[float]:
+        """Seconds to wait for the only running call before hedging it, if hedging applies"""
+        if not self.hedge or len(running) != 1 or not candidates:
+            return None
+        return next(iter(running.values())).hedge_delay()
+
+    def _exhausted(self, last_error: Optional[Exception], strict: bool) -> str:
+        self.stats['exhausted'] += 1
+        if isinstance(last_error, LLMRateLimited):
+            raise last_error
+        print(f"LLM chain error: {last_error or 'no provider available'}")
+        if strict:
+            raise LLMProviderError(str(last_error or 'no provider available'))
+        return FALLBACK_RESPONSE
+
+    def generate(self, prompt: str, max_tokens: int = 300, priority: int = PRIORITY_INTERACTIVE,
+                 strict: bool = False) -> str:
+        """Answer from the first provider that succeeds (see class docstring)"""
+        self.stats['calls'] += 1
+        # Deadline is set once the limiter admits the first request
+        timing: Dict[str, Optional[float]] = {'deadline': None}
+        candidates = self._ordered()
+        running: Dict[Future, RoutedProvider] = {}
+        calls: Dict[Future, Dict[str, Any]] = {}
+        last_error: Optional[Exception] = None
+
+        def launch() -> bool:
+            routed = self._next(candidates)
+            if routed is None:
+                return False
+            call = {'abandoned': False, 'admitted': False, 'timing': timing}
+            future = self._pool.submit(self._call, routed, prompt, max_tokens, priority, call)
+            running[future] = routed
+            calls[future] = call
+            return True
+
+        launch()
+        while running:
+            leader = next(iter(running.values()))
+            hedge_after = self._hedge_after(running, candidates)
+            # Until a request is admitted, waiting `timeout` cannot overshoot the deadline it sets
+            deadline = timing['deadline']
+            remaining = deadline - time.monotonic() if deadline is not None else self.timeout
+            if remaining <= 0:
+                # Abandoned calls finish in the background without touching the breakers
+                self.stats['timeouts'] += 1
+                for future, routed in running.items():
+                    calls[future]['abandoned'] = True
+                    if future.cancel():
+                        # Still queued for a worker: the provider was never asked
+                        routed.breaker.release()
+                    else:
+                        self._timed_out(routed, calls[future])
+                last_error = LLMProviderError(f"no answer within {self.timeout}s")
+                break
+
+            done, _ = wait(list(running), timeout=min(remaining, hedge_after or remaining),
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                if hedge_after is not None and launch():
+                    self.stats['hedges'] += 1
+                continue
+
+            for future in done:
+                routed = running.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    if not running and launch():
+                        self.stats['failovers'] += 1
+                    continue
+                routed.wins += 1
+                if routed is not leader:
+                    self.stats['hedge_wins'] += 1
+                return response
+
+        return self._exhausted(last_error, strict)
+
+    async def agenerate(self, prompt: str, max_tokens: int = 300, priority: int = PRIORITY_INTERACTIVE,
+                        strict: bool = False) -> str:
+        """Async generate: the same routing, with each provider call an asyncio task"""
+        self.stats['calls'] += 1
+        # Deadline is set once the limiter admits the first request
+        timing: Dict[str, Optional[float]] = {'deadline': None}
+        candidates = self._ordered()
+        running: Dict[asyncio.Task, RoutedProvider] = {}
+        calls: Dict[asyncio.Task, Dict[str, Any]] = {}
+        last_error: Optional[Exception] = None
+
+        def launch() -> bool:
+            routed = self._next(candidates)
+            if routed is None:
+                return False
+            call = {'admitted': False, 'timing': timing}
+            task = asyncio.ensure_future(self._acall(routed, prompt, max_tokens, priority, call))
+            running[task] = routed
+            calls[task] = call
+            return True
+
+        launch()
+        while running:
+            leader = next(iter(running.values()))
+            hedge_after = self._hedge_after(running, candidates)
+            # Until a request is admitted, waiting `timeout` cannot overshoot the deadline it sets
+            deadline = timing['deadline']
+            remaining = deadline - time.monotonic() if deadline is not None else self.timeout
+            if remaining <= 0:
+                self.stats['timeouts'] += 1
+                for task, routed in running.items():
+                    task.cancel()
+                    self._timed_out(routed, calls[task])
+                last_error = LLMProviderError(f"no answer within {self.timeout}s")
+                break
+
+            done, _ = await asyncio.wait(list(running), timeout=min(remaining, hedge_after or remaining),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if hedge_after is not None and launch():
+                    self.stats['hedges'] += 1
+                continue
+
+            for task in done:
+                routed = running.pop(task)
+                try:
+                    response = task.result()
+                except Exception as e:
+                    last_error = e
+                    if not running and launch():
+                        self.stats['failovers'] += 1
+                    continue
+                for other in running:
+                    other.cancel()
+                    running[other].breaker.release()
+                routed.wins += 1
+                if routed is not leader:
+                    self.stats['hedge_wins'] += 1
+                return response
+
+        return self._exhausted(last_error, strict)
+
+    def _open_stream(self, candidates: List[RoutedProvider], prompt: str, max_tokens: int,
+                     priority: int) -> Tuple[RoutedProvider, TokenStream]:
+        """Open a stream on the first candidate that accepts one"""
+        last_error: Optional[Exception] = None
+        while True:
+            routed = self._next(candidates)
+            if routed is None:
+                break
+            try:
+                return routed, routed.llm.generate_stream(prompt, max_tokens, priority)
+            except Exception as e:
+                last_error = e
+                self._errored(routed, e)
+        if isinstance(last_error, LLMRateLimited):
+            raise last_error
+        raise LLMProviderError(str(last_error or 'no provider available'))
+
+    def generate_stream(self, prompt: str, max_tokens: int = 300,
+                        priority: int = PRIORITY_INTERACTIVE) -> TokenStream:
+        """Stream from the best provider, failing over while nothing has been sent
+
+        Streams are not hedged. The first stream is opened (and its
+        rate-limit budget taken) here, so LLMRateLimited is raised here.
+        """
+        self.stats['streams'] += 1
+        candidates = self._ordered()
+        routed, stream = self._open_stream(candidates, prompt, max_tokens, priority)
+        return TokenStream(self._failover(routed, stream, candidates, prompt, max_tokens, priority),
+                           routed.name, stream.native)
+
+    def _failover(self, routed: RoutedProvider, stream: TokenStream, candidates: List[RoutedProvider],
+                  prompt: str, max_tokens: int, priority: int) -> Iterator[str]:
+        """Chunks of the open stream; a stream that fails before its first chunk moves to the next provider"""
+        while True:
+            start = time.perf_counter()
+            produced = False
+            try:
+                for chunk in stream:
+                    produced = True
+                    yield chunk
+            except GeneratorExit:
+                # The reader stopped early; that says nothing about the provider
+                routed.breaker.release()
+                raise
+            except Exception as e:
+                self._errored(routed, e)
+                if produced:
+                    raise
+                print(f"⚠️  {routed.name} stream failed ({e}); trying the next provider")
+                self.stats['failovers'] += 1
+                routed, stream = self._open_stream(candidates, prompt, max_tokens, priority)
+                continue
+            routed.wins += 1
+            self._succeeded(routed, time.perf_counter() - start)
+            return
+
+    async def aclose(self):
+        for routed in self.providers:
+            await routed.llm.aclose()
+
+    def is_available(self) -> bool:
+        return any(p.llm.is_available() and p.breaker.ready() for p in self.providers)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return dict(self.stats, provider=self.provider, available=self.is_available(),
+                    timeout_seconds=self.timeout, hedging=self.hedge,
+                    providers={p.name: p.get_statistics() for p in self.providers})
+
+
+def create_llm() -> Union[LLMProvider, ProviderChain]:
+    """LLMProvider for LLM_PROVIDER, or a ProviderChain when LLM_PROVIDERS lists several"""
+    names = [name.strip().lower() for name in os.getenv('LLM_PROVIDERS', '').split(',') if name.strip()]
+    if len(names) < 2:
+        return LLMProvider(names[0] if names else None)
+
+    return ProviderChain(
+        names,
+        timeout=float(os.getenv('LLM_CHAIN_TIMEOUT', '12')),
+        hedge=os.getenv('LLM_HEDGE', 'true').lower() == 'true',
+        failure_threshold=int(os.getenv('LLM_BREAKER_FAILURES', '3')),
+        reset_timeout=float(os.getenv('LLM_BREAKER_RESET_SECONDS', '30'))
+    )
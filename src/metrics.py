@@ -0,0 +1,132 @@
+"""
+Metrics - Stage Latency Histograms and Counters
+================================================
+Cheap in-process instrumentation for the chat pipeline
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from typing import Dict, Any
+
+# Upper bucket bounds in milliseconds; the last bucket is open-ended
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 75, 100, 150, 200, 300, 500,
+                    750, 1000, 1500, 2000, 3000, 5000, 7500, 10000, 20000, 30000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are interpolated within a bucket"""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms < self.min:
+            self.min = ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+
+        rank = p * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                # Observed min/max tighten the edge buckets
+                lower = max(BUCKET_BOUNDS_MS[index - 1] if index else 0.0, self.min)
+                upper = min(BUCKET_BOUNDS_MS[index] if index < len(BUCKET_BOUNDS_MS) else self.max,
+                            self.max)
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'p99_ms': round(self.percentile(0.99), 3),
+            'max_ms': round(self.max, 3)
+        }
+
+
+class StageTimer:
+    """Context manager that records its duration into a stage histogram"""
+
+    __slots__ = ('metrics', 'stage', 'start')
+
+    def __init__(self, metrics: 'Metrics', stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    Named latency histograms (one per pipeline stage) plus counters.
+
+        with metrics.time('retrieval'):
+            ...
+        metrics.incr('llm_errors')
+
+    Recording is a perf_counter pair, a bisect and a few increments under
+    an uncontended lock, so it is safe to leave on in the hot path.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+
+    def time(self, stage: str) -> StageTimer:
+        return StageTimer(self, stage)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds * 1000)
+
+    def average(self, stage: str) -> float:
+        """Mean duration of a stage in seconds (0 if never observed)"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None or not histogram.count:
+                return 0.0
+            return histogram.total / histogram.count / 1000
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'stages': {stage: histogram.to_dict() for stage, histogram in self._histograms.items()},
+                'counters': dict(self._counters)
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
@@ -0,0 +1,226 @@
+"""
+Prompt Builder - Token-Budgeted Prompt Assembly
+================================================
+Builds LLM prompts that stay within a fixed token budget
+"""
+
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.config_manager import ConfigManager
+
+# Rough English average; good enough to keep prompts inside a budget
+CHARS_PER_TOKEN = 4
+
+# Blocks with less room than this left are dropped rather than truncated
+MIN_BLOCK_TOKENS = 24
+
+# "[Source n]:" header and the blank line between sources
+SOURCE_OVERHEAD_TOKENS = 5
+
+# "Conversation Summary:" section header
+SUMMARY_OVERHEAD_TOKENS = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer needed)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, at a word boundary where possible"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+
+    cut = text[:max_chars - 3]
+    space = cut.rfind(' ')
+    if space > max_chars // 2:
+        cut = cut[:space]
+    return cut.rstrip() + '...'
+
+
+def format_sources(sources: List[str]) -> str:
+    """Number retrieved sources the way the prompt and templates show them"""
+    return "\n\n".join(f"[Source {i}]:\n{source}" for i, source in enumerate(sources, 1))
+
+
+class PromptBuilder:
+    """
+    Assembles prompts from the system prompt, retrieved sources, recent
+    history and the question.
+
+    The system prompt and the fixed scaffolding around it are rendered
+    once per config version. Sources, the session's rolling summary and
+    history turns are then added by priority (top source, summary, latest
+    turn, remaining sources, older turns) until the token budget is used
+    up; a block that only partly fits is truncated, and one with too
+    little room left is dropped.
+    """
+
+    def __init__(self, config_manager: ConfigManager, history_turns: int = 3):
+        self.config = config_manager
+        self.history_turns = history_turns
+
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self.system_prompt = ''
+        self.token_budget = 0
+        self.max_source_tokens = 0
+        self._prefix_tokens = 0
+
+        self.stats = {'prompts': 0, 'tokens_total': 0, 'tokens_max': 0,
+                      'blocks_truncated': 0, 'blocks_dropped': 0}
+
+    def _compile(self):
+        """Re-render the static parts if the config changed"""
+        version = self.config.version
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+
+            self.system_prompt = self._create_system_prompt()
+            self.token_budget = int(self.config.get_value(
+                'chatbot_settings', 'prompt_token_budget',
+                default=os.getenv('PROMPT_TOKEN_BUDGET', '1500')))
+            self.max_source_tokens = int(self.config.get_value(
+                'chatbot_settings', 'prompt_source_tokens',
+                default=os.getenv('PROMPT_SOURCE_TOKENS', '400')))
+
+            # Everything except the sources, history and question
+            self._prefix_tokens = estimate_tokens(self._render(self.system_prompt, ' ', '', '', ''))
+            self._version = version
+
+    def _create_system_prompt(self) -> str:
+        """Create system prompt for LLM"""
+        campus_name = self.config.get_value('campus_info', 'name', default='University')
+        bot_name = self.config.get_value('chatbot_settings', 'bot_name', default='CampusBot')
+
+        return f"""You are {bot_name}, an AI assistant for {campus_name}.
+
+Your role: Help students, faculty, and visitors with campus queries.
+
+You can help with:
+- Fee structure and payment details
+- Exam schedules and academic calendar
+- Hostel rules and accommodation
+- Library services and timings
+- General campus information
+
+Guidelines:
+1. Be friendly, professional, and helpful
+2. Provide accurate information based on university documents
+3. If unsure, suggest contacting the relevant department
+4. Keep responses concise (2-4 sentences)
+5. Format responses clearly with bullet points when needed
+6. Always provide contact info when relevant
+
+When you lack specific information, clearly state that and suggest alternatives."""
+
+    @staticmethod
+    def _render(system_prompt: str, context: str, summary: str, history_text: str, query: str) -> str:
+        if summary:
+            history_text = f"Conversation Summary:\n{summary}\n\n{history_text}"
+
+        if context:
+            return f"""{system_prompt}
+
+Relevant Information from University Documents:
+{context}
+
+Recent Conversation:
+{history_text}
+
+User Question: {query}
+
+Assistant Response (be helpful and concise):"""
+
+        return f"""{system_prompt}
+
+Recent Conversation:
+{history_text}
+
+User Question: {query}
+
+Assistant Response:"""
+
+    def _fit(self, text: str, remaining: int, overhead: int = 0) -> Tuple[Optional[str], int]:
+        """Fit a block into the remaining budget; (None, 0) if it is dropped"""
+        tokens = estimate_tokens(text) + overhead
+        if tokens <= remaining:
+            return text, tokens
+
+        if remaining - overhead < MIN_BLOCK_TOKENS:
+            self.stats['blocks_dropped'] += 1
+            return None, 0
+
+        self.stats['blocks_truncated'] += 1
+        text = truncate_to_tokens(text, remaining - overhead)
+        return text, estimate_tokens(text) + overhead
+
+    def build(self, query: str, sources: List[str], turns: List[Any], summary: str = '') -> Tuple[str, int]:
+        """Prompt for this question and its estimated token count
+
+        sources are retrieved texts, best first; turns are session turns
+        (with .user and .bot), oldest first; summary covers older turns.
+        """
+        self._compile()
+
+        remaining = self.token_budget - self._prefix_tokens - estimate_tokens(query)
+
+        # Priority order: best source, summary, latest turn, other sources, older turns
+        turns = list(turns)[-self.history_turns:] if self.history_turns else []
+        sources_first = [('source', i) for i in range(len(sources))]
+        history = [('turn', i) for i in reversed(range(len(turns)))]
+        candidates = (sources_first[:1] + ([('summary', 0)] if summary else [])
+                      + history[:1] + sources_first[1:] + history[1:])
+
+        kept_sources: Dict[int, str] = {}
+        kept_turns: Dict[int, str] = {}
+        kept_summary = ''
+        for kind, index in candidates:
+            if kind == 'source':
+                text = truncate_to_tokens(sources[index], self.max_source_tokens)
+                text, tokens = self._fit(text, remaining, SOURCE_OVERHEAD_TOKENS)
+            elif kind == 'summary':
+                text, tokens = self._fit(summary, remaining, SUMMARY_OVERHEAD_TOKENS)
+            else:
+                turn = turns[index]
+                text, tokens = self._fit(f"User: {turn.user}\nAssistant: {turn.bot}\n\n", remaining)
+            if text is None:
+                continue
+
+            remaining -= tokens
+            if kind == 'source':
+                kept_sources[index] = text
+            elif kind == 'summary':
+                kept_summary = text
+            else:
+                kept_turns[index] = text
+
+        context = format_sources([kept_sources[i] for i in sorted(kept_sources)])
+        history_text = ''.join(kept_turns[i] for i in sorted(kept_turns))
+
+        prompt = self._render(self.system_prompt, context, kept_summary, history_text, query)
+        tokens = estimate_tokens(prompt)
+
+        self.stats['prompts'] += 1
+        self.stats['tokens_total'] += tokens
+        self.stats['tokens_max'] = max(self.stats['tokens_max'], tokens)
+        return prompt, tokens
+
+    def get_statistics(self) -> Dict[str, Any]:
+        self._compile()
+        prompts = self.stats['prompts']
+        return {
+            'token_budget': self.token_budget,
+            'prompts': prompts,
+            'avg_tokens': round(self.stats['tokens_total'] / prompts, 1) if prompts else 0.0,
+            'max_tokens': self.stats['tokens_max'],
+            'blocks_truncated': self.stats['blocks_truncated'],
+            'blocks_dropped': self.stats['blocks_dropped']
+        }
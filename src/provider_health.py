@@ -0,0 +1,110 @@
+"""
+Provider Health - Background Availability Probing
+=================================================
+Checks the LLM provider off the request path; is_available() just reads the result
+"""
+
+import time
+import threading
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+
+
+class ProviderHealth:
+    """
+    Periodic health probe for one LLM provider.
+
+    probe() returns True when the provider is usable, False when it is
+    reachable but refuses us (bad key, unknown model), None when it
+    answered without a verdict (rate limited), and raises when it cannot
+    be reached or errors. Only a refusal marks the provider unhealthy at
+    once; a rate limit keeps the last known state, and errors do too
+    until `failure_threshold` probes in a row have failed. Probes run on
+    a daemon thread every `interval` seconds (every `retry_interval`
+    while unhealthy). Until the first probe finishes the provider is
+    assumed healthy, so startup never waits on the network. Without a
+    probe (or with interval <= 0) the provider is always reported healthy.
+    """
+
+    def __init__(self, name: str, probe: Optional[Callable[[], Optional[bool]]] = None,
+                 interval: float = 60.0, retry_interval: float = 15.0, failure_threshold: int = 3):
+        self.name = name
+        self.probe = probe
+        self.interval = interval
+        self.retry_interval = retry_interval
+        self.failure_threshold = max(1, failure_threshold)
+
+        self.healthy = True
+        self.status = 'unknown' if probe else 'unchecked'
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[str] = None
+        self.probe_ms = 0.0
+        self.probes = 0
+        self.failures = 0
+        # Probe errors since the last conclusive answer
+        self.consecutive_errors = 0
+
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if probe is not None and interval > 0:
+            self._thread = threading.Thread(target=self._loop, name=f'{name}-health', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while not self._stopped.is_set():
+            self.check()
+            self._stopped.wait(self.interval if self.healthy else self.retry_interval)
+
+    def check(self) -> bool:
+        """Run the probe once, record the outcome and return the resulting health"""
+        start = time.perf_counter()
+        try:
+            verdict = self.probe()
+            error = {True: None, False: 'rejected by provider', None: 'rate limited'}[verdict]
+        except Exception as e:
+            verdict, error = None, str(e)
+            self.consecutive_errors += 1
+            self.failures += 1
+        else:
+            if verdict is not None:
+                self.consecutive_errors = 0
+            if verdict is False:
+                self.failures += 1
+
+        self.probe_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.probes += 1
+        self.checked_at = datetime.now().isoformat()
+        self.last_error = error
+
+        if verdict is not None:
+            ok = verdict
+        elif self.consecutive_errors >= self.failure_threshold:
+            ok = False
+        else:
+            # Transient trouble (timeout, 5xx, 429): keep the last known state
+            return self.healthy
+
+        if ok != self.healthy or self.status == 'unknown':
+            if ok:
+                print(f"✅ {self.name} is reachable ({self.probe_ms} ms)")
+            else:
+                print(f"⚠️  {self.name} unavailable: {error}")
+
+        self.healthy = ok
+        self.status = 'healthy' if ok else 'unhealthy'
+        return ok
+
+    def stop(self):
+        self._stopped.set()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'status': self.status,
+            'healthy': self.healthy,
+            'last_error': self.last_error,
+            'checked_at': self.checked_at,
+            'probe_ms': self.probe_ms,
+            'probes': self.probes,
+            'failures': self.failures,
+            'consecutive_errors': self.consecutive_errors
+        }
@@ -0,0 +1,313 @@
+"""
+Rate Limiter - Client-Side Token Buckets for LLM Calls
+======================================================
+Keeps requests and tokens under the provider's per-minute limits
+"""
+
+import os
+import time
+import heapq
+import sqlite3
+import itertools
+import threading
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from src.metrics import Histogram
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: 'interactive', PRIORITY_BATCH: 'batch',
+                  PRIORITY_BACKGROUND: 'background'}
+
+
+class LLMRateLimited(Exception):
+    """The call was shed: the queue is full or it could not start before its deadline"""
+
+    def __init__(self, reason: str, wait: float = 0.0):
+        super().__init__(f"LLM rate limit: {reason}" + (f" (~{wait:.1f}s wait)" if wait else ''))
+        self.reason = reason
+        self.wait = wait
+
+
+class LocalBuckets:
+    """Token buckets held in this process: name -> (capacity, refill per second)"""
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]]):
+        self.limits = limits
+        self._lock = threading.Lock()
+        now = time.time()
+        self._levels = {name: (capacity, now) for name, (capacity, _) in limits.items()}
+        self._blocked_until = 0.0
+
+    def _level(self, name: str, now: float) -> float:
+        capacity, rate = self.limits[name]
+        tokens, updated = self._levels[name]
+        return min(capacity, tokens + (now - updated) * rate)
+
+    def _take(self, costs: Dict[str, float], now: float) -> float:
+        if self._blocked_until > now:
+            return self._blocked_until - now
+
+        levels = {name: self._level(name, now) for name in self.limits}
+        wait = 0.0
+        for name, level in levels.items():
+            shortfall = costs.get(name, 0.0) - level
+            if shortfall > 0:
+                wait = max(wait, shortfall / self.limits[name][1])
+        if wait > 0:
+            return wait
+
+        for name, level in levels.items():
+            self._levels[name] = (level - costs.get(name, 0.0), now)
+        return 0.0
+
+    def _adjust(self, name: str, delta: float, now: float):
+        if name in self.limits:
+            self._levels[name] = (min(self.limits[name][0], self._level(name, now) + delta), now)
+
+    def _block(self, until: float):
+        self._blocked_until = max(self._blocked_until, until)
+
+    def levels(self) -> Dict[str, float]:
+        now = time.time()
+        with self._lock:
+            return {name: self._level(name, now) for name in self.limits}
+
+    def try_take(self, costs: Dict[str, float]) -> float:
+        """Take all costs at once and return 0, or return seconds until they would fit"""
+        with self._lock:
+            return self._take(costs, time.time())
+
+    def adjust(self, name: str, delta: float):
+        """Give back (delta > 0) or charge extra (delta < 0) tokens"""
+        with self._lock:
+            self._adjust(name, delta, time.time())
+
+    def block_until(self, until: float):
+        with self._lock:
+            self._block(until)
+
+
+class SQLiteBuckets(LocalBuckets):
+    """
+    The same buckets kept in a SQLite file, so every worker process on
+    the host draws from one budget. Each update is one short IMMEDIATE
+    transaction (WAL mode, so it never blocks readers).
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], db_path: str):
+        super().__init__(limits)
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.execute("""CREATE TABLE IF NOT EXISTS buckets (
+            name TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL)""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS blocked (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            until REAL NOT NULL)""")
+        now = time.time()
+        for name, (capacity, _) in limits.items():
+            conn.execute('INSERT OR IGNORE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)',
+                         (name, capacity, now))
+        conn.execute('INSERT OR IGNORE INTO blocked (id, until) VALUES (1, 0)')
+
+    def _conn(self) -> sqlite3.Connection:
+        """One autocommit connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conn: sqlite3.Connection):
+        for name, tokens, updated in conn.execute('SELECT name, tokens, updated FROM buckets'):
+            if name in self.limits:
+                self._levels[name] = (tokens, updated)
+        self._blocked_until = conn.execute('SELECT until FROM blocked WHERE id = 1').fetchone()[0]
+
+    def _update(self, apply: Callable[[float], Any]) -> Any:
+        """Load, apply and store the shared state in one transaction"""
+        conn = self._conn()
+        with self._lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._load(conn)
+                result = apply(time.time())
+                conn.executemany('UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?',
+                                 [(tokens, updated, name) for name, (tokens, updated) in self._levels.items()])
+                conn.execute('UPDATE blocked SET until = ? WHERE id = 1', (self._blocked_until,))
+                conn.execute('COMMIT')
+                return result
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def levels(self) -> Dict[str, float]:
+        conn = self._conn()
+        with self._lock:
+            self._load(conn)
+            now = time.time()
+            return {name: self._level(name, now) for name in self.limits}
+
+    def try_take(self, costs: Dict[str, float]) -> float:
+        return self._update(lambda now: self._take(costs, now))
+
+    def adjust(self, name: str, delta: float):
+        self._update(lambda now: self._adjust(name, delta, now))
+
+    def block_until(self, until: float):
+        self._update(lambda now: self._block(until))
+
+
+class RateLimiter:
+    """
+    Client-side limiter for LLM calls: a requests/min and a tokens/min bucket.
+
+    acquire() blocks until both buckets can pay for the call. Waiters
+    queue by priority (interactive chat before batch jobs before
+    background work), FIFO within a priority, and the queue is bounded.
+    A call whose estimated start time is already past its deadline is
+    shed at once with LLMRateLimited, instead of waiting only to time
+    out; callers fall back to template answers. Tokens are charged up
+    front (prompt + max_tokens) and the unused part is refunded by
+    settle(). A 429 from the provider pauses all calls via penalize().
+
+    With db_path, buckets live in SQLite and are shared by every process
+    on the host; the priority queue is always per process.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0,
+                 max_queue: int = 100, max_wait: Optional[Dict[int, float]] = None,
+                 db_path: Optional[str] = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self.max_wait = {PRIORITY_INTERACTIVE: 10.0, PRIORITY_BATCH: 300.0, PRIORITY_BACKGROUND: 2.0}
+        self.max_wait.update(max_wait or {})
+
+        limits = {}
+        if requests_per_minute > 0:
+            limits['requests'] = (float(requests_per_minute), requests_per_minute / 60.0)
+        if tokens_per_minute > 0:
+            limits['tokens'] = (float(tokens_per_minute), tokens_per_minute / 60.0)
+        self.enabled = bool(limits)
+        self.shared = bool(db_path) and self.enabled
+        self._buckets = SQLiteBuckets(limits, db_path) if self.shared else LocalBuckets(limits)
+
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int, int]] = []
+        self._sequence = itertools.count()
+
+        self.acquired = 0
+        self.shed = {'queue_full': 0, 'deadline': 0}
+        self.penalties = 0
+        self.max_queue_depth = 0
+        self._waits = {name: Histogram() for name in PRIORITY_NAMES.values()}
+
+    def _costs(self, tokens: int) -> Dict[str, float]:
+        costs = {'requests': 1.0}
+        if self.tokens_per_minute > 0:
+            # A prompt bigger than the whole budget still gets through, eventually
+            costs['tokens'] = float(min(tokens, self.tokens_per_minute))
+        return costs
+
+    def _estimate_wait(self, ahead: int, tokens: int) -> float:
+        """Rough seconds until a call with `ahead` callers in front of it can start"""
+        wait = 0.0
+        for name, level in self._buckets.levels().items():
+            capacity, rate = self._buckets.limits[name]
+            need = (ahead + 1) * (1.0 if name == 'requests' else min(tokens, capacity))
+            wait = max(wait, (need - level) / rate)
+        return wait
+
+    def _shed(self, reason: str, wait: float = 0.0):
+        self.shed[reason] += 1
+        raise LLMRateLimited(reason, wait)
+
+    def acquire(self, tokens: int = 0, priority: int = PRIORITY_INTERACTIVE,
+                max_wait: Optional[float] = None) -> float:
+        """Wait for budget for one call of ~tokens tokens; returns seconds waited"""
+        if not self.enabled:
+            return 0.0
+
+        if max_wait is None:
+            max_wait = self.max_wait.get(priority, self.max_wait[PRIORITY_INTERACTIVE])
+        start = time.monotonic()
+        deadline = start + max_wait
+        costs = self._costs(tokens)
+
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self._shed('queue_full')
+
+            ahead = sum(1 for entry in self._queue if entry[0] <= priority)
+            estimate = self._estimate_wait(ahead, tokens)
+            if estimate > max_wait:
+                self._shed('deadline', estimate)
+
+            entry = (priority, next(self._sequence), threading.get_ident())
+            heapq.heappush(self._queue, entry)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if self._queue[0] is entry:
+                        wait = self._buckets.try_take(costs)
+                        if not wait:
+                            break
+                        if wait > remaining:
+                            self._shed('deadline', wait)
+                        self._cond.wait(wait)
+                    else:
+                        if remaining <= 0:
+                            self._shed('deadline')
+                        self._cond.wait(remaining)
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - start
+            self.acquired += 1
+            self._waits[PRIORITY_NAMES.get(priority, 'background')].observe(waited * 1000)
+            return waited
+
+    def settle(self, charged: int, used: int):
+        """Refund the part of a call's token charge it did not use"""
+        if self.tokens_per_minute > 0 and charged > used:
+            self._buckets.adjust('tokens', min(charged, self.tokens_per_minute) - used)
+
+    def penalize(self, retry_after: float):
+        """Provider said 429: hold every call for retry_after seconds"""
+        if not self.enabled:
+            return
+        self.penalties += 1
+        self._buckets.block_until(time.time() + retry_after)
+        with self._cond:
+            self._cond.notify_all()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'shared': self.shared,
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'queue_depth': len(self._queue),
+            'max_queue_depth': self.max_queue_depth,
+            'acquired': self.acquired,
+            'shed': dict(self.shed),
+            'provider_429s': self.penalties,
+            'wait': {name: histogram.to_dict() for name, histogram in self._waits.items() if histogram.count},
+            'available': {name: round(level, 1) for name, level in self._buckets.levels().items()}
+                         if self.enabled else {}
+        }
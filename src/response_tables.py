@@ -0,0 +1,119 @@
+"""
+Response Tables - Precomputed Templates and Actions
+===================================================
+Per-intent fallback templates, follow-up actions and department info
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Dict, List, Optional
+
+from src.config_manager import ConfigManager
+
+# Follow-up suggestions per intent (static; not part of the campus config)
+RELATED_ACTIONS = {
+    'fees': (
+        {"label": "💳 Payment Methods", "query": "What payment methods are available?"},
+        {"label": "🎓 Scholarships", "query": "Tell me about scholarships"},
+        {"label": "📋 Fee Breakdown", "query": "Show detailed fee breakdown"}
+    ),
+    'exams': (
+        {"label": "📅 Full Schedule", "query": "Show complete exam schedule"},
+        {"label": "📊 Results", "query": "How to check results?"},
+        {"label": "📝 Revaluation", "query": "Revaluation process"}
+    ),
+    'hostel': (
+        {"label": "🍽️ Mess Info", "query": "Tell me about mess facilities"},
+        {"label": "🚪 Room Allocation", "query": "How is room allocation done?"},
+        {"label": "📋 Rules", "query": "What are the hostel rules?"}
+    ),
+    'library': (
+        {"label": "⏰ Timings", "query": "Library timings?"},
+        {"label": "📖 Borrowing", "query": "How to borrow books?"},
+        {"label": "💻 E-Resources", "query": "Available e-resources?"}
+    ),
+    'general': (
+        {"label": "📞 Contacts", "query": "How to contact departments?"},
+        {"label": "📅 Calendar", "query": "Academic calendar"},
+        {"label": "🗺️ Campus Info", "query": "Tell me about the campus"}
+    )
+}
+
+INTENTS = tuple(RELATED_ACTIONS)
+
+
+class ResponseTables:
+    """
+    Intent-keyed lookup tables rendered from the campus config.
+
+    Fallback templates, the contact footer appended to document answers,
+    related actions and department info are built once per config
+    version into read-only mappings, so each request is a dict lookup.
+    """
+
+    def __init__(self, config_manager: ConfigManager):
+        self.config = config_manager
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._templates: MappingProxyType = MappingProxyType({})
+        self._footers: MappingProxyType = MappingProxyType({})
+        self._actions: MappingProxyType = MappingProxyType({})
+        self._departments: MappingProxyType = MappingProxyType({})
+        self.rebuilds = 0
+
+    def _compile(self):
+        """Re-render the tables if the config changed"""
+        version = self.config.version
+        if version == self._version:
+            return
+
+        with self._lock:
+            if version == self._version:
+                return
+
+            departments = {intent: self.config.get_department_info(intent) for intent in INTENTS}
+            self._templates = MappingProxyType(self._render_templates(departments))
+            self._footers = MappingProxyType({
+                intent: (f"For more details, contact:\n📧 {department.get('contact')}\n📞 {department.get('phone')}"
+                         if department else '')
+                for intent, department in departments.items()
+            })
+            self._actions = MappingProxyType(RELATED_ACTIONS)
+            self._departments = MappingProxyType(departments)
+            self._version = version
+            self.rebuilds += 1
+
+    def _render_templates(self, departments: Dict[str, Optional[Dict[str, str]]]) -> Dict[str, str]:
+        """No-context fallback answer for each intent"""
+        def field(intent: str, key: str, default: str) -> str:
+            department = departments.get(intent)
+            return department.get(key) if department else default
+
+        return {
+            'fees': f"💰 **Fee Information**\n\nFor detailed fee structure and payment information:\n\n📧 Email: {field('fees', 'contact', 'fees@university.edu')}\n📞 Phone: {field('fees', 'phone', 'See admin office')}\n📍 Location: {field('fees', 'location', 'Admin Block')}\n\n💡 Tip: Upload fee structure PDFs in the admin panel for detailed answers!",
+
+            'exams': f"📝 **Examination Information**\n\nFor exam schedules and related queries:\n\n📧 Email: {field('exams', 'contact', 'exams@university.edu')}\n📞 Phone: {field('exams', 'phone', 'See exam cell')}\n📍 Location: {field('exams', 'location', 'Academic Block')}\n\n💡 Tip: Upload exam schedule PDFs in the admin panel!",
+
+            'hostel': f"🏠 **Hostel Information**\n\nFor hostel rules and accommodation:\n\n📧 Email: {field('hostel', 'contact', 'hostel@university.edu')}\n📞 Phone: {field('hostel', 'phone', 'See hostel office')}\n📍 Location: {field('hostel', 'location', 'Hostel Office')}\n\n💡 Tip: Upload hostel handbook PDFs for detailed information!",
+
+            'library': f"📚 **Library Information**\n\nFor library services and timings:\n\n📧 Email: {field('library', 'contact', 'library@university.edu')}\n📞 Phone: {field('library', 'phone', 'See library desk')}\n📍 Location: {field('library', 'location', 'Central Library')}\n⏰ Hours: {field('library', 'hours', 'Mon-Sat: 8 AM - 10 PM')}\n\n💡 Tip: Upload library handbook PDFs for complete details!",
+
+            'general': f"I'd be happy to help! I can assist with:\n\n💰 Fee Structure\n📝 Exam Schedules\n🏠 Hostel Information\n📚 Library Services\n\nPlease ask a specific question, or contact the administration office:\n📧 {self.config.get_value('campus_info', 'contact_email')}\n📞 {self.config.get_value('campus_info', 'contact_phone')}"
+        }
+
+    def template(self, intent: str) -> str:
+        self._compile()
+        return self._templates.get(intent) or self._templates['general']
+
+    def footer(self, intent: str) -> str:
+        """Department contact lines for answers built from documents ('' if none)"""
+        self._compile()
+        return self._footers.get(intent, '')
+
+    def actions(self, intent: str) -> List[Dict[str, str]]:
+        self._compile()
+        return list(self._actions.get(intent) or self._actions['general'])
+
+    def department(self, intent: str) -> Optional[Dict[str, str]]:
+        self._compile()
+        return self._departments.get(intent)
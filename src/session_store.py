@@ -0,0 +1,541 @@
+"""
+Session Store - Bounded Conversation Memory
+============================================
+Session backends: in-process LRU/TTL store, or SQLite shared by workers
+"""
+
+import os
+import sys
+import time
+import atexit
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, Callable, List, Optional
+
+
+class Turn:
+    """One user/bot exchange"""
+
+    __slots__ = ('user', 'bot', 'intent', 'timestamp')
+
+    def __init__(self, user: str, bot: str, intent: str, timestamp: Optional[float] = None):
+        self.user = user
+        self.bot = bot
+        self.intent = intent
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'user': self.user,
+            'bot': self.bot,
+            'intent': self.intent,
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat()
+        }
+
+
+class Session:
+    """Conversation state for one session ID"""
+
+    __slots__ = ('id', 'created_at', 'last_access', 'history', 'context', 'turn_count', 'summary')
+
+    def __init__(self, session_id: str, max_turns: int):
+        now = time.time()
+        self.id = session_id
+        self.created_at = now
+        self.last_access = now
+        self.history: deque = deque(maxlen=max_turns)
+        self.context: Dict[str, Any] = {}
+        self.turn_count = 0
+        # Compact memory of turns older than the prompt's history window
+        self.summary = ''
+
+    def recent(self, n: int) -> List[Turn]:
+        """Last n turns, oldest first"""
+        if n >= len(self.history):
+            return list(self.history)
+        return list(islice(self.history, len(self.history) - n, None))
+
+    def add_turn(self, turn: Turn):
+        self.history.append(turn)
+        self.turn_count += 1
+
+
+class SessionBackend:
+    """
+    Interface for session storage.
+
+    get() returns a Session holding the recent turns; append_turn()
+    records an exchange. shared is True when other worker processes
+    see the same sessions, so clients need not resend their history.
+    on_created, if set, is called with a count whenever the store
+    creates sessions (once per session, however many workers share it).
+    """
+
+    shared = False
+    on_created: Optional[Callable[[int], None]] = None
+
+    def get(self, session_id: str) -> Session:
+        raise NotImplementedError
+
+    def append_turn(self, session_id: str, user: str, bot: str, intent: str) -> Turn:
+        raise NotImplementedError
+
+    def recent_turns(self, session_id: str, n: int) -> List[Turn]:
+        return self.get(session_id).recent(n)
+
+    def _created(self, count: int):
+        if count and self.on_created is not None:
+            self.on_created(count)
+
+    def set_summary(self, session_id: str, summary: str):
+        """Replace the rolling summary of a live session (without touching it)"""
+        raise NotImplementedError
+
+    def peek_summary(self, session_id: str) -> Optional[str]:
+        """Rolling summary of a live session, or None; unlike get() this never
+        creates the session or refreshes its last access"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def total_turns(self) -> int:
+        raise NotImplementedError
+
+    def get_statistics(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def flush(self):
+        """Write out any buffered changes"""
+
+    def close(self):
+        self.flush()
+
+
+class InMemorySessionBackend(SessionBackend):
+    """
+    In-process session storage with bounded memory.
+
+    Sessions live in an OrderedDict kept in last-access order, so the
+    least recently used session is always at the front. Idle sessions
+    past the TTL are dropped from the front on each access, and the
+    oldest session is evicted once max_sessions is reached. Each session
+    keeps only its last max_turns turns.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 1800, max_turns: int = 6):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+
+        self._sessions: 'OrderedDict[str, Session]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.evicted_lru = 0
+        self.evicted_ttl = 0
+        self._total_turns = 0
+
+    @property
+    def total_turns(self) -> int:
+        return self._total_turns
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def _expire(self, now: float):
+        """Drop idle sessions; they are all at the front of the LRU order"""
+        cutoff = now - self.ttl_seconds
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_access >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            self.evicted_ttl += 1
+
+    def get(self, session_id: str) -> Session:
+        """Get or create a session, marking it as most recently used"""
+        now = time.time()
+        created = False
+
+        with self._lock:
+            self._expire(now)
+
+            session = self._sessions.get(session_id)
+            if session is None:
+                while len(self._sessions) >= self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evicted_lru += 1
+                session = Session(session_id, self.max_turns)
+                self._sessions[session_id] = session
+                created = True
+            else:
+                self._sessions.move_to_end(session_id)
+
+            session.last_access = now
+
+        if created:
+            self._created(1)
+        return session
+
+    def append_turn(self, session_id: str, user: str, bot: str, intent: str) -> Turn:
+        """Record an exchange on a session"""
+        session = self.get(session_id)
+        turn = Turn(user, bot, intent)
+
+        with self._lock:
+            session.add_turn(turn)
+            self._total_turns += 1
+
+        return turn
+
+    def set_summary(self, session_id: str, summary: str):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.summary = summary
+
+    def peek_summary(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.last_access < time.time() - self.ttl_seconds:
+                return None
+            return session.summary
+
+    def _estimate_session_bytes(self, sample_size: int = 50) -> float:
+        """Approximate deep size of a session, averaged over the most recent ones"""
+        sessions = list(islice(reversed(self._sessions.values()), sample_size))
+        if not sessions:
+            return 0.0
+
+        total = 0
+        for session in sessions:
+            total += (sys.getsizeof(session) + sys.getsizeof(session.history)
+                      + sys.getsizeof(session.context) + sys.getsizeof(session.summary))
+            for turn in session.history:
+                total += (sys.getsizeof(turn) + sys.getsizeof(turn.user)
+                          + sys.getsizeof(turn.bot) + sys.getsizeof(turn.timestamp))
+        return total / len(sessions)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Occupancy, eviction and memory figures"""
+        with self._lock:
+            per_session = self._estimate_session_bytes()
+            active = len(self._sessions)
+
+        return {
+            'backend': 'memory',
+            'active_sessions': active,
+            'max_sessions': self.max_sessions,
+            'ttl_seconds': self.ttl_seconds,
+            'max_turns': self.max_turns,
+            'evicted_lru': self.evicted_lru,
+            'evicted_ttl': self.evicted_ttl,
+            'bytes_per_session': round(per_session),
+            'approx_total_bytes': round(per_session * active)
+        }
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Session storage in a SQLite file shared by all workers on a host.
+
+    The database runs in WAL mode so readers never block the writer.
+    Writes are buffered and committed in batches by a background thread
+    (every flush_interval seconds, or sooner once batch_size writes are
+    queued); reads in the same process merge the unflushed buffer, so a
+    worker always sees its own writes. Statement strings are constant,
+    so sqlite3's statement cache reuses the compiled statements.
+    """
+
+    shared = True
+
+    def __init__(self, db_path: str = 'data/sessions.db', max_sessions: int = 10000,
+                 ttl_seconds: float = 1800, max_turns: int = 6,
+                 flush_interval: float = 0.05, batch_size: int = 64):
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_turns = max_turns
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Held while a batch commits, so readers never miss turns in flight
+        self._flush_lock = threading.Lock()
+        self._pending_turns: List[tuple] = []
+        self._pending_touches: Dict[str, float] = {}
+        self._pending_summaries: Dict[str, str] = {}
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self.evicted_lru = 0
+        self.evicted_ttl = 0
+        self.flushes = 0
+
+        self._init_schema()
+        self._last_cleanup = 0.0
+
+        self._writer = threading.Thread(target=self._writer_loop, name='session-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, cached_statements=64)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                turn_count INTEGER NOT NULL DEFAULT 0,
+                summary TEXT NOT NULL DEFAULT '')""")
+            # Databases created before rolling summaries lack the column
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(sessions)')}
+            if 'summary' not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN summary TEXT NOT NULL DEFAULT ''")
+            conn.execute("""CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                user TEXT NOT NULL,
+                bot TEXT NOT NULL,
+                intent TEXT,
+                timestamp REAL NOT NULL)""")
+            conn.execute('CREATE INDEX IF NOT EXISTS turns_by_session ON turns (session_id, id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS sessions_by_access ON sessions (last_access)')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('total_turns', 0)")
+
+    # ---------- reads ----------
+
+    def get(self, session_id: str) -> Session:
+        now = time.time()
+        conn = self._conn()
+        session = Session(session_id, self.max_turns)
+
+        with self._flush_lock:
+            row = conn.execute('SELECT created_at, last_access, turn_count, summary FROM sessions WHERE id = ?',
+                               (session_id,)).fetchone()
+            rows = conn.execute('SELECT user, bot, intent, timestamp FROM turns WHERE session_id = ? '
+                                'ORDER BY id DESC LIMIT ?', (session_id, self.max_turns)).fetchall()
+
+            if row and row[1] >= now - self.ttl_seconds:
+                session.created_at = row[0]
+                session.turn_count = row[2]
+                session.summary = row[3]
+                for user, bot, intent, timestamp in reversed(rows):
+                    session.history.append(Turn(user, bot, intent, timestamp))
+
+            with self._lock:
+                for pending in self._pending_turns:
+                    if pending[0] == session_id:
+                        session.add_turn(Turn(*pending[1:]))
+                if session_id in self._pending_summaries:
+                    session.summary = self._pending_summaries[session_id]
+                self._pending_touches[session_id] = now
+
+        session.last_access = now
+        return session
+
+    def __len__(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        return self._conn().execute('SELECT COUNT(*) FROM sessions WHERE last_access >= ?',
+                                    (cutoff,)).fetchone()[0]
+
+    @property
+    def total_turns(self) -> int:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'total_turns'").fetchone()
+        with self._lock:
+            pending = len(self._pending_turns)
+        return (row[0] if row else 0) + pending
+
+    # ---------- writes ----------
+
+    def append_turn(self, session_id: str, user: str, bot: str, intent: str) -> Turn:
+        turn = Turn(user, bot, intent)
+
+        with self._lock:
+            self._pending_turns.append((session_id, user, bot, intent, turn.timestamp))
+            self._pending_touches[session_id] = turn.timestamp
+            if len(self._pending_turns) >= self.batch_size:
+                self._wakeup.set()
+
+        return turn
+
+    def set_summary(self, session_id: str, summary: str):
+        # Not a touch: a summary rewritten in the background must not keep the session alive
+        with self._lock:
+            self._pending_summaries[session_id] = summary
+
+    def peek_summary(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            if session_id in self._pending_summaries:
+                return self._pending_summaries[session_id]
+            touched = session_id in self._pending_touches
+
+        row = self._conn().execute('SELECT last_access, summary FROM sessions WHERE id = ?',
+                                   (session_id,)).fetchone()
+        if row and row[0] >= time.time() - self.ttl_seconds:
+            return row[1]
+        # Created by a turn that has not been flushed yet
+        return '' if touched else None
+
+    def _writer_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Session flush error: {e}")
+
+    def flush(self):
+        """Commit buffered turns and access times in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                turns, self._pending_turns = self._pending_turns, []
+                touches, self._pending_touches = self._pending_touches, {}
+                summaries, self._pending_summaries = self._pending_summaries, {}
+
+            if turns or touches or summaries:
+                try:
+                    self._commit(turns, touches, summaries)
+                except Exception:
+                    # Put the batch back so the next flush retries it
+                    with self._lock:
+                        self._pending_turns[:0] = turns
+                        for sid, ts in touches.items():
+                            self._pending_touches.setdefault(sid, ts)
+                        for sid, summary in summaries.items():
+                            self._pending_summaries.setdefault(sid, summary)
+                    raise
+
+        if time.time() - self._last_cleanup > 60:
+            self._cleanup()
+
+    def _commit(self, turns: List[tuple], touches: Dict[str, float], summaries: Dict[str, str]):
+        conn = self._conn()
+        counts: Dict[str, int] = {}
+        for pending in turns:
+            counts[pending[0]] = counts.get(pending[0], 0) + 1
+
+        with conn:
+            # Writes to a session that expired before cleanup reached it start a fresh one;
+            # checked in the same transaction so another worker cannot touch it in between
+            conn.execute('BEGIN IMMEDIATE')
+            expired = []
+            created = 0
+            for sid, ts in touches.items():
+                row = conn.execute('SELECT last_access FROM sessions WHERE id = ?', (sid,)).fetchone()
+                if row and row[0] < ts - self.ttl_seconds:
+                    expired.append((sid,))
+                if row is None or row[0] < ts - self.ttl_seconds:
+                    created += 1
+            if expired:
+                conn.executemany('DELETE FROM turns WHERE session_id = ?', expired)
+                conn.executemany('DELETE FROM sessions WHERE id = ?', expired)
+
+            conn.executemany(
+                'INSERT INTO sessions (id, created_at, last_access) VALUES (?, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET last_access = MAX(last_access, excluded.last_access)',
+                [(sid, ts, ts) for sid, ts in touches.items()])
+            conn.executemany('INSERT INTO turns (session_id, user, bot, intent, timestamp) VALUES (?, ?, ?, ?, ?)',
+                             turns)
+            conn.executemany('UPDATE sessions SET turn_count = turn_count + ? WHERE id = ?',
+                             [(n, sid) for sid, n in counts.items()])
+            # Keep only the last max_turns turns of each touched session
+            conn.executemany(
+                'DELETE FROM turns WHERE session_id = ? AND id <= '
+                '(SELECT id FROM turns WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)',
+                [(sid, sid, self.max_turns) for sid in counts])
+            conn.executemany('UPDATE sessions SET summary = ? WHERE id = ?',
+                             [(summary, sid) for sid, summary in summaries.items()])
+            conn.execute("UPDATE meta SET value = value + ? WHERE key = 'total_turns'", (len(turns),))
+
+        self.evicted_ttl += len(expired)
+        self.flushes += 1
+        # Counted here, where the row is inserted, so workers sharing the file never double count
+        self._created(created)
+
+    def _cleanup(self):
+        """Expire idle sessions and trim to max_sessions, oldest first"""
+        self._last_cleanup = time.time()
+        conn = self._conn()
+        cutoff = self._last_cleanup - self.ttl_seconds
+
+        with conn:
+            expired = conn.execute('DELETE FROM sessions WHERE last_access < ?', (cutoff,)).rowcount
+            overflow = conn.execute(
+                'DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY last_access DESC '
+                'LIMIT -1 OFFSET ?)', (self.max_sessions,)).rowcount
+            if expired or overflow:
+                conn.execute('DELETE FROM turns WHERE session_id NOT IN (SELECT id FROM sessions)')
+
+        self.evicted_ttl += expired
+        self.evicted_lru += overflow
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=1.0)
+        self.flush()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending_turns)
+
+        return {
+            'backend': 'sqlite',
+            'db_path': self.db_path,
+            'active_sessions': len(self),
+            'max_sessions': self.max_sessions,
+            'ttl_seconds': self.ttl_seconds,
+            'max_turns': self.max_turns,
+            'evicted_lru': self.evicted_lru,
+            'evicted_ttl': self.evicted_ttl,
+            'pending_writes': pending,
+            'flushes': self.flushes
+        }
+
+
+def create_session_backend(ttl_seconds: float = 1800) -> SessionBackend:
+    """Session backend selected by SESSION_BACKEND (memory or sqlite)"""
+    backend = os.getenv('SESSION_BACKEND', 'memory').lower()
+    max_sessions = int(os.getenv('SESSION_MAX_COUNT', '10000'))
+    max_turns = int(os.getenv('SESSION_HISTORY_TURNS', '6'))
+
+    if backend == 'sqlite':
+        try:
+            return SQLiteSessionBackend(
+                db_path=os.getenv('SESSION_DB_PATH', 'data/sessions.db'),
+                max_sessions=max_sessions,
+                ttl_seconds=ttl_seconds,
+                max_turns=max_turns
+            )
+        except Exception as e:
+            print(f"⚠️  SQLite session backend error: {e}, using in-memory sessions")
+    elif backend != 'memory':
+        print(f"⚠️  Unknown session backend: {backend}, using in-memory sessions")
+
+    return InMemorySessionBackend(max_sessions=max_sessions, ttl_seconds=ttl_seconds, max_turns=max_turns)
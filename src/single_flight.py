@@ -0,0 +1,146 @@
+"""
+Single Flight - Coalesce Identical Concurrent Requests
+======================================================
+One LLM call per question in flight; concurrent duplicates share it
+"""
+
+import time
+import asyncio
+import threading
+from typing import Dict, Any, Callable, Awaitable, Hashable, List, Tuple
+
+
+class _Call:
+    """One in-flight computation and the followers waiting on it"""
+
+    __slots__ = ('done', 'result', 'ok', 'deadline', 'followers', 'futures')
+
+    def __init__(self, deadline: float):
+        self.done = threading.Event()
+        self.result: Any = None
+        # False when the leader raised
+        self.ok = False
+        self.deadline = deadline
+        self.followers = 0
+        self.futures: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+class SingleFlight:
+    """
+    Request coalescing keyed by (normalized query, intent, context fingerprint).
+
+    The first caller for a key (the leader) runs the computation; callers
+    arriving while it is in flight wait for the leader's result instead of
+    running their own. Followers never wait past the leader's deadline
+    (start + timeout): if it has not finished by then they get None and
+    fall back on their own. A leader failure is also shared as None.
+    Threads and asyncio tasks can lead or follow each other's calls.
+    calls_saved counts only followers of a leader that succeeded.
+    """
+
+    def __init__(self, timeout: float = 30.0, enabled: bool = True):
+        self.timeout = timeout
+        self.enabled = enabled
+
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.shared = 0
+        self.failed = 0
+        self.timeouts = 0
+
+    def _join(self, key: Hashable) -> Tuple[_Call, bool]:
+        """In-flight call for key and whether this caller leads it"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                return call, False
+            call = self._calls[key] = _Call(time.monotonic() + self.timeout)
+            self.leaders += 1
+            return call, True
+
+    def _finish(self, key: Hashable, call: _Call, result: Any, ok: bool):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            call.result = result
+            call.ok = ok
+            call.done.set()
+            futures, call.futures = call.futures, []
+
+        for loop, future in futures:
+            loop.call_soon_threadsafe(self._resolve, future, result)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Any):
+        if not future.done():
+            future.set_result(result)
+
+    def _followed(self, call: _Call, finished: bool) -> Any:
+        with self._lock:
+            if not finished:
+                self.timeouts += 1
+            elif call.ok:
+                self.shared += 1
+            else:
+                self.failed += 1
+        return call.result if finished else None
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn once per key in flight; returns (result, shared)"""
+        if not self.enabled:
+            return fn(), False
+
+        call, leader = self._join(key)
+        if not leader:
+            finished = call.done.wait(max(0.0, call.deadline - time.monotonic()))
+            return self._followed(call, finished), True
+
+        result, ok = None, False
+        try:
+            result = fn()
+            ok = True
+            return result, False
+        finally:
+            self._finish(key, call, result, ok)
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async do(): followers await the leader without holding a thread"""
+        if not self.enabled:
+            return await fn(), False
+
+        call, leader = self._join(key)
+        if not leader:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            with self._lock:
+                if call.done.is_set():
+                    future.set_result(call.result)
+                else:
+                    call.futures.append((loop, future))
+            try:
+                await asyncio.wait_for(future, max(0.0, call.deadline - time.monotonic()))
+                return self._followed(call, True), True
+            except asyncio.TimeoutError:
+                return self._followed(call, False), True
+
+        result, ok = None, False
+        try:
+            result = await fn()
+            ok = True
+            return result, False
+        finally:
+            self._finish(key, call, result, ok)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'calls_saved': self.shared,
+            'leader_failures_shared': self.failed,
+            'follower_timeouts': self.timeouts,
+            'timeout_seconds': self.timeout
+        }
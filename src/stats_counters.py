@@ -0,0 +1,195 @@
+"""
+Stats Counters - Persistent Incremental Counters
+=================================================
+Running totals updated on each write, so reading stats is O(1)
+"""
+
+import os
+import json
+import atexit
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Any, Tuple
+
+# Group name used for the plain (ungrouped) counters
+PLAIN = ''
+
+
+class StatsCounters:
+    """
+    Named counters plus grouped counters (e.g. messages per intent).
+
+    Increments only touch memory; a background thread adds them to a
+    SQLite file at most every save_interval seconds (and once more at
+    exit) with `value = value + ?`, so every worker process on the host
+    can share one file without losing counts, and totals survive
+    restarts. Reads return the shared totals as of the last save plus
+    this process's unsaved increments.
+    """
+
+    def __init__(self, path: str = 'data/stats.db', save_interval: float = 5.0):
+        self.path = path
+        self.save_interval = save_interval
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        # One save at a time, so the same increments are never added twice
+        self._save_lock = threading.Lock()
+        self._local = threading.local()
+        # (group, name) -> count; saved totals and this process's unsaved deltas
+        self._totals: Dict[Tuple[str, str], int] = {}
+        self._pending: Dict[Tuple[str, str], int] = {}
+        self.since = datetime.now().isoformat()
+        self._load()
+
+        self._closed = False
+        self._wakeup = threading.Event()
+        self._saver = threading.Thread(target=self._saver_loop, name='stats-saver', daemon=True)
+        self._saver.start()
+        atexit.register(self.close)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One autocommit connection per thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            try:
+                conn.execute('PRAGMA journal_mode=WAL')
+            except sqlite3.OperationalError:
+                # Another worker is switching the new file to WAL right now
+                pass
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _load(self):
+        conn = self._conn()
+        conn.execute("""CREATE TABLE IF NOT EXISTS counters (
+            grp TEXT NOT NULL,
+            name TEXT NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (grp, name))""")
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'since'").fetchone() is None:
+                self._import_json(conn)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('since', ?)", (self.since,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self.since = conn.execute("SELECT value FROM meta WHERE key = 'since'").fetchone()[0]
+        self._refresh(conn)
+
+    def _import_json(self, conn: sqlite3.Connection):
+        """Carry over totals from the JSON file earlier versions wrote next to the database"""
+        json_path = os.path.splitext(self.path)[0] + '.json'
+        if not os.path.exists(json_path):
+            return
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            rows = [(PLAIN, name, value) for name, value in data.get('counters', {}).items()]
+            rows += [(group, name, value) for group, counts in data.get('groups', {}).items()
+                     for name, value in counts.items()]
+            conn.executemany('INSERT OR IGNORE INTO counters (grp, name, value) VALUES (?, ?, ?)', rows)
+            self.since = data.get('since', self.since)
+        except Exception as e:
+            print(f"⚠️  Stats import error: {e}")
+
+    def _read_totals(self, conn: sqlite3.Connection) -> Dict[Tuple[str, str], int]:
+        return {(group, name): value
+                for group, name, value in conn.execute('SELECT grp, name, value FROM counters')}
+
+    def _refresh(self, conn: sqlite3.Connection):
+        totals = self._read_totals(conn)
+        with self._lock:
+            self._totals = totals
+
+    def save(self):
+        """Add this process's increments to the shared totals"""
+        with self._save_lock:
+            self._save()
+
+    def _save(self):
+        with self._lock:
+            pending = dict(self._pending)
+
+        try:
+            conn = self._conn()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(
+                    'INSERT INTO counters (grp, name, value) VALUES (?, ?, ?) '
+                    'ON CONFLICT (grp, name) DO UPDATE SET value = value + excluded.value',
+                    [(group, name, amount) for (group, name), amount in pending.items()])
+                # Picks up the other workers' counts too
+                totals = self._read_totals(conn)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except Exception as e:
+            print(f"Stats save error: {e}")
+            return
+
+        # Swap in the new totals and drop what they now include, in one step
+        with self._lock:
+            self._totals = totals
+            for key, amount in pending.items():
+                left = self._pending.get(key, 0) - amount
+                if left:
+                    self._pending[key] = left
+                else:
+                    self._pending.pop(key, None)
+
+    def _saver_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.save_interval)
+            self.save()
+
+    def _add(self, key: Tuple[str, str], amount: int):
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + amount
+
+    def incr(self, name: str, amount: int = 1):
+        self._add((PLAIN, name), amount)
+
+    def incr_group(self, group: str, key: str, amount: int = 1):
+        self._add((group, key), amount)
+
+    def get(self, name: str) -> int:
+        key = (PLAIN, name)
+        with self._lock:
+            return self._totals.get(key, 0) + self._pending.get(key, 0)
+
+    def _merged(self) -> Dict[Tuple[str, str], int]:
+        with self._lock:
+            merged = dict(self._totals)
+            for key, amount in self._pending.items():
+                merged[key] = merged.get(key, 0) + amount
+        return merged
+
+    def get_group(self, group: str) -> Dict[str, int]:
+        return {name: value for (grp, name), value in self._merged().items() if grp == group}
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._saver.join(timeout=1.0)
+        self.save()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        for (group, name), value in sorted(self._merged().items()):
+            if group == PLAIN:
+                stats[name] = value
+            else:
+                stats.setdefault(group, {})[name] = value
+        stats['since'] = self.since
+        return stats
@@ -162,10 +162,12 @@ document.getElementById('document-upload-form')?.addEventListener('submit', asyn
         
         const result = await response.json();
         
-        if (response.ok) {
+        if (response.ok && result.status === 'success') {
             showToast(`Document processed! Created ${result.chunks} knowledge chunks.`, 'success');
             fileInput.value = '';
             loadDocuments();
+        } else if (response.ok) {
+            showToast(result.message, result.status === 'duplicate' ? 'info' : 'error');
         } else {
             showToast('Processing failed: ' + result.error, 'error');
         }
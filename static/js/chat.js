@@ -117,7 +117,11 @@ async function sendMessage() {
     sendBtn.disabled = true;
     
     try {
-        // Send via REST API
+        // Stream tokens as they arrive; fall back to the plain REST call
+        if (await streamBotMessage(message)) {
+            return;
+        }
+        
         const response = await fetch('/api/chat', {
             method: 'POST',
             headers: {
@@ -147,6 +151,97 @@ async function sendMessage() {
     }
 }
 
+async function streamBotMessage(message) {
+    if (!window.ReadableStream || !window.TextDecoder) {
+        return false;
+    }
+    
+    const response = await fetch('/api/chat/stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            message: message,
+            session_id: sessionId
+        })
+    });
+    
+    if (!response.ok || !response.body) {
+        return false;
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    let meta = {};
+    let pending = null;
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const event = parseServerEvent(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+            
+            if (event.name === 'meta') {
+                meta = event.data;
+            } else if (event.name === 'token') {
+                text += event.data.text;
+                if (!pending) {
+                    pending = createPendingBotMessage();
+                }
+                pending.querySelector('.message-text').innerHTML = formatBotResponse(text);
+                scrollToBottom();
+            } else if (event.name === 'reset') {
+                // The stream broke off; the server's fallback answer replaces it
+                text = '';
+            } else if (event.name === 'done') {
+                text = event.data.response;
+            } else if (event.name === 'error') {
+                if (pending) pending.remove();
+                showError(event.data.error || 'Failed to get response');
+                return true;
+            }
+        }
+    }
+    
+    // Replace the live bubble with the finished message and its actions
+    if (pending) pending.remove();
+    displayBotMessage({ ...meta, response: text });
+    return true;
+}
+
+function parseServerEvent(raw) {
+    const event = { name: 'message', data: {} };
+    raw.split('\n').forEach(line => {
+        if (line.startsWith('event:')) {
+            event.name = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+            event.data = JSON.parse(line.slice(5));
+        }
+    });
+    return event;
+}
+
+function createPendingBotMessage() {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = 'message bot-message';
+    messageDiv.innerHTML = `
+        <div class="message-avatar">🤖</div>
+        <div class="message-content">
+            <div class="message-text"></div>
+        </div>
+    `;
+    messagesContainer.appendChild(messageDiv);
+    return messageDiv;
+}
+
 function displayUserMessage(text) {
     const messageDiv = document.createElement('div');
     messageDiv.className = 'message user-message';
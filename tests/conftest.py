@@ -0,0 +1,30 @@
+"""
+Shared test fixtures
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CONFIG_PATH = os.path.join(ROOT, 'config', 'campus_config.json')
+
+
+@pytest.fixture
+def make_pdf():
+    """Write a simple text PDF, one list of lines per page"""
+    canvas = pytest.importorskip('reportlab.pdfgen.canvas')
+
+    def make(path, pages):
+        pdf = canvas.Canvas(str(path))
+        for lines in pages:
+            for i, line in enumerate(lines):
+                pdf.drawString(72, 720 - 16 * i, line)
+            pdf.showPage()
+        pdf.save()
+        return str(path)
+
+    return make
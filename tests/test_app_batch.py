@@ -0,0 +1,51 @@
+import importlib
+
+import pytest
+
+
+class StubChatbot:
+    def get_responses(self, pairs):
+        return [{'response': f'Re: {message}', 'session_id': session_id} for message, session_id in pairs]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # The app sets itself up on import; keep its data files out of the tree
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('STATS_PATH', str(tmp_path / 'stats.db'))
+    app_backup = importlib.import_module('app_backup')
+    monkeypatch.setattr(app_backup, 'chatbot', StubChatbot())
+    monkeypatch.setattr(app_backup, 'BATCH_MAX_SIZE', 3)
+    return app_backup.app.test_client()
+
+
+def test_batch_answers_each_message(client):
+    response = client.post('/api/chat/batch', json={'requests': [
+        {'message': ' Fees? ', 'session_id': 's1'}, {'message': 'Exams?'}]})
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [
+        {'response': 'Re: Fees?', 'session_id': 's1'}, {'response': 'Re: Exams?', 'session_id': 'default'}]
+
+
+@pytest.mark.parametrize('body', [
+    {'requests': []},
+    {},
+    ['Fees?'],
+    {'requests': 'Fees?'},
+    {'requests': ['Fees?']},
+    {'requests': [{'session_id': 's1'}]},
+    {'requests': [{'message': 42}]},
+    {'requests': [{'message': '   '}]},
+    {'requests': [{'message': 'x' * 501}]},
+    {'requests': [{'message': 'Fees?', 'session_id': 7}]},
+    {'requests': [{'message': 'Fees?'}] * 4},
+])
+def test_invalid_batch_is_rejected(client, body):
+    response = client.post('/api/chat/batch', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_non_json_body_is_rejected(client):
+    response = client.post('/api/chat/batch', data='requests', content_type='text/plain')
+    assert response.status_code == 400
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from src.conversation_summary import ConversationSummarizer
+from src.session_store import InMemorySessionBackend, SQLiteSessionBackend, Turn
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_sessions(request, tmp_path):
+    opened = []
+
+    def make(max_turns, ttl_seconds=1800):
+        if request.param == 'memory':
+            sessions = InMemorySessionBackend(ttl_seconds=ttl_seconds, max_turns=max_turns)
+        else:
+            sessions = SQLiteSessionBackend(str(tmp_path / 'sessions.db'), ttl_seconds=ttl_seconds,
+                                            max_turns=max_turns)
+        opened.append(sessions)
+        return sessions
+
+    yield make
+    for sessions in opened:
+        sessions.close()
+
+
+def chat(summarizer, sessions, session_id, turns):
+    for i in range(turns):
+        session = sessions.get(session_id)
+        summarizer.record_turn(sessions, session, f'Question {i}?', f'Answer {i}.', 'general')
+
+
+def test_history_shorter_than_window_still_folds(make_sessions):
+    # SESSION_HISTORY_TURNS=2 with a 3-turn prompt window
+    sessions = make_sessions(max_turns=2)
+    summarizer = ConversationSummarizer(window=3)
+    chat(summarizer, sessions, 's1', 5)
+
+    session = sessions.get('s1')
+    assert [turn.user for turn in session.history] == ['Question 3?', 'Question 4?']
+    assert session.summary.splitlines() == [f'- User asked: Question {i}? → Answer {i}.' for i in range(3)]
+
+
+def test_window_inside_history_folds_turns_leaving_prompt(make_sessions):
+    sessions = make_sessions(max_turns=6)
+    summarizer = ConversationSummarizer(window=3)
+    chat(summarizer, sessions, 's1', 5)
+    assert sessions.get('s1').summary.splitlines() == [
+        '- User asked: Question 0? → Answer 0.', '- User asked: Question 1? → Answer 1.']
+
+
+class StubLLM:
+    def generate(self, prompt, max_tokens, priority):
+        return 'Student asked about fees.'
+
+
+def stored_access(sessions, session_id):
+    if isinstance(sessions, InMemorySessionBackend):
+        return sessions._sessions[session_id].last_access
+    sessions.flush()
+    return sessions._conn().execute('SELECT last_access FROM sessions WHERE id = ?',
+                                    (session_id,)).fetchone()[0]
+
+
+def test_rewrite_does_not_touch_session(make_sessions):
+    sessions = make_sessions(max_turns=6)
+    summarizer = ConversationSummarizer(window=1)
+    chat(summarizer, sessions, 's1', 2)
+    summarizer.llm = StubLLM()
+    extractive = sessions.peek_summary('s1')
+    last_access = stored_access(sessions, 's1')
+
+    time.sleep(0.01)
+    summarizer._rewrite(sessions, 's1', '', Turn('Question 0?', 'Answer 0.', 'general'), extractive)
+
+    assert sessions.peek_summary('s1') == 'Student asked about fees.'
+    assert stored_access(sessions, 's1') == last_access
+    assert sessions.peek_summary('missing') is None and len(sessions) == 1
+
+
+def test_rewrite_skips_expired_session(make_sessions):
+    sessions = make_sessions(max_turns=6, ttl_seconds=0.2)
+    summarizer = ConversationSummarizer(window=1)
+    chat(summarizer, sessions, 's1', 2)
+    summarizer.llm = StubLLM()
+    extractive = sessions.peek_summary('s1')
+    sessions.flush()
+    time.sleep(0.3)
+
+    summarizer._rewrite(sessions, 's1', '', Turn('Question 0?', 'Answer 0.', 'general'), extractive)
+    assert summarizer.stats['llm_rewrites'] == 0
+    assert sessions.peek_summary('s1') is None
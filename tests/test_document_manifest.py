@@ -0,0 +1,71 @@
+import multiprocessing
+
+import pytest
+
+from conftest import CONFIG_PATH
+from src.config_manager import ConfigManager
+from src.document_manifest import DocumentManifest
+from src.document_processor import DocumentProcessor
+from src.knowledge_base import KnowledgeBase
+
+
+def entry(filename, category='fees'):
+    return {'filename': filename, 'category': category, 'sha256': filename, 'chunk_ids': []}
+
+
+def add_entries(path, worker, count):
+    manifest = DocumentManifest(path)
+    for i in range(count):
+        manifest.add(entry(f'{worker}_{i}.pdf'))
+
+
+@pytest.mark.skipif(not hasattr(__import__('os'), 'fork'), reason='needs fork')
+def test_concurrent_workers_keep_every_entry(tmp_path):
+    path = str(tmp_path / 'manifest.json')
+    ctx = multiprocessing.get_context('fork')
+    workers = [ctx.Process(target=add_entries, args=(path, w, 25)) for w in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+    manifest = DocumentManifest(path)
+    assert manifest.count() == 100
+    assert manifest.version == 100
+
+
+def test_version_survives_reload(tmp_path):
+    path = str(tmp_path / 'manifest.json')
+    first, second = DocumentManifest(path), DocumentManifest(path)
+    first.add(entry('a.pdf'))
+    second.add(entry('b.pdf'))
+    assert first.current_version() == 2
+    assert {e['filename'] for e in first.list()} == {'a.pdf', 'b.pdf'}
+
+
+def test_knowledge_base_reloads_after_another_worker_stores(tmp_path):
+    def worker():
+        kb = KnowledgeBase(str(tmp_path / 'kb'))
+        return kb, DocumentProcessor(ConfigManager(CONFIG_PATH), knowledge_base=kb,
+                                     documents_dir=str(tmp_path / 'documents'))
+
+    (kb_a, uploads_a), (kb_b, uploads_b) = worker(), worker()
+    (tmp_path / 'documents' / 'hostel_guide.pdf').write_bytes(b'%PDF-1.4')
+    with uploads_a.manifest.locked():
+        doc_ids = uploads_a.store_chunks('hostel_guide.pdf', 'hostel',
+                                         ['Hostel curfew is 10 PM on weekdays'])
+        uploads_a.register_document('hostel_guide.pdf', 'hostel', doc_ids)
+
+    version = kb_b.version
+    assert kb_b.search('hostel curfew', category='hostel')
+    assert kb_b.version > version
+
+    # Worker B's later write keeps worker A's chunks
+    (tmp_path / 'documents' / 'fees_guide.pdf').write_bytes(b'%PDF-1.4')
+    with uploads_b.manifest.locked():
+        doc_ids = uploads_b.store_chunks('fees_guide.pdf', 'fees', ['Tuition is due by August 15'])
+        uploads_b.register_document('fees_guide.pdf', 'fees', doc_ids)
+    assert kb_a.get_statistics()['total_documents'] == 2
+
+    assert uploads_b.delete_document('hostel_guide.pdf')
+    assert not kb_a.search('hostel curfew', category='hostel')
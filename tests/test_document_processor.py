@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from conftest import CONFIG_PATH
+from src.config_manager import ConfigManager
+from src.document_processor import DocumentProcessor
+
+pdfplumber = pytest.importorskip('pdfplumber')
+
+
+def table_page(pdf, rows):
+    """Draw a ruled table (grid lines plus cell text) on the current page"""
+    xs, ys = [72, 222, 372], [700 - 24 * i for i in range(len(rows) + 1)]
+    pdf.grid(xs, ys)
+    for i, (left, right) in enumerate(rows):
+        pdf.drawString(78, ys[i] - 17, left)
+        pdf.drawString(228, ys[i] - 17, right)
+    pdf.showPage()
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.setenv('TABLE_PAGE_BUDGET_SECONDS', '0.2')
+    return DocumentProcessor(ConfigManager(CONFIG_PATH), documents_dir=str(tmp_path / 'documents'))
+
+
+@pytest.fixture
+def fee_tables_pdf(tmp_path):
+    canvas = pytest.importorskip('reportlab.pdfgen.canvas')
+    path = str(tmp_path / 'fees.pdf')
+    pdf = canvas.Canvas(path)
+    table_page(pdf, [('Slow page', 'Amount'), ('Library fine', '50')])
+    table_page(pdf, [('Tuition', '45000'), ('Hostel', '30000')])
+    table_page(pdf, [('Exam fee', '1500'), ('Lab fee', '2500')])
+    pdf.drawString(72, 700, 'Fees are payable online through the student portal.')
+    pdf.showPage()
+    pdf.save()
+    return path
+
+
+def test_slow_page_does_not_disable_tables_on_later_pages(processor, fee_tables_pdf, monkeypatch):
+    extract_text = pdfplumber.page.Page.extract_text
+
+    def slow_first_page(page, *args, **kwargs):
+        if page.page_number == 1:
+            time.sleep(0.3)
+        return extract_text(page, *args, **kwargs)
+
+    monkeypatch.setattr(pdfplumber.page.Page, 'extract_text', slow_first_page)
+    stats = processor._new_extraction_stats()
+    text = processor._extract_text(fee_tables_pdf, stats)
+
+    assert stats['pages'] == 4
+    assert stats['pages_over_budget'] == 1
+    assert stats['pages_table_extracted'] == 2
+    assert stats['pages_skipped_precheck'] == 1
+    assert 'Tuition | 45000' in text and 'Exam fee | 1500' in text
+
+    # Only the pre-checked page counts as saved, at the average table cost
+    average = stats['table_seconds'] / stats['pages_table_extracted']
+    assert stats['estimated_seconds_saved'] == pytest.approx(average)
+
+
+def test_file_budget_caps_table_time(processor, fee_tables_pdf):
+    processor.table_file_budget = 1e-9
+    stats = processor._new_extraction_stats()
+    processor._extract_text(fee_tables_pdf, stats)
+
+    assert stats['pages_table_extracted'] == 1
+    assert stats['pages_over_budget'] == 2
+    assert stats['pages_skipped_precheck'] == 1
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+import ingest_documents
+from conftest import CONFIG_PATH
+from src.knowledge_base import KnowledgeBase
+from src.document_manifest import DocumentManifest
+
+pytest.importorskip('pdfplumber')
+
+
+def run_ingest(tmp_path, *extra):
+    return ingest_documents.main([
+        str(tmp_path / 'source'), '--workers', '1', '--config', CONFIG_PATH,
+        '--manifest', str(tmp_path / 'ingest.json'),
+        '--documents-dir', str(tmp_path / 'documents'),
+        '--kb-dir', str(tmp_path / 'kb'), *extra])
+
+
+def stored_chunks(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / 'kb'))
+    return [doc for docs in kb.simple_store.values() for doc in docs]
+
+
+@pytest.fixture(autouse=True)
+def extraction_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('EXTRACTION_CACHE_DIR', str(tmp_path / 'cache'))
+
+
+def test_modified_file_replaces_old_chunks(tmp_path, make_pdf):
+    pdf = tmp_path / 'source' / 'fees' / 'handbook.pdf'
+    pdf.parent.mkdir(parents=True)
+    make_pdf(pdf, [['Tuition fee for the first semester is due by August 15.',
+                    'Late payment carries a fine of 500 rupees per week.']])
+    assert run_ingest(tmp_path) == 0
+    first = stored_chunks(tmp_path)
+    assert first and all('August 15' in doc['content'] for doc in first)
+
+    make_pdf(pdf, [['Tuition fee for the first semester is now due by September 1.',
+                    'Late payment carries a fine of 750 rupees per week.']])
+    assert run_ingest(tmp_path) == 0
+
+    chunks = stored_chunks(tmp_path)
+    assert chunks and all('September 1' in doc['content'] for doc in chunks)
+    assert not {doc['id'] for doc in first} & {doc['id'] for doc in chunks}
+
+    documents = DocumentManifest(str(tmp_path / 'documents' / 'manifest.json')).list()
+    assert len(documents) == 1
+    assert sorted(p.name for p in (tmp_path / 'documents').glob('*.pdf')) == [documents[0]['filename']]
+
+
+def test_known_content_is_skipped(tmp_path, make_pdf):
+    source = tmp_path / 'source'
+    source.mkdir()
+    lines = [['The central library is open from 8 AM to 10 PM on weekdays.',
+              'Students may borrow up to four books for fourteen days.']]
+    make_pdf(source / 'library.pdf', lines)
+    assert run_ingest(tmp_path) == 0
+
+    # Same content under a new path is already in the knowledge base
+    (source / 'copy.pdf').write_bytes((source / 'library.pdf').read_bytes())
+    assert run_ingest(tmp_path, '--report', str(tmp_path / 'report.json')) == 0
+
+    report = json.loads((tmp_path / 'report.json').read_text())
+    assert report['files'] == 0 and report['skipped'] == 2
+    assert len(DocumentManifest(str(tmp_path / 'documents' / 'manifest.json')).list()) == 1
+
+
+def test_force_reingests_without_duplicates(tmp_path, make_pdf):
+    source = tmp_path / 'source'
+    source.mkdir()
+    make_pdf(source / 'hostel.pdf', [['Hostel rooms are allotted at the start of each semester.',
+                                      'Mess fees are paid along with the hostel fee.']])
+    assert run_ingest(tmp_path) == 0
+    first = {doc['id'] for doc in stored_chunks(tmp_path)}
+
+    assert run_ingest(tmp_path, '--force') == 0
+    chunks = {doc['id'] for doc in stored_chunks(tmp_path)}
+    assert chunks and not first & chunks
+    assert len(DocumentManifest(str(tmp_path / 'documents' / 'manifest.json')).list()) == 1
@@ -0,0 +1,79 @@
+import time
+import asyncio
+
+import pytest
+
+from src.llm_provider import LLMProviderError
+from src.llm_router import CircuitBreaker, ProviderChain, RoutedProvider
+
+
+class StubLLM:
+    """Provider that waits `queued` seconds for rate-limit budget, then `seconds` on the call"""
+
+    def __init__(self, name, queued=0.0, seconds=0.0, error=None):
+        self.provider = name
+        self.queued = queued
+        self.seconds = seconds
+        self.error = error
+
+    def is_available(self):
+        return True
+
+    def generate(self, prompt, max_tokens=300, priority=0, strict=False, admitted=None):
+        time.sleep(self.queued)
+        admitted()
+        time.sleep(self.seconds)
+        if self.error:
+            raise LLMProviderError(self.error)
+        return f'{self.provider} answer'
+
+    async def agenerate(self, prompt, max_tokens=300, priority=0, strict=False, admitted=None):
+        await asyncio.sleep(self.queued)
+        admitted()
+        await asyncio.sleep(self.seconds)
+        if self.error:
+            raise LLMProviderError(self.error)
+        return f'{self.provider} answer'
+
+
+def chain(*llms, timeout=0.3):
+    routed = ProviderChain([], timeout=timeout, hedge=False)
+    routed.providers = [RoutedProvider(llm, CircuitBreaker(failure_threshold=1)) for llm in llms]
+    return routed
+
+
+def ask(router, mode):
+    if mode == 'async':
+        return asyncio.run(router.agenerate('When is the exam?', strict=True))
+    return router.generate('When is the exam?', strict=True)
+
+
+@pytest.fixture(params=['sync', 'async'])
+def mode(request):
+    return request.param
+
+
+def test_limiter_wait_does_not_count_toward_deadline(mode):
+    router = chain(StubLLM('groq', queued=0.4, seconds=0.1))
+    assert ask(router, mode) == 'groq answer'
+    assert router.stats['timeouts'] == 0
+
+
+def test_admitted_call_past_deadline_is_a_failure(mode):
+    router = chain(StubLLM('groq', seconds=1.0))
+    with pytest.raises(LLMProviderError):
+        ask(router, mode)
+    groq = router.providers[0]
+    assert router.stats['timeouts'] == 1
+    assert groq.failures == 1 and groq.breaker.state == 'open'
+
+
+def test_call_still_waiting_on_limiter_is_not_a_failure(mode):
+    # groq fails after admission (starting the deadline); together is still queued when it passes
+    router = chain(StubLLM('groq', seconds=0.05, error='502 Bad Gateway'),
+                   StubLLM('together', queued=1.0))
+    with pytest.raises(LLMProviderError):
+        ask(router, mode)
+    together = router.providers[1]
+    assert router.stats['timeouts'] == 1
+    assert together.failures == 0 and together.breaker.state == 'closed'
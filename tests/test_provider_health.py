@@ -0,0 +1,50 @@
+import pytest
+
+from src.provider_health import ProviderHealth
+
+
+def scripted(*outcomes):
+    """Probe that plays back results, raising any exception in the script"""
+    queue = list(outcomes)
+
+    def probe():
+        outcome = queue.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return probe
+
+
+@pytest.mark.parametrize('transient', [TimeoutError('read timed out'), None])
+def test_transient_errors_keep_last_state(transient):
+    health = ProviderHealth('groq', scripted(True, transient, transient, False, transient, True),
+                            interval=0, failure_threshold=3)
+    assert health.check() is True
+    assert health.check() is True and health.check() is True
+    assert health.status == 'healthy'
+
+    # A refusal (bad key, missing model) is conclusive
+    assert health.check() is False
+    assert health.check() is False
+    assert health.check() is True and health.status == 'healthy'
+
+
+def test_unreachable_after_consecutive_errors():
+    down = ConnectionError('connection refused')
+    health = ProviderHealth('groq', scripted(True, down, down, down, True),
+                            interval=0, failure_threshold=3)
+    health.check()
+    assert health.check() and health.check()
+    assert health.check() is False and health.status == 'unhealthy'
+    assert health.get_statistics()['consecutive_errors'] == 3
+    assert health.check() is True and health.consecutive_errors == 0
+
+
+def test_rate_limit_does_not_count_toward_threshold():
+    down = ConnectionError('connection refused')
+    health = ProviderHealth('groq', scripted(down, down, None, None, None),
+                            interval=0, failure_threshold=3)
+    for _ in range(5):
+        assert health.check() is True
+    assert health.status == 'unknown' and health.failures == 2
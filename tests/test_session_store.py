@@ -0,0 +1,47 @@
+import time
+
+from src.session_store import InMemorySessionBackend, SQLiteSessionBackend
+
+
+def counting(sessions):
+    created = []
+    sessions.on_created = created.append
+    return created
+
+
+def test_memory_counts_each_session_once():
+    sessions = InMemorySessionBackend(ttl_seconds=0.05)
+    created = counting(sessions)
+
+    # Repeat visits before the first turn is recorded are the same session
+    sessions.get('s1')
+    sessions.get('s1')
+    sessions.get('s2')
+    assert sum(created) == 2
+
+    # An expired session starts a new one
+    time.sleep(0.1)
+    sessions.get('s1')
+    assert sum(created) == 3
+
+
+def test_sqlite_workers_sharing_a_file_count_once(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    first = SQLiteSessionBackend(path, ttl_seconds=1800)
+    second = SQLiteSessionBackend(path, ttl_seconds=1800)
+    created = counting(first)
+    second.on_created = created.append
+    try:
+        first.get('s1')
+        second.get('s1')
+        first.get('s1')
+        first.flush()
+        second.flush()
+        assert sum(created) == 1
+
+        second.get('s2')
+        second.flush()
+        assert sum(created) == 2
+    finally:
+        first.close()
+        second.close()
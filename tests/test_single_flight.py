@@ -0,0 +1,73 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from src.single_flight import SingleFlight
+
+
+def lead_and_follow(flight, fn):
+    """Start a leader running fn, then a follower on the same key; return both outcomes"""
+    started, release = threading.Event(), threading.Event()
+    outcomes = {}
+
+    def leader():
+        def call():
+            started.set()
+            release.wait(5)
+            return fn()
+        try:
+            outcomes['leader'] = flight.do('key', call)
+        except RuntimeError as e:
+            outcomes['leader'] = e
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: outcomes.update(follower=flight.do('key', lambda: 'own')))
+    follower.start()
+    while not flight._calls['key'].followers:
+        time.sleep(0.001)
+    release.set()
+    thread.join()
+    follower.join()
+    return outcomes
+
+
+def test_follower_of_successful_leader_counts_as_saved():
+    flight = SingleFlight(timeout=5)
+    outcomes = lead_and_follow(flight, lambda: 'answer')
+    assert outcomes['follower'] == ('answer', True)
+    assert flight.get_statistics()['calls_saved'] == 1
+
+
+def test_follower_of_failed_leader_is_not_saved():
+    def fail():
+        raise RuntimeError('provider down')
+
+    flight = SingleFlight(timeout=5)
+    outcomes = lead_and_follow(flight, fail)
+    assert isinstance(outcomes['leader'], RuntimeError)
+    assert outcomes['follower'] == (None, True)
+    stats = flight.get_statistics()
+    assert stats['calls_saved'] == 0 and stats['leader_failures_shared'] == 1
+
+
+def test_async_follower_of_failed_leader_is_not_saved():
+    flight = SingleFlight(timeout=5)
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise RuntimeError('provider down')
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado('key', fail))
+        await asyncio.sleep(0)
+        follower = await flight.ado('key', fail)
+        with pytest.raises(RuntimeError):
+            await leader
+        return follower
+
+    assert asyncio.run(main()) == (None, True)
+    assert flight.get_statistics()['calls_saved'] == 0